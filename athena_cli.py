@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the view tooling.
+
+Each subcommand runs one of the scripts with the arguments that follow it, so
+'athena_cli.py deploy --incremental' is 'deploy_views.py --incremental'. The
+script's module is imported only when its subcommand runs, and boto3 only when
+a command actually talks to AWS, so offline commands (lint, analyze, fix,
+lineage, rules) start without loading it.
+
+Stages separated by '+' run in one process, in order, and stop at the first
+one that fails. They share the configuration (athena_config.json, see
+athena_config.py) and the one throttled Athena client from
+athena_client.create_athena_client(), with its rate limits and in-flight
+count.
+
+Usage:
+    python3 athena_cli.py lint
+    python3 athena_cli.py deploy --incremental + validate --cache + probe
+    python3 athena_cli.py fix --dry-run + lint --max-cost 100
+    python3 athena_cli.py --config dev.json deploy --preflight
+    python3 athena_cli.py deploy --help
+"""
+
+import argparse
+import importlib
+import os
+import sys
+import time
+from typing import List
+
+STAGE_SEPARATOR = '+'
+
+# subcommand -> (module, description)
+COMMANDS = {
+    'deploy': ('deploy_views', 'Deploy views/*.sql to Athena in dependency order'),
+    'validate': ('validate_all_date_columns', 'Check every date column statically and against data'),
+    'probe': ('test_date_columns_with_data', 'Probe date columns of key views with real rows'),
+    'profile': ('profile_date_nulls', 'NULL rate, min and max of every view date column'),
+    'fix': ('normalize_date_parsing', 'Rewrite multi-format date parsing in views'),
+    'lint': ('lint_views', 'Static performance lint of view and saved-query SQL'),
+    'analyze': ('sql_analyzer', 'Static analysis of view SQL (sources, columns, dates)'),
+    'lineage': ('column_lineage', 'Column lineage and unread computed view columns'),
+    'pushdown': ('pushdown_audit', 'Check that patient filters are pushed down through every view'),
+    'rules': ('compile_keyword_rules', 'Compile keyword_rules.json into the views'),
+    'benchmark': ('benchmark_views', 'Benchmark view queries against a baseline'),
+    'cohort': ('cohort_extract', 'Extract view rows for a cohort of patients'),
+    'sync': ('sync_named_queries', 'Sync saved queries with Athena named queries'),
+    'metrics': ('query_metrics', 'Rank views by bytes scanned and latency'),
+    'cache': ('result_cache', 'Inspect and maintain the query result cache'),
+    'history': ('validation_store', 'Query the history of validation runs and NULL-rate trends'),
+    'config': ('athena_config', 'Print the effective configuration'),
+}
+
+def split_stages(argv: List[str]) -> List[List[str]]:
+    """['deploy', '--incremental', '+', 'validate'] -> [['deploy', '--incremental'], ['validate']]"""
+    stages = [[]]
+    for arg in argv:
+        if arg == STAGE_SEPARATOR:
+            stages.append([])
+        else:
+            stages[-1].append(arg)
+    return stages
+
+def run_stage(command: str, args: List[str]) -> int:
+    """Run one subcommand's main() with args as its command line; returns its exit status"""
+    module_name = COMMANDS[command][0]
+    argv = sys.argv
+    sys.argv = [f'{os.path.basename(argv[0])} {command}'] + args
+    try:
+        importlib.import_module(module_name).main()
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    finally:
+        sys.argv = argv
+    return 0
+
+def parse_args():
+    commands = '\n'.join(f"  {name:<10} {description}" for name, (_, description) in COMMANDS.items())
+    parser = argparse.ArgumentParser(
+        description='Run view tooling subcommands; chain stages with +',
+        epilog=f"commands:\n{commands}\n\nRun 'athena_cli.py <command> --help' for a command's options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('--config', help='Configuration file (default: athena_config.json)')
+    parser.add_argument('stages', nargs=argparse.REMAINDER,
+                        help=f"<command> [args] [{STAGE_SEPARATOR} <command> [args] ...]")
+    return parser, parser.parse_args()
+
+def main():
+    parser, args = parse_args()
+    if args.config:
+        # Read when athena_config is first imported, i.e. by the first stage that needs it
+        os.environ['ATHENA_CONFIG'] = args.config
+
+    stages = split_stages(args.stages)
+    if not stages[0]:
+        parser.print_help()
+        sys.exit(2)
+    for stage in stages:
+        if not stage or stage[0] not in COMMANDS:
+            parser.error(f"unknown command: {' '.join(stage) or '(empty stage)'}")
+
+    for num, (command, *stage_args) in enumerate(stages, 1):
+        if len(stages) > 1:
+            print(f"\n{'=' * 80}\nSTAGE {num}/{len(stages)}: {' '.join([command] + stage_args)}\n{'=' * 80}")
+        started = time.monotonic()
+        status = run_stage(command, stage_args)
+        if len(stages) > 1:
+            print(f"\n⏱️  Stage {num} ({command}) finished in {time.monotonic() - started:.1f}s (exit {status})")
+        if status:
+            remaining = [stage[0] for stage in stages[num:]]
+            if remaining:
+                print(f"❌ Stopping: {command} failed; not run: {', '.join(remaining)}")
+            sys.exit(status)
+
+if __name__ == '__main__':
+    main()
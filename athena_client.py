@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Shared, throttle-aware Athena client.
+
+Every script used to build its own boto3.client('athena') with default
+settings, so parallel deploys, probes and benchmarks tripped Athena's API rate
+limits (TooManyRequestsException) and the account's concurrent query limit,
+and each failure surfaced as a failed view. create_athena_client() returns a
+drop-in wrapper around one pooled client that:
+
+- takes a token from a per-API token bucket before every call, sized to the
+  Athena API quotas (StartQueryExecution 20/s with a burst of 80,
+  BatchGetQueryExecution 20/s, ...)
+- retries throttling and transient server errors with full-jitter
+  exponential backoff instead of raising them
+- caps the queries in flight per workgroup: start_query_execution blocks
+  while the cap is reached, and a slot frees when a status call reports the
+  query finished (or, if nobody is polling, when the client checks itself)
+
+The boto3 session is created once per process and its clients are reused, with
+a connection pool large enough for the runner's poller plus worker threads.
+Region, default workgroup and the in-flight cap come from athena_config.
+boto3 is imported on first use, so scripts that only import this module for
+offline work (static analysis, --local) start without loading it.
+
+Usage:
+    client = create_athena_client()
+    with AthenaQueryRunner(client) as runner:
+        ...
+"""
+
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from athena_config import CONFIG
+
+DEFAULT_REGION = CONFIG['region']
+DEFAULT_WORKGROUP = CONFIG['workgroup']
+
+# (requests per second, burst) from the Athena API quotas
+API_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    'start_query_execution': (20, 80),
+    'stop_query_execution': (20, 80),
+    'get_query_execution': (100, 200),
+    'get_query_results': (100, 200),
+    'batch_get_query_execution': (20, 40),
+    'batch_get_named_query': (5, 10),
+    'list_named_queries': (5, 10),
+    'create_named_query': (5, 20),
+    'update_named_query': (5, 20),
+}
+DEFAULT_RATE_LIMIT = (5, 10)
+
+# Active DML queries per account (20 in us-east-1), shared by every workgroup
+DEFAULT_MAX_IN_FLIGHT = CONFIG['max_in_flight']
+
+RETRYABLE_ERRORS = {'TooManyRequestsException', 'ThrottlingException', 'Throttling',
+                    'RequestLimitExceeded', 'InternalServerException', 'ServiceUnavailable'}
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 20.0
+
+TERMINAL_STATES = ('SUCCEEDED', 'FAILED', 'CANCELLED')
+
+_session = None
+_clients: Dict[Tuple[str, str], 'ThrottledAthenaClient'] = {}
+_session_lock = threading.Lock()
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for retry number attempt (0-based)"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+def is_retryable(error: Exception) -> bool:
+    response = getattr(error, 'response', None) or {}
+    return response.get('Error', {}).get('Code') in RETRYABLE_ERRORS
+
+class ThrottledAthenaClient:
+    """
+    Wraps a boto3 Athena client with rate limiting, retries and an in-flight cap.
+
+    Any client method can be called on the wrapper; stats counts calls,
+    retries and time spent waiting for an in-flight slot.
+    """
+
+    def __init__(self, client, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 rate_limits: Optional[Dict[str, Tuple[float, int]]] = None,
+                 max_attempts: int = MAX_ATTEMPTS, slot_check_interval: float = 5.0):
+        self._client = client
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.slot_check_interval = slot_check_interval
+        self.stats = {'calls': 0, 'retries': 0, 'slot_wait_seconds': 0.0}
+
+        limits = dict(API_RATE_LIMITS, **(rate_limits or {}))
+        self._buckets = {name: TokenBucket(rate, burst) for name, (rate, burst) in limits.items()}
+        self._default_limit = DEFAULT_RATE_LIMIT
+        self._buckets_lock = threading.Lock()
+
+        self._in_flight: Dict[str, Set[str]] = {}
+        # Slots reserved by start calls that have not returned a query ID yet
+        self._starting: Dict[str, int] = {}
+        self._slots = threading.Condition()
+        self._stats_lock = threading.Lock()
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith('_') or name in ('can_paginate', 'get_paginator', 'get_waiter'):
+            return attr
+        return lambda **kwargs: self._call(name, attr, kwargs)
+
+    def _bucket(self, name: str) -> TokenBucket:
+        with self._buckets_lock:
+            if name not in self._buckets:
+                self._buckets[name] = TokenBucket(*self._default_limit)
+            return self._buckets[name]
+
+    def _call(self, name: str, method, kwargs: Dict):
+        workgroup = kwargs.get('WorkGroup', DEFAULT_WORKGROUP)
+        if name == 'start_query_execution':
+            self._acquire_slot(workgroup)
+
+        try:
+            response = self._call_with_retry(name, method, kwargs)
+        except Exception:
+            if name == 'start_query_execution':
+                self._release(workgroup)
+            raise
+
+        if name == 'start_query_execution':
+            with self._slots:
+                self._starting[workgroup] -= 1
+                self._in_flight.setdefault(workgroup, set()).add(response['QueryExecutionId'])
+        elif name in ('get_query_execution', 'batch_get_query_execution'):
+            executions = response.get('QueryExecutions') or [response.get('QueryExecution', {})]
+            self._observe(executions)
+        return response
+
+    def _call_with_retry(self, name: str, method, kwargs: Dict):
+        bucket = self._bucket(name)
+        for attempt in range(self.max_attempts):
+            bucket.acquire()
+            self._count('calls')
+            try:
+                return method(**kwargs)
+            except Exception as e:
+                # botocore ClientError; matched by code so botocore is not imported here
+                if not is_retryable(e) or attempt == self.max_attempts - 1:
+                    raise
+                self._count('retries')
+                time.sleep(backoff_delay(attempt))
+
+    def _count(self, stat: str, amount: float = 1):
+        with self._stats_lock:
+            self.stats[stat] += amount
+
+    def _running(self, workgroup: str) -> int:
+        return len(self._in_flight.get(workgroup, ())) + self._starting.get(workgroup, 0)
+
+    def _acquire_slot(self, workgroup: str):
+        started = time.monotonic()
+        while True:
+            with self._slots:
+                if self._running(workgroup) < self.max_in_flight:
+                    self._starting[workgroup] = self._starting.get(workgroup, 0) + 1
+                    break
+                if self._slots.wait(self.slot_check_interval):
+                    continue
+            # Nobody reported a query finishing; ask Athena directly
+            self._refresh(workgroup)
+        self._count('slot_wait_seconds', time.monotonic() - started)
+
+    def _release(self, workgroup: str):
+        """Give back the slot of a start call that failed"""
+        with self._slots:
+            self._starting[workgroup] -= 1
+            self._slots.notify_all()
+
+    def _refresh(self, workgroup: str):
+        with self._slots:
+            ids = [query_id for query_id in self._in_flight.get(workgroup, ()) if query_id]
+        for i in range(0, len(ids), 50):
+            response = self._call_with_retry('batch_get_query_execution', self._client.batch_get_query_execution,
+                                             {'QueryExecutionIds': ids[i:i + 50]})
+            self._observe(response.get('QueryExecutions', []))
+
+    def _observe(self, executions: List[Dict]):
+        """Free the slots of queries a status call reported as finished"""
+        finished = {
+            execution.get('QueryExecutionId') for execution in executions
+            if execution.get('Status', {}).get('State') in TERMINAL_STATES
+        }
+        if not finished:
+            return
+        with self._slots:
+            for running in self._in_flight.values():
+                running -= finished
+            self._slots.notify_all()
+
+    def in_flight(self) -> Dict[str, int]:
+        with self._slots:
+            return {workgroup: self._running(workgroup) for workgroup in self._in_flight.keys() | self._starting.keys()}
+
+def get_session():
+    """The process-wide boto3 session"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import boto3
+            _session = boto3.session.Session()
+        return _session
+
+def create_athena_client(region: str = DEFAULT_REGION, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                         max_pool_connections: int = 50) -> ThrottledAthenaClient:
+    """
+    Shared throttled Athena client for region.
+
+    Calls with the same region and cap return the same client, so every
+    runner in a process shares one rate limit and one in-flight count.
+    """
+    key = (region, str(max_in_flight))
+    with _session_lock:
+        if key in _clients:
+            return _clients[key]
+
+    from botocore.config import Config
+    config = Config(
+        region_name=region,
+        max_pool_connections=max_pool_connections,
+        connect_timeout=10,
+        read_timeout=60,
+        # Retries happen in ThrottledAthenaClient, after the token bucket
+        retries={'mode': 'standard', 'total_max_attempts': 1},
+    )
+    client = ThrottledAthenaClient(get_session().client('athena', config=config), max_in_flight=max_in_flight)
+
+    with _session_lock:
+        return _clients.setdefault(key, client)
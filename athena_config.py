@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Shared configuration for the Athena tools.
+
+The database, region, query result location and workgroup used to be
+hardcoded in every script. They are now read once per process from
+athena_config.json next to the scripts (or the file named by $ATHENA_CONFIG).
+Single values can be overridden with environment variables, and keys
+missing from the file keep the defaults below.
+
+    ATHENA_DATABASE  ATHENA_REGION  ATHENA_OUTPUT_LOCATION  ATHENA_WORKGROUP
+    ATHENA_MAX_IN_FLIGHT  ATHENA_MATERIALIZED_LOCATION  ATHENA_TEST_PATIENT_ID
+
+test_patient_id is the patient the probe and benchmark queries look up on
+Athena. It is a real patient, so it is not committed; set it in a local config
+file or the environment.
+
+This module only reads JSON, so importing it does not load boto3.
+
+Usage:
+    from athena_config import CONFIG
+    python3 athena_config.py                      # print the effective configuration
+    ATHENA_CONFIG=dev.json python3 athena_config.py
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CONFIG_FILE = Path(__file__).parent / 'athena_config.json'
+
+DEFAULTS: Dict[str, Any] = {
+    'database': 'fhir_prd_db',
+    'region': 'us-east-1',
+    'output_location': 's3://aws-athena-query-results-343218191717-us-east-1/',
+    'materialized_location': 's3://aws-athena-query-results-343218191717-us-east-1/materialized/',
+    'workgroup': 'primary',
+    'max_in_flight': 20,
+    'test_patient_id': '',
+}
+
+ENV_OVERRIDES = {key: f'ATHENA_{key.upper()}' for key in DEFAULTS}
+
+def config_path() -> Path:
+    return Path(os.environ['ATHENA_CONFIG']) if os.environ.get('ATHENA_CONFIG') else CONFIG_FILE
+
+def load_config(path: Optional[Path] = None) -> Dict[str, Any]:
+    """Defaults, then the config file (if it exists), then ATHENA_* environment variables"""
+    path = path or config_path()
+    config = dict(DEFAULTS)
+
+    if path.exists():
+        values = json.loads(path.read_text())
+        unknown = set(values) - set(DEFAULTS)
+        if unknown:
+            raise ValueError(f"{path.name}: unknown setting(s) {', '.join(sorted(unknown))}")
+        config.update(values)
+    elif os.environ.get('ATHENA_CONFIG'):
+        raise FileNotFoundError(f"ATHENA_CONFIG file not found: {path}")
+
+    for key, variable in ENV_OVERRIDES.items():
+        if os.environ.get(variable):
+            config[key] = type(DEFAULTS[key])(os.environ[variable])
+    return config
+
+CONFIG = load_config()
+
+def main():
+    print(f"Config file: {config_path()}{'' if config_path().exists() else ' (not found, using defaults)'}")
+    for key, value in CONFIG.items():
+        override = f"  (${ENV_OVERRIDES[key]})" if os.environ.get(ENV_OVERRIDES[key]) else ''
+        print(f"  {key:<24} {value}{override}")
+
+if __name__ == '__main__':
+    main()
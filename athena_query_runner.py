@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Shared Athena query runner with batched status polling.
+
+Every script used to submit a query and then spin on get_query_execution with
+time.sleep(2), costing one API call per in-flight query every 2 seconds. The
+runner here tracks any number of in-flight queries from one background thread:
+
+- Status is fetched with batch_get_query_execution, up to 50 IDs per call
+- Each query is polled on an adaptive schedule: quickly at first (DDL and small
+  probes finish in a second or two), then backing off for long-running scans
+- submit() returns a QueryFuture (a concurrent.futures.Future) resolved with
+  the final QueryExecution dict, so callers can block, use as_completed() /
+  wait(), or await it via run_async() / asyncio.wrap_future()
+
+The runner only needs an object with start_query_execution and
+batch_get_query_execution, so a stubbed client can be passed in tests.
+
+Pass metrics=QueryMetricsLog() (query_metrics) to append the Statistics of
+every finished query to .query_metrics.jsonl; submit(sql, tag=...) names the
+view the query ran for.
+
+Usage:
+    client = create_athena_client()   # athena_client
+    with AthenaQueryRunner(client) as runner:
+        futures = [runner.submit(sql) for sql in queries]
+        for future in as_completed(futures):
+            execution = future.result()
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+from athena_config import CONFIG
+
+DEFAULT_DATABASE = CONFIG['database']
+DEFAULT_OUTPUT_LOCATION = CONFIG['output_location']
+DEFAULT_WORKGROUP = CONFIG['workgroup']
+
+# batch_get_query_execution accepts at most 50 query IDs per call
+BATCH_SIZE = 50
+
+TERMINAL_STATES = ('SUCCEEDED', 'FAILED', 'CANCELLED')
+
+class QueryFailedError(Exception):
+    """Raised by a query future when Athena reports FAILED or CANCELLED"""
+
+    def __init__(self, query_id: str, state: str, reason: str, execution: Optional[Dict] = None):
+        super().__init__(f"{state}: {reason}")
+        self.query_id = query_id
+        self.state = state
+        self.reason = reason
+        self.execution = execution
+
+class QueryTimeoutError(Exception):
+    """Raised by a query future when the query does not finish within the timeout"""
+
+    def __init__(self, query_id: str, timeout: float):
+        super().__init__(f"Query {query_id} did not finish within {timeout:.0f}s")
+        self.query_id = query_id
+        self.timeout = timeout
+
+class QueryFuture(Future):
+    """Future for one Athena query; query_id is None if submission failed"""
+
+    query_id: Optional[str] = None
+
+class _InFlightQuery:
+    """Bookkeeping for one submitted query"""
+
+    __slots__ = ('query_id', 'future', 'deadline', 'interval', 'next_poll', 'tag', 'execution')
+
+    def __init__(self, query_id: str, future: QueryFuture, deadline: float, interval: float,
+                 tag: Optional[str] = None):
+        self.query_id = query_id
+        self.future = future
+        self.deadline = deadline
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+        self.tag = tag
+        self.execution: Optional[Dict] = None
+
+class AthenaQueryRunner:
+    """Submit Athena queries and resolve their futures from one batched poller"""
+
+    def __init__(self, client, database: str = DEFAULT_DATABASE,
+                 output_location: str = DEFAULT_OUTPUT_LOCATION,
+                 timeout: float = 120.0, initial_interval: float = 0.5,
+                 max_interval: float = 5.0, backoff: float = 1.5, metrics=None,
+                 workgroup: Optional[str] = DEFAULT_WORKGROUP):
+        self.client = client
+        self.database = database
+        self.output_location = output_location
+        self.workgroup = workgroup
+        self.timeout = timeout
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.metrics = metrics
+
+        self._in_flight: Dict[str, _InFlightQuery] = {}
+        self._lock = threading.Condition()
+        self._poller: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, sql: str, database: Optional[str] = None, tag: Optional[str] = None,
+               **start_kwargs) -> QueryFuture:
+        """
+        Start a query and return a Future for its final QueryExecution dict.
+
+        Extra keyword arguments (e.g. ExecutionParameters, WorkGroup) are
+        passed through to start_query_execution. A failed submission is
+        reported through the future rather than raised. tag labels the
+        query's metrics record, usually with a view name.
+        """
+        future = QueryFuture()
+        future.set_running_or_notify_cancel()
+        if self.workgroup:
+            start_kwargs.setdefault('WorkGroup', self.workgroup)
+
+        try:
+            response = self.client.start_query_execution(
+                QueryString=sql,
+                QueryExecutionContext={'Database': database or self.database},
+                ResultConfiguration={'OutputLocation': self.output_location},
+                **start_kwargs
+            )
+        except Exception as e:
+            future.set_exception(e)
+            return future
+
+        query_id = response['QueryExecutionId']
+        future.query_id = query_id
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('AthenaQueryRunner is closed')
+            self._in_flight[query_id] = _InFlightQuery(
+                query_id, future, time.monotonic() + self.timeout, self.initial_interval, tag
+            )
+            self._ensure_poller()
+            self._lock.notify()
+
+        return future
+
+    def run(self, sql: str, database: Optional[str] = None, tag: Optional[str] = None,
+            **start_kwargs) -> Dict:
+        """Submit a query and block until it finishes"""
+        return self.submit(sql, database, tag, **start_kwargs).result()
+
+    async def run_async(self, sql: str, database: Optional[str] = None, tag: Optional[str] = None,
+                        **start_kwargs) -> Dict:
+        """Submit a query and await its completion from asyncio code"""
+        return await asyncio.wrap_future(self.submit(sql, database, tag, **start_kwargs))
+
+    def close(self):
+        """Stop the poller; queries still in flight are left running in Athena"""
+        with self._lock:
+            self._closed = True
+            self._lock.notify()
+        if self._poller is not None:
+            self._poller.join()
+
+        with self._lock:
+            for query in self._in_flight.values():
+                query.future.set_exception(RuntimeError(f'Runner closed while {query.query_id} was in flight'))
+            self._in_flight.clear()
+
+    def _ensure_poller(self):
+        if self._poller is None or not self._poller.is_alive():
+            self._poller = threading.Thread(target=self._poll_loop, name='athena-poller', daemon=True)
+            self._poller.start()
+
+    def _poll_loop(self):
+        while True:
+            with self._lock:
+                while not self._closed:
+                    if self._in_flight:
+                        wait = min(q.next_poll for q in self._in_flight.values()) - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._lock.wait(wait)
+                    else:
+                        self._lock.wait()
+                if self._closed:
+                    return
+
+                # Fold queries that are nearly due into this batch to save calls
+                horizon = time.monotonic() + self.initial_interval
+                due = [q for q in self._in_flight.values() if q.next_poll <= horizon]
+
+            self._poll(due)
+
+    def _poll(self, due: List[_InFlightQuery]):
+        executions = {}
+
+        for start in range(0, len(due), BATCH_SIZE):
+            batch = [q.query_id for q in due[start:start + BATCH_SIZE]]
+            try:
+                response = self.client.batch_get_query_execution(QueryExecutionIds=batch)
+            except Exception:
+                # Transient API error: leave the queries in flight and retry on the next poll
+                continue
+            for execution in response.get('QueryExecutions', []):
+                executions[execution['QueryExecutionId']] = execution
+
+        now = time.monotonic()
+        finished = []
+
+        with self._lock:
+            for query in due:
+                execution = executions.get(query.query_id)
+                state = execution['Status']['State'] if execution else None
+                if execution:
+                    query.execution = execution
+
+                if state in TERMINAL_STATES:
+                    del self._in_flight[query.query_id]
+                    finished.append((query, state))
+                    if state == 'SUCCEEDED':
+                        query.future.set_result(execution)
+                    else:
+                        reason = execution['Status'].get('StateChangeReason', 'Unknown')
+                        query.future.set_exception(
+                            QueryFailedError(query.query_id, state, reason, execution)
+                        )
+                elif now >= query.deadline:
+                    del self._in_flight[query.query_id]
+                    finished.append((query, 'TIMEOUT'))
+                    query.future.set_exception(QueryTimeoutError(query.query_id, self.timeout))
+                else:
+                    query.interval = min(query.interval * self.backoff, self.max_interval)
+                    query.next_poll = now + query.interval
+
+        # File I/O stays outside the lock so submit() never waits on it
+        if self.metrics is not None:
+            for query, state in finished:
+                try:
+                    self.metrics.record(query.execution or {'QueryExecutionId': query.query_id},
+                                        view=query.tag, state=state)
+                except OSError:
+                    pass
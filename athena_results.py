@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Streaming readers for Athena query results.
+
+get_query_results returns at most 1000 rows per call; reading only the first
+response silently truncates larger results. The readers here are generators
+that never hold more than one page (or one S3 chunk) in memory:
+
+- iter_query_results: follows NextToken through every get_query_results page
+- iter_s3_results: streams the CSV Athena writes to the query's
+  OutputLocation, for results too large to page through the API efficiently
+
+Both yield one dict per row, with values converted from their Athena type
+(ResultSetMetadata.ColumnInfo) to Python: bigint -> int, double -> float,
+decimal -> Decimal, boolean -> bool, date -> date, timestamp -> datetime.
+NULLs come back as None. Clients are passed in, so a stubbed Athena client or
+a moto S3 client works the same as the real thing.
+
+Usage:
+    execution = runner.run(sql)
+    for row in iter_query_results(client, execution['QueryExecutionId']):
+        ...
+"""
+
+import codecs
+import csv
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
+# get_query_results accepts at most 1000 rows per page
+MAX_PAGE_SIZE = 1000
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+def _parse_bool(value: str) -> bool:
+    return value.lower() == 'true'
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+TYPE_CONVERTERS: Dict[str, Callable[[str], Any]] = {
+    'boolean': _parse_bool,
+    'tinyint': int,
+    'smallint': int,
+    'integer': int,
+    'bigint': int,
+    'real': float,
+    'float': float,
+    'double': float,
+    'decimal': Decimal,
+    'date': date.fromisoformat,
+    'timestamp': _parse_timestamp,
+}
+
+def convert_value(value: Optional[str], athena_type: str) -> Any:
+    """
+    Convert one Athena result value to its Python type.
+
+    Values that do not parse (e.g. timestamp with time zone) are returned as
+    the original string rather than raising.
+    """
+    if value is None:
+        return None
+
+    converter = TYPE_CONVERTERS.get(athena_type.lower())
+    if converter is None:
+        return value
+
+    try:
+        return converter(value)
+    except (ValueError, InvalidOperation):
+        return value
+
+def athena_text(value) -> Optional[str]:
+    """Render a value the way Athena returns it in VarCharValue; the inverse of convert_value"""
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ', timespec='milliseconds')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, list):
+        return '[' + ', '.join('null' if v is None else str(athena_text(v)) for v in value) + ']'
+    if isinstance(value, dict):
+        return '{' + ', '.join(f'{k}={athena_text(v)}' for k, v in value.items()) + '}'
+    return str(value)
+
+def get_column_info(client, query_id: str) -> List[Dict]:
+    """Return ResultSetMetadata.ColumnInfo for a finished query"""
+    response = client.get_query_results(QueryExecutionId=query_id, MaxResults=1)
+    return response['ResultSet']['ResultSetMetadata']['ColumnInfo']
+
+def iter_query_results(client, query_id: str, page_size: int = MAX_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield every result row as a typed dict, following NextToken across pages"""
+    kwargs = {'QueryExecutionId': query_id, 'MaxResults': min(page_size, MAX_PAGE_SIZE)}
+    columns = None
+    first_page = True
+
+    while True:
+        response = client.get_query_results(**kwargs)
+        result_set = response['ResultSet']
+
+        if columns is None:
+            columns = [(col['Name'], col['Type']) for col in result_set['ResultSetMetadata']['ColumnInfo']]
+
+        rows = result_set['Rows']
+        if first_page and rows:
+            # SELECT results repeat the column labels as the first row of the first page
+            header = [data.get('VarCharValue') for data in rows[0]['Data']]
+            if header == [name for name, _ in columns]:
+                rows = rows[1:]
+            first_page = False
+
+        for row in rows:
+            yield {
+                name: convert_value(data.get('VarCharValue'), athena_type)
+                for (name, athena_type), data in zip(columns, row['Data'])
+            }
+
+        next_token = response.get('NextToken')
+        if not next_token:
+            return
+        kwargs['NextToken'] = next_token
+
+def _iter_text(body, chunk_size: int) -> Iterator[str]:
+    """Decode a streaming S3 body chunk by chunk"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+
+    while True:
+        chunk = body.read(chunk_size)
+        if not chunk:
+            break
+        yield decoder.decode(chunk)
+
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def _iter_lines(body, chunk_size: int) -> Iterator[str]:
+    """Split a streaming S3 body into lines, keeping line endings for csv.reader"""
+    pending = ''
+
+    for text in _iter_text(body, chunk_size):
+        # The last piece may be an incomplete line; carry it into the next chunk
+        *lines, pending = (pending + text).split('\n')
+        for line in lines:
+            yield line + '\n'
+
+    if pending:
+        yield pending
+
+def iter_s3_results(client, s3_client, query_id: str, output_location: Optional[str] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Yield every result row as a typed dict by streaming the result CSV from S3.
+
+    Athena writes NULL as an empty unquoted field; csv cannot tell that apart
+    from an empty string, so empty fields are returned as None.
+    """
+    if output_location is None:
+        execution = client.get_query_execution(QueryExecutionId=query_id)['QueryExecution']
+        output_location = execution['ResultConfiguration']['OutputLocation']
+
+    columns = [(col['Name'], col['Type']) for col in get_column_info(client, query_id)]
+
+    location = urlparse(output_location)
+    body = s3_client.get_object(Bucket=location.netloc, Key=location.path.lstrip('/'))['Body']
+
+    try:
+        reader = csv.reader(_iter_lines(body, chunk_size))
+        next(reader, None)  # header row
+
+        for record in reader:
+            yield {
+                name: convert_value(value if value != '' else None, athena_type)
+                for (name, athena_type), value in zip(columns, record)
+            }
+    finally:
+        body.close()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Benchmark the deployed views and gate on regressions against a stored baseline.
+
+Each view is run through a fixed set of representative queries:
+
+- patient_lookup:   SELECT * for one patient, like test_date_columns_with_data.py
+- cohort_aggregate: row and distinct-patient counts over the whole view
+- full_scan:        SELECT * over the whole view (results are not fetched)
+
+Views without a patient_fhir_id / patient_id output column only get the
+aggregate and the full scan. Every query runs --iterations times, one at a
+time so runs do not compete with each other. p50/p95 engine time
+(EngineExecutionTimeInMillis) and bytes scanned are compared with the
+baseline in benchmark_baseline.json for the same backend. A query regresses
+if its p95 or bytes scanned grows by more than --threshold (and by more than
+the noise floor), or if it fails where the baseline succeeded. Any
+regression exits with status 1.
+
+Usage:
+    python3 benchmark_views.py --update-baseline               # record the baseline
+    python3 benchmark_views.py                                 # compare, exit 1 on regression
+    python3 benchmark_views.py v_unified_patient_timeline v_radiation_treatments
+    python3 benchmark_views.py --kinds patient_lookup --iterations 10 --threshold 0.1
+    python3 benchmark_views.py --local --fixtures synthetic
+    python3 benchmark_views.py --local --fixtures synthetic --patient-id synthetic-patient-7
+
+patient_lookup queries look up --patient-id: by default test_patient_id from
+the config (see athena_config.py), or with --local the lowest patient id in
+the fixtures.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from athena_client import create_athena_client
+from athena_config import CONFIG
+from athena_query_runner import DEFAULT_DATABASE, AthenaQueryRunner, QueryFailedError, QueryTimeoutError
+from deploy_views import VIEWS_DIR, discover_views
+from query_metrics import QueryMetricsLog, format_bytes, git_revision, percentile
+from sql_analyzer import analyze_files
+
+BASELINE_FILE = Path(__file__).parent / 'benchmark_baseline.json'
+
+PATIENT_COLUMNS = ('patient_fhir_id', 'patient_id')
+
+QUERY_TEMPLATES = {
+    'patient_lookup': "SELECT * FROM {database}.{view} WHERE {patient_column} = '{patient_id}'",
+    'cohort_aggregate': "SELECT COUNT(*) AS row_count{distinct_patients} FROM {database}.{view}",
+    'full_scan': "SELECT * FROM {database}.{view}",
+}
+
+DEFAULT_ITERATIONS = 5
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_DELTA_MS = 250
+MIN_DELTA_BYTES = 1024 ** 2
+
+def patient_column(output_columns: List[str]) -> Optional[str]:
+    """The column a view is keyed on per patient, if it outputs one"""
+    for column in PATIENT_COLUMNS:
+        if column in output_columns:
+            return column
+    return None
+
+def build_queries(views: Dict[str, List[str]], kinds: List[str], patient_id: str,
+                  database: str = DEFAULT_DATABASE) -> List[Dict]:
+    """
+    Render the benchmark queries for {view name: output columns}.
+
+    Returns dicts with view, kind and sql, in view then kind order.
+    """
+    queries = []
+    for view, output_columns in sorted(views.items()):
+        column = patient_column(output_columns)
+        for kind in kinds:
+            if kind == 'patient_lookup' and not column:
+                continue
+            sql = QUERY_TEMPLATES[kind].format(
+                database=database, view=view, patient_column=column, patient_id=patient_id,
+                distinct_patients=f", COUNT(DISTINCT {column}) AS patients" if column else ''
+            )
+            queries.append({'view': view, 'kind': kind, 'sql': sql})
+    return queries
+
+def run_benchmark(runner: AthenaQueryRunner, query: Dict, iterations: int) -> Dict:
+    """Run one query iterations times and summarize engine time and bytes scanned"""
+    engine_ms = []
+    scanned = []
+
+    for _ in range(iterations):
+        try:
+            execution = runner.run(query['sql'], tag=query['view'])
+        except QueryFailedError as e:
+            return {'status': 'failed', 'message': e.reason}
+        except QueryTimeoutError:
+            return {'status': 'timeout', 'message': f'Query timed out after {runner.timeout:.0f}s'}
+        except Exception as e:
+            return {'status': 'error', 'message': str(e)}
+
+        statistics = execution.get('Statistics', {})
+        engine_ms.append(statistics.get('EngineExecutionTimeInMillis', 0))
+        scanned.append(statistics.get('DataScannedInBytes', 0))
+
+    return {
+        'status': 'success',
+        'engine_ms': engine_ms,
+        'p50_engine_ms': percentile(engine_ms, 0.5),
+        'p95_engine_ms': percentile(engine_ms, 0.95),
+        'bytes_scanned': max(scanned),
+    }
+
+def compare_to_baseline(result: Dict, baseline: Optional[Dict], threshold: float,
+                        min_delta_ms: int) -> List[str]:
+    """List the ways result regressed against its baseline entry"""
+    if baseline is None:
+        return []
+    if result['status'] != 'success':
+        return [f"{result['status']}: {result['message']}"]
+
+    regressions = []
+
+    base_ms = baseline['p95_engine_ms']
+    delta_ms = result['p95_engine_ms'] - base_ms
+    if delta_ms > base_ms * threshold and delta_ms >= min_delta_ms:
+        regressions.append(f"p95 {base_ms}ms -> {result['p95_engine_ms']}ms")
+
+    base_bytes = baseline['bytes_scanned']
+    delta_bytes = result['bytes_scanned'] - base_bytes
+    if delta_bytes > base_bytes * threshold and delta_bytes >= MIN_DELTA_BYTES:
+        regressions.append(f"scanned {format_bytes(base_bytes)} -> {format_bytes(result['bytes_scanned'])}")
+
+    return regressions
+
+def load_baseline(path: Path, backend: str) -> Dict[str, Dict]:
+    """Baseline entries for one backend, keyed by 'view:kind'"""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text()).get(backend, {})
+
+def save_baseline(path: Path, backend: str, results: List[Dict], iterations: int):
+    """Merge successful results into the baseline for one backend"""
+    baselines = json.loads(path.read_text()) if path.exists() else {}
+    entries = baselines.setdefault(backend, {})
+
+    for result in results:
+        if result['status'] != 'success':
+            continue
+        entries[f"{result['view']}:{result['kind']}"] = {
+            'p50_engine_ms': result['p50_engine_ms'],
+            'p95_engine_ms': result['p95_engine_ms'],
+            'bytes_scanned': result['bytes_scanned'],
+            'iterations': iterations,
+            'revision': git_revision(),
+        }
+
+    baselines[backend] = dict(sorted(entries.items()))
+    path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark views and fail on regressions against a baseline')
+    parser.add_argument('views', nargs='*',
+                        help='Views to benchmark, by view or file name (default: every view)')
+    parser.add_argument('--kinds', nargs='+', choices=list(QUERY_TEMPLATES), default=list(QUERY_TEMPLATES),
+                        help='Query kinds to run (default: all)')
+    parser.add_argument('--iterations', type=int, default=DEFAULT_ITERATIONS,
+                        help=f'Runs per query (default: {DEFAULT_ITERATIONS})')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help=f'Allowed relative growth in p95 / bytes scanned (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--min-delta-ms', type=int, default=DEFAULT_MIN_DELTA_MS,
+                        help=f'Ignore p95 growth smaller than this (default: {DEFAULT_MIN_DELTA_MS})')
+    parser.add_argument('--patient-id',
+                        help='Patient for patient_lookup queries (default: test_patient_id from the config; '
+                             'with --local the first fixture patient)')
+    parser.add_argument('--timeout', type=float, default=600.0,
+                        help='Per-query timeout in seconds (default: 600)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE,
+                        help=f'Baseline file (default: {BASELINE_FILE.name})')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Record these results as the new baseline instead of gating on it')
+    parser.add_argument('--local', action='store_true',
+                        help='Benchmark a local DuckDB built from fixtures/ instead of Athena')
+    parser.add_argument('--fixtures', type=Path,
+                        help='Fixture directory for --local, e.g. generate_synthetic_fhir.py output')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    view_files = discover_views(VIEWS_DIR, None)
+    analyses = analyze_files(sorted(view_files.values()))
+    output_columns = {
+        analysis['view'].split('.')[-1]: analysis['output_columns']
+        for analysis in analyses.values() if analysis['view']
+    }
+
+    if args.views:
+        by_file = {path.name: name for name, path in view_files.items()}
+        selected = {}
+        for view in args.views:
+            name = by_file.get(Path(view).name, view)
+            if name not in output_columns:
+                print(f"❌ Unknown view: {view}")
+                sys.exit(1)
+            selected[name] = output_columns[name]
+        output_columns = selected
+
+    if args.local:
+        from local_engine import (FIXTURES_DIR, LOCAL_POLL_INTERVAL, create_local_environment,
+                                  sample_patient_id)
+        fixtures_dir = args.fixtures or FIXTURES_DIR
+        backend = f"local:{fixtures_dir.resolve().name}"
+        client = create_local_environment(fixtures_dir)
+        patient_id = args.patient_id or sample_patient_id(client)
+        runner = AthenaQueryRunner(client, timeout=args.timeout, initial_interval=LOCAL_POLL_INTERVAL)
+    else:
+        backend = 'athena'
+        patient_id = args.patient_id or CONFIG['test_patient_id']
+        client = create_athena_client()
+        runner = AthenaQueryRunner(client, timeout=args.timeout, metrics=QueryMetricsLog())
+
+    if not patient_id and 'patient_lookup' in args.kinds:
+        print("❌ No test patient for patient_lookup: pass --patient-id or set test_patient_id "
+              "(athena_config.json or $ATHENA_TEST_PATIENT_ID)")
+        sys.exit(1)
+
+    queries = build_queries(output_columns, args.kinds, patient_id)
+    baseline = {} if args.update_baseline else load_baseline(args.baseline, backend)
+
+    print("=" * 100)
+    print(f"VIEW BENCHMARK ({backend}, {len(queries)} queries x {args.iterations} runs)")
+    print("=" * 100)
+    if not args.update_baseline and not baseline:
+        print(f"⚠️  No {backend} baseline in {args.baseline.name} - reporting only (use --update-baseline)")
+    print(f"\n{'View':<40} {'Query':<17} {'p50':>8} {'p95':>8} {'Scanned':>10} {'Base p95':>9}  Result")
+    print("-" * 100)
+
+    results = []
+    regressed = []
+
+    with runner:
+        for query in queries:
+            result = dict(query, **run_benchmark(runner, query, args.iterations))
+            results.append(result)
+
+            entry = baseline.get(f"{query['view']}:{query['kind']}")
+            regressions = compare_to_baseline(result, entry, args.threshold, args.min_delta_ms)
+            base = f"{entry['p95_engine_ms']}ms" if entry else '-'
+
+            if result['status'] != 'success':
+                marker = '❌ REGRESSION' if regressions else '⚠️  ' + result['status'].upper()
+                print(f"{query['view'][:40]:<40} {query['kind']:<17} {'-':>8} {'-':>8} {'-':>10} "
+                      f"{base:>9}  {marker}: {result['message'][:60]}")
+            else:
+                if regressions:
+                    marker = '❌ ' + '; '.join(regressions)
+                elif entry or args.update_baseline:
+                    marker = '✅'
+                else:
+                    marker = '🆕 no baseline'
+                print(f"{query['view'][:40]:<40} {query['kind']:<17} {result['p50_engine_ms']:>6}ms "
+                      f"{result['p95_engine_ms']:>6}ms {format_bytes(result['bytes_scanned']):>10} "
+                      f"{base:>9}  {marker}")
+
+            if regressions:
+                regressed.append((result, regressions))
+
+    print(f"\n{'=' * 100}")
+    succeeded = sum(1 for r in results if r['status'] == 'success')
+    print(f"✅ Completed: {succeeded}/{len(results)}")
+
+    if args.update_baseline:
+        save_baseline(args.baseline, backend, results, args.iterations)
+        print(f"📝 Baseline for {backend} written to {args.baseline}")
+        return
+
+    print(f"❌ Regressions: {len(regressed)} (threshold {args.threshold:.0%}, noise floor {args.min_delta_ms}ms)")
+    for result, regressions in regressed:
+        print(f"   - {result['view']} {result['kind']}: {'; '.join(regressions)}")
+
+    if regressed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Extract view rows for a cohort of patients in a few batched queries.
+
+Looking patients up one at a time (the f-string WHERE patient_fhir_id = '...'
+probes) costs one Athena query per patient per view and splices IDs into the
+SQL. Here the cohort is split into chunks of --chunk-size patients and each
+chunk is one query per view:
+
+    SELECT ... FROM fhir_prd_db.<view> WHERE patient_fhir_id IN (?, ?, ...)
+    ORDER BY patient_fhir_id
+
+with the IDs passed as Athena ExecutionParameters, never as SQL text. IDs are
+checked against the FHIR id syntax ([A-Za-z0-9-.], at most 64 characters)
+before anything is sent. Chunks run concurrently (--max-concurrency) and
+results are streamed back grouped per patient as each chunk finishes, so a
+5,000 patient cohort is 10 queries per view at the default chunk size.
+
+Output is one JSON Lines file per view, one line per patient:
+{"patient_id": ..., "rows": [...]}; patients with no rows get an empty list.
+
+Usage:
+    python3 cohort_extract.py --patients cohort.txt v_medications v_imaging
+    python3 cohort_extract.py --patients cohort.txt --columns medication_name,medication_start_date v_medications
+    python3 cohort_extract.py --local --fixtures synthetic --patients ids.txt v_patient_demographics
+"""
+
+import argparse
+import itertools
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from athena_client import create_athena_client
+from athena_query_runner import DEFAULT_DATABASE, AthenaQueryRunner, QueryFailedError, QueryTimeoutError
+from athena_results import iter_query_results
+from benchmark_views import patient_column
+from deploy_views import VIEWS_DIR, discover_views
+from query_metrics import QueryMetricsLog
+from sql_analyzer import analyze_files
+
+PATIENT_ID_PATTERN = re.compile(r'^[A-Za-z0-9\-.]{1,64}$')
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_OUTPUT_DIR = Path('cohort_extract')
+
+def normalize_patient_ids(patient_ids: Iterable[str]) -> List[str]:
+    """
+    Strip 'Patient/' prefixes and duplicates, keeping first-seen order.
+
+    Raises ValueError listing every ID that is not a valid FHIR id.
+    """
+    ids = []
+    invalid = []
+    for patient_id in patient_ids:
+        patient_id = patient_id.strip()
+        if not patient_id:
+            continue
+        if patient_id.startswith('Patient/'):
+            patient_id = patient_id[len('Patient/'):]
+        if PATIENT_ID_PATTERN.match(patient_id):
+            ids.append(patient_id)
+        else:
+            invalid.append(patient_id)
+    if invalid:
+        raise ValueError(f"Invalid patient IDs: {', '.join(invalid[:10])}"
+                         f"{f' (+{len(invalid) - 10} more)' if len(invalid) > 10 else ''}")
+    return list(dict.fromkeys(ids))
+
+def parameter_literal(value: str) -> str:
+    """An ExecutionParameters entry is a SQL literal, so strings carry their quotes"""
+    return "'" + value.replace("'", "''") + "'"
+
+def chunk_query(view: str, key_column: str, count: int, columns: Optional[List[str]] = None,
+                database: str = DEFAULT_DATABASE) -> str:
+    """SELECT for one chunk of count patients, with ? placeholders for their IDs"""
+    select = ', '.join(columns) if columns else '*'
+    placeholders = ', '.join('?' * count)
+    return (f"SELECT {select} FROM {database}.{view} "
+            f"WHERE {key_column} IN ({placeholders}) ORDER BY {key_column}")
+
+def _extract_chunk(runner: AthenaQueryRunner, sql: str, chunk: List[str], key_column: str,
+                   tag: str) -> Dict[str, List[Dict]]:
+    """Run one chunk and group its rows per patient"""
+    execution = runner.run(sql, tag=tag, ExecutionParameters=[parameter_literal(p) for p in chunk])
+    rows = iter_query_results(runner.client, execution['QueryExecutionId'])
+    grouped = {patient_id: [] for patient_id in chunk}
+    for patient_id, patient_rows in itertools.groupby(rows, key=lambda row: row[key_column]):
+        grouped.setdefault(patient_id, []).extend(patient_rows)
+    return grouped
+
+def iter_cohort(runner: AthenaQueryRunner, view: str, patient_ids: List[str], key_column: str,
+                columns: Optional[List[str]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> Iterator[Tuple[str, List[Dict]]]:
+    """
+    Yield (patient_id, rows) for every patient, one chunk at a time in completion order.
+
+    patient_ids must already be normalized (normalize_patient_ids). columns,
+    if given, must include key_column. A failed chunk raises its
+    QueryFailedError / QueryTimeoutError from the generator.
+    """
+    if columns and key_column not in columns:
+        columns = [key_column] + columns
+    chunks = [patient_ids[i:i + chunk_size] for i in range(0, len(patient_ids), chunk_size)]
+
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = [
+            executor.submit(_extract_chunk, runner,
+                            chunk_query(view, key_column, len(chunk), columns, runner.database),
+                            chunk, key_column, view)
+            for chunk in chunks
+        ]
+        try:
+            for future in as_completed(futures):
+                yield from future.result().items()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def view_patient_columns() -> Dict[str, Optional[str]]:
+    """{view name: its patient column} for every view in views/"""
+    view_files = discover_views(VIEWS_DIR, None)
+    analyses = analyze_files(sorted(view_files.values()))
+    return {
+        analysis['view'].split('.')[-1]: patient_column(analysis['output_columns'])
+        for analysis in analyses.values() if analysis['view']
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Extract view rows for a cohort of patients in batched queries')
+    parser.add_argument('views', nargs='+', help='Views to extract, by view or file name')
+    parser.add_argument('--patients', type=Path, required=True,
+                        help="File with one patient ID per line ('Patient/' prefixes are stripped)")
+    parser.add_argument('--columns', type=lambda s: [c.strip() for c in s.split(',') if c.strip()],
+                        help='Comma-separated columns to extract (default: all)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'Patients per query (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--max-concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help=f'Chunk queries in flight per view (default: {DEFAULT_MAX_CONCURRENCY})')
+    parser.add_argument('--output-dir', type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help=f'Directory for <view>.jsonl files (default: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--timeout', type=float, default=600.0,
+                        help='Per-query timeout in seconds (default: 600)')
+    parser.add_argument('--local', action='store_true',
+                        help='Extract from a local DuckDB built from fixtures/ instead of Athena')
+    parser.add_argument('--fixtures', type=Path,
+                        help='Fixture directory for --local, e.g. generate_synthetic_fhir.py output')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    try:
+        patient_ids = normalize_patient_ids(args.patients.read_text().splitlines())
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    key_columns = view_patient_columns()
+    by_file = {path.name: name for name, path in discover_views(VIEWS_DIR, None).items()}
+    views = []
+    for view in args.views:
+        name = by_file.get(Path(view).name, view)
+        if name not in key_columns:
+            print(f"❌ Unknown view: {view}")
+            sys.exit(1)
+        if not key_columns[name]:
+            print(f"❌ {name} has no patient_fhir_id / patient_id column")
+            sys.exit(1)
+        views.append(name)
+
+    if args.local:
+        from local_engine import FIXTURES_DIR, LOCAL_POLL_INTERVAL, create_local_environment
+        client = create_local_environment(args.fixtures or FIXTURES_DIR)
+        runner = AthenaQueryRunner(client, timeout=args.timeout, initial_interval=LOCAL_POLL_INTERVAL)
+    else:
+        client = create_athena_client()
+        runner = AthenaQueryRunner(client, timeout=args.timeout, metrics=QueryMetricsLog())
+
+    chunks = -(-len(patient_ids) // args.chunk_size)
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 80)
+    print(f"COHORT EXTRACT: {len(patient_ids)} patients x {len(views)} view(s), "
+          f"{chunks} chunk(s) of up to {args.chunk_size} per view")
+    print("=" * 80)
+
+    failed = []
+    with runner:
+        for view in views:
+            started = time.monotonic()
+            path = args.output_dir / f'{view}.jsonl'
+            with_rows = 0
+            total_rows = 0
+            try:
+                with open(path, 'w') as f:
+                    for patient_id, rows in iter_cohort(runner, view, patient_ids, key_columns[view],
+                                                        args.columns, args.chunk_size, args.max_concurrency):
+                        f.write(json.dumps({'patient_id': patient_id, 'rows': rows}, default=str) + '\n')
+                        with_rows += bool(rows)
+                        total_rows += len(rows)
+            except QueryFailedError as e:
+                print(f"❌ {view}: FAILED - {e.reason}")
+                failed.append(view)
+                continue
+            except QueryTimeoutError:
+                print(f"⏱️  {view}: TIMEOUT after {args.timeout:.0f}s")
+                failed.append(view)
+                continue
+
+            print(f"✅ {view}: {total_rows} rows for {with_rows}/{len(patient_ids)} patients "
+                  f"in {time.monotonic() - started:.1f}s -> {path}")
+
+    print(f"\n{'=' * 80}")
+    print(f"Queries: {chunks * len(views)} (one per chunk per view)")
+    if failed:
+        print(f"❌ Failed views: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,675 @@
+#!/usr/bin/env python3
+"""
+Column-level lineage for views/*.sql and the saved queries.
+
+sql_analyzer.py knows which tables a view reads; this maps every output
+column of every CTE, subquery and view to the columns it is computed from,
+and from there to the columns and filters that read it downstream. A column
+is "read" when something that is itself read derives from it, or when a
+WHERE / ON / GROUP BY / HAVING / ORDER BY clause, a DISTINCT select or an
+UNNEST uses it. Starting from what the consumers read, liveness is propagated
+back through every view and CTE. What is left unread can be dropped without
+changing any result in this repo.
+
+Consumers are the saved-query .sql files, any --consumers files, and (unless
+--no-external) every view nothing in the repo reads, whose columns are
+assumed to be read by clients outside it. v_chemo_treatment_episodes, for
+instance, is terminal, so its columns count as read. Passthrough columns of
+its CTEs that its final SELECT never uses are still unread, and so are the
+v_chemo_medications columns that reach it only through them.
+
+Each unread computed column gets a per-row cost estimate in lint_views.py's
+units (one unit is one pass over a string value): 1 per date parse, LIKE,
+string function, || or CAST to varchar/JSON/date, 2 per regexp_* call, 1 per
+non-literal ARRAY[] element and MAP(), 5 per window function and 10 per
+scalar subquery. UNION ALL branches add up. Costs of unread CTE columns that
+only fed an unread column are listed on their own rows.
+
+The resolution is name-based and errs toward "read": an unqualified column
+that could come from several relations counts as read from all of them, and
+SELECT * from a base table reads every column.
+
+Usage:
+    python3 column_lineage.py                             # unread computed columns, ranked by cost
+    python3 column_lineage.py --passthrough               # include unread passthrough/constant columns
+    python3 column_lineage.py v_chemo_medications.medication_name   # sources and consumers of one column
+    python3 column_lineage.py --no-external               # terminal views' columns are not assumed read
+    python3 column_lineage.py --consumers reports/*.sql   # more SQL that reads the views
+    python3 column_lineage.py --json > lineage.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from deploy_views import VIEWS_DIR, build_dependency_graph, discover_views, topological_levels
+from lint_views import EXPORT_FILE, REPO_DIR
+from sql_analyzer import (
+    DATE_PARSE_FUNCTIONS, ISO8601_FUNCTIONS, SET_OPERATORS, bracket_depths, identifier_name,
+    item_alias, matching_close, parse_ctes, render, select_items, split_args, tokenize,
+)
+
+# (scope id, column); scope ids are 'view:<name>', 'table:<name>' or '<file>:<local key>'
+Ref = Tuple[str, str]
+
+# Words that are never column references
+KEYWORDS = {
+    'SELECT', 'FROM', 'WHERE', 'GROUP', 'BY', 'HAVING', 'ORDER', 'LIMIT', 'OFFSET', 'FETCH', 'WITH',
+    'RECURSIVE', 'AS', 'ON', 'USING', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'FULL', 'CROSS',
+    'NATURAL', 'LATERAL', 'UNNEST', 'ORDINALITY', 'VALUES', 'UNION', 'EXCEPT', 'INTERSECT', 'ALL',
+    'DISTINCT', 'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'AND', 'OR', 'NOT', 'IS', 'IN', 'LIKE',
+    'ESCAPE', 'BETWEEN', 'EXISTS', 'NULL', 'TRUE', 'FALSE', 'OVER', 'PARTITION', 'ASC', 'DESC',
+    'NULLS', 'FIRST', 'LAST', 'ROWS', 'RANGE', 'UNBOUNDED', 'PRECEDING', 'FOLLOWING', 'CURRENT',
+    'ROW', 'FILTER', 'WITHIN', 'IGNORE', 'RESPECT', 'INTERVAL', 'AT', 'TIME', 'ZONE', 'YEAR',
+    'QUARTER', 'MONTH', 'WEEK', 'DAY', 'HOUR', 'MINUTE', 'SECOND', 'CURRENT_DATE', 'CURRENT_TIME',
+    'CURRENT_TIMESTAMP', 'LOCALTIME', 'LOCALTIMESTAMP', 'VARCHAR', 'CHAR', 'VARBINARY', 'JSON',
+    'BOOLEAN', 'TINYINT', 'SMALLINT', 'INTEGER', 'INT', 'BIGINT', 'REAL', 'DOUBLE', 'DECIMAL',
+    'DATE', 'TIMESTAMP', 'ARRAY', 'MAP', 'CREATE', 'REPLACE', 'VIEW', 'TABLE', 'INSERT', 'INTO',
+    'WINDOW', 'QUALIFY',
+}
+
+# Words that end a FROM clause at its own depth
+FROM_CLAUSE_END = {'WHERE', 'GROUP', 'HAVING', 'ORDER', 'LIMIT', 'OFFSET', 'FETCH', 'WINDOW', 'QUALIFY'}
+
+# Per-row cost units, as in lint_views.py
+STRING_FUNCTIONS = {
+    'LOWER', 'UPPER', 'TRIM', 'LTRIM', 'RTRIM', 'REPLACE', 'SUBSTR', 'SUBSTRING', 'SPLIT', 'SPLIT_PART',
+    'CONCAT', 'LPAD', 'RPAD', 'STRPOS', 'LENGTH', 'REVERSE', 'ARRAY_JOIN', 'LISTAGG', 'JSON_EXTRACT',
+    'JSON_EXTRACT_SCALAR', 'JSON_FORMAT', 'JSON_PARSE', 'FORMAT_DATETIME', 'DATE_FORMAT', 'TO_ISO8601',
+} | DATE_PARSE_FUNCTIONS | ISO8601_FUNCTIONS
+REGEXP_FUNCTIONS = {'REGEXP_LIKE', 'REGEXP_EXTRACT', 'REGEXP_EXTRACT_ALL', 'REGEXP_REPLACE', 'REGEXP_SPLIT'}
+CAST_COST_TYPES = {'VARCHAR', 'CHAR', 'JSON', 'DATE', 'TIMESTAMP'}
+REGEXP_COST = 2
+WINDOW_COST = 5
+SUBQUERY_COST = 10
+
+def consumer_files() -> List[Path]:
+    """The saved-query .sql files at the top level"""
+    return [path for path in sorted(REPO_DIR.glob('*.sql')) if path != EXPORT_FILE]
+
+def scope_label(scope_id: str) -> str:
+    """'view:v_x' -> 'v_x', 'f.sql:cte:base' -> 'f.sql [base]'"""
+    file, _, local = scope_id.partition(':')
+    if file in ('view', 'table'):
+        return local
+    if local.startswith('cte:'):
+        return f"{file} [{local[4:]}]"
+    if local.startswith('main'):
+        return file
+    kind, line = local.split(':')[:2]
+    return f"{file} [{kind} line {line}]"
+
+def node_label(node: Ref) -> str:
+    return f"{scope_label(node[0])}.{node[1]}"
+
+class FileLineage:
+    """Parse one SQL file into scopes: {'columns': {name: {...}}, 'reads', 'kind', 'distinct'}"""
+
+    def __init__(self, file: str, sql: str, main_id: Optional[str], scopes: Dict[str, Dict]):
+        self.file = file
+        self.tokens = tokenize(sql)
+        self.depths = bracket_depths(self.tokens)
+        self.scopes = scopes           # shared across files; upstream views are already in it
+        self.aliases: Dict[str, str] = {}   # every alias in the file, for correlated references
+
+        self.ctes = parse_ctes(self.tokens, self.depths)
+        self.cte_ids = {name: f"{file}:cte:{name}" for name, _, _ in self.ctes}
+        self.items: Dict[int, List[Tuple[int, int]]] = {}
+        for select_idx, start, end in select_items(self.tokens, self.depths):
+            self.items.setdefault(select_idx, []).append((start, end))
+
+        # scope id -> (start, end, depth) of its query expression
+        self.ranges: Dict[str, Tuple[int, int, int]] = {}
+        for name, open_idx, close_idx in self.ctes:
+            self.ranges[self.cte_ids[name]] = (open_idx + 1, close_idx, self.depths[open_idx] + 1)
+        cte_bodies = {open_idx for _, open_idx, _ in self.ctes}
+        self.subqueries: Dict[int, int] = {}
+        for i, token in enumerate(self.tokens):
+            if (token.value == '(' and i not in cte_bodies and i + 1 < len(self.tokens)
+                    and self.tokens[i + 1].word in ('SELECT', 'WITH')):
+                close = matching_close(self.tokens, self.depths, i)
+                self.subqueries[i] = close
+                self.ranges[self._subquery_id(i)] = (i + 1, close, self.depths[i] + 1)
+
+        # Top-level statements; the one creating the view is the view's scope
+        start = 0
+        statement = 0
+        for i in range(len(self.tokens) + 1):
+            if i == len(self.tokens) or (self.tokens[i].value == ';' and self.depths[i] == 0):
+                if any(self.tokens[k].word == 'SELECT' and self.depths[k] == 0 for k in range(start, i)):
+                    statement += 1
+                    scope_id = main_id if main_id and statement == 1 else f"{file}:main{statement}"
+                    self.ranges[scope_id] = (start, i, 0)
+                start = i + 1
+
+        self.processing: Set[str] = set()
+        for scope_id in self.ranges:
+            self.process(scope_id)
+
+    def _subquery_id(self, open_idx: int) -> str:
+        return f"{self.file}:subquery:{self.tokens[open_idx].line}:{open_idx}"
+
+    def columns_of(self, scope_id: str) -> Optional[List[str]]:
+        """Known output columns of a relation, or None (base table, unexpanded *)"""
+        if scope_id in self.ranges and scope_id not in self.scopes:
+            self.process(scope_id)
+        scope = self.scopes.get(scope_id)
+        if scope is None or not scope['columns'] or '*' in scope['columns']:
+            return None
+        return list(scope['columns'])
+
+    def process(self, scope_id: str):
+        if scope_id in self.scopes or scope_id in self.processing:
+            return
+        self.processing.add(scope_id)
+        start, end, depth = self.ranges[scope_id]
+        tokens = self.tokens
+
+        # Branches of a UNION: SELECT ... up to the next set operator at this depth
+        branches = []
+        distinct = False
+        for i in range(start, end):
+            if self.depths[i] != depth:
+                continue
+            if tokens[i].word == 'SELECT':
+                branches.append([i, end])
+                distinct = distinct or (i + 1 < end and tokens[i + 1].word == 'DISTINCT')
+            elif tokens[i].word in SET_OPERATORS and branches:
+                branches[-1][1] = i
+                distinct = distinct or tokens[i + 1].word != 'ALL'
+
+        columns: Dict[str, Dict] = {}
+        reads: Set[Ref] = set()
+        windows: List[Dict] = []
+        limit = any(tokens[i].word in ('LIMIT', 'FETCH') and self.depths[i] == depth for i in range(start, end))
+        for branch, (select_idx, branch_end) in enumerate(branches):
+            items = self.items.get(select_idx, [])
+            from_idx = items[-1][1] if items else select_idx + 1
+            relations, aliases = self._relations(from_idx, branch_end, depth)
+            resolve = self._resolver(relations, aliases)
+
+            outputs = []
+            for item_start, item_end in items:
+                outputs.extend(self._item_columns(item_start, item_end, relations, aliases, resolve))
+                windows.extend(self._windows(item_start, item_end, resolve, aliases))
+            refs, _ = self._expression(from_idx, branch_end, resolve, aliases)
+            reads |= refs
+
+            for position, (name, column) in enumerate(outputs):
+                if branch == 0:
+                    columns[name] = column
+                    continue
+                if position >= len(columns):
+                    break
+                merged = columns[list(columns)[position]]
+                merged['refs'] |= column['refs']
+                merged['cost'] += column['cost']
+                if column['kind'] == 'computed' or (column['kind'] == 'passthrough' and merged['kind'] == 'constant'):
+                    merged['kind'] = column['kind']
+
+        self.scopes[scope_id] = {
+            'file': self.file,
+            'kind': 'cte' if ':cte:' in scope_id else 'expression' if ':subquery:' in scope_id else 'query',
+            'columns': columns,
+            'reads': reads,
+            'distinct': distinct,
+            'windows': windows,
+            'limit': limit,
+        }
+        self.processing.discard(scope_id)
+
+    def _relations(self, from_idx: int, end: int, depth: int) -> Tuple[List[str], Dict[str, str]]:
+        """Scope ids of the relations in a FROM clause, and alias -> scope id"""
+        tokens = self.tokens
+        relations: List[str] = []
+        aliases: Dict[str, str] = {}
+        expect = False
+        j = from_idx
+        while j < end:
+            token = tokens[j]
+            if self.depths[j] != depth:
+                j += 1
+                continue
+            if token.word in ('FROM', 'JOIN') or token.value == ',':
+                expect = True
+                j += 1
+                continue
+            if token.word in FROM_CLAUSE_END or token.word in SET_OPERATORS:
+                break
+            if not expect:
+                j += 1
+                continue
+            expect = False
+
+            default_alias = None
+            args = None
+            if token.word == 'LATERAL':
+                j += 1
+                token = tokens[j]
+            if token.value == '(' and j in self.subqueries:
+                scope_id = self._subquery_id(j)
+                self.process(scope_id)
+                self.scopes[scope_id]['kind'] = 'subquery'
+                j = self.subqueries[j] + 1
+            elif token.value == '(' or token.word == 'UNNEST':
+                # UNNEST(...) or (VALUES ...): columns named by the alias column list
+                open_idx = j + 1 if token.word == 'UNNEST' else j
+                close = matching_close(tokens, self.depths, open_idx)
+                scope_id = f"{self.file}:{'unnest' if token.word == 'UNNEST' else 'values'}:{token.line}:{j}"
+                args = (open_idx + 1, close) if token.word == 'UNNEST' else None
+                j = close + 1
+                if j + 1 < end and tokens[j].word == 'WITH' and tokens[j + 1].word == 'ORDINALITY':
+                    j += 2
+            elif token.kind in ('ident', 'quoted'):
+                parts = [identifier_name(token)]
+                j += 1
+                while j + 1 < end and tokens[j].value == '.' and tokens[j + 1].kind in ('ident', 'quoted'):
+                    parts.append(identifier_name(tokens[j + 1]))
+                    j += 2
+                name = '.'.join(parts)
+                if name in self.cte_ids:
+                    scope_id = self.cte_ids[name]
+                elif f"view:{parts[-1]}" in self.scopes:
+                    scope_id = f"view:{parts[-1]}"
+                else:
+                    scope_id = f"table:{name}"
+                default_alias = parts[-1]
+                aliases[name] = scope_id
+            else:
+                j += 1
+                continue
+
+            alias = default_alias
+            if j < end and tokens[j].word == 'AS':
+                j += 1
+            if j < end and tokens[j].kind in ('ident', 'quoted') and tokens[j].word not in KEYWORDS:
+                alias = identifier_name(tokens[j])
+                j += 1
+            column_list = []
+            if j < end and tokens[j].value == '(' and ':subquery:' not in scope_id and not scope_id.startswith(('view:', 'table:')):
+                close = matching_close(tokens, self.depths, j)
+                column_list = [identifier_name(tokens[k]) for k in range(j + 1, close)
+                               if tokens[k].kind in ('ident', 'quoted')]
+                j = close + 1
+
+            if ':unnest:' in scope_id or ':values:' in scope_id:
+                names = column_list or ([alias] if alias else [])
+                refs = set()
+                if args:
+                    refs, _ = self._expression(args[0], args[1], self._resolver(relations, aliases), aliases)
+                self.scopes[scope_id] = {
+                    'file': self.file, 'kind': 'subquery', 'reads': set(), 'distinct': False,
+                    'windows': [], 'limit': False,
+                    'columns': {name: {'line': token.line, 'kind': 'passthrough' if refs else 'constant',
+                                       'cost': 0, 'refs': set(refs),
+                                       'expression': render(tokens, args[0], args[1]) if args else ''}
+                                for name in names},
+                }
+
+            relations.append(scope_id)
+            if alias:
+                aliases[alias] = scope_id
+                self.aliases.setdefault(alias, scope_id)
+
+        return relations, aliases
+
+    def _resolver(self, relations: List[str], aliases: Dict[str, str]) -> Callable[[str], Set[Ref]]:
+        def resolve(name: str) -> Set[Ref]:
+            """Relations an unqualified column can come from; all of them when unsure"""
+            known = {scope_id: self.columns_of(scope_id) for scope_id in relations}
+            hits = {(scope_id, name) for scope_id, columns in known.items() if columns and name in columns}
+            if hits:
+                return hits
+            return {(scope_id, name) for scope_id, columns in known.items() if columns is None}
+        return resolve
+
+    def _expression(self, start: int, end: int, resolve: Callable[[str], Set[Ref]],
+                    aliases: Dict[str, str]) -> Tuple[Set[Ref], int]:
+        """Column references and per-row cost of tokens[start:end]"""
+        tokens = self.tokens
+        refs: Set[Ref] = set()
+        lambdas: Set[str] = set()
+        cost = 0
+        k = start
+        while k < end:
+            token = tokens[k]
+            if token.value == '(' and k in self.subqueries:
+                # Scalar / IN / EXISTS subqueries are scopes of their own
+                cost += SUBQUERY_COST
+                k = self.subqueries[k] + 1
+                continue
+            nxt = tokens[k + 1] if k + 1 < end else None
+
+            if token.kind == 'ident' and nxt is not None and nxt.value in ('(', '[') and tokens[k - 1].value != '.':
+                cost += self._call_cost(k)
+                k += 1
+                continue
+            if token.word in ('LIKE', 'ILIKE') or token.value == '||':
+                cost += 1
+            elif token.word == 'OVER':
+                cost += WINDOW_COST
+
+            if token.kind not in ('ident', 'quoted') or (token.kind == 'ident' and token.word in KEYWORDS):
+                k += 1
+                continue
+            if k > 0 and (tokens[k - 1].value == '.' or tokens[k - 1].word == 'AS'):
+                k += 1
+                continue
+            name = identifier_name(token)
+            if name in aliases and (nxt is None or nxt.value != '.'):
+                # A relation name or alias in a FROM clause
+                k += 1
+                continue
+            if nxt is not None and nxt.value == '->':
+                lambdas.add(name)
+                k += 1
+                continue
+            if name in lambdas:
+                k += 1
+                continue
+
+            if nxt is not None and nxt.value == '.' and k + 2 < end and tokens[k + 2].kind in ('ident', 'quoted'):
+                column = identifier_name(tokens[k + 2])
+                k += 3
+                qualified = f"{name}.{column}"
+                if qualified in aliases:
+                    if k + 1 < end and tokens[k].value == '.':
+                        # database.table.column
+                        refs.add((aliases[qualified], identifier_name(tokens[k + 1])))
+                        k += 2
+                elif name in aliases:
+                    refs.add((aliases[name], column))
+                elif name in self.aliases:
+                    refs.add((self.aliases[name], column))
+                else:
+                    refs |= resolve(name)   # struct field access
+                while k + 1 < end and tokens[k].value == '.':
+                    k += 2
+                continue
+
+            refs |= resolve(name)
+            k += 1
+        return refs, cost
+
+    def _call_cost(self, idx: int) -> int:
+        """Cost of the function call or ARRAY[] at tokens[idx] itself, not of its arguments"""
+        tokens, depths = self.tokens, self.depths
+        word = tokens[idx].word
+        if word in STRING_FUNCTIONS:
+            return 1
+        if word in REGEXP_FUNCTIONS:
+            return REGEXP_COST
+        if word == 'MAP':
+            return 1
+        if word == 'ARRAY' and tokens[idx + 1].value == '[':
+            close = matching_close(tokens, depths, idx + 1)
+            return sum(1 for s, e in split_args(tokens, depths, idx + 1, close)
+                       if not (e - s == 1 and tokens[s].kind in ('string', 'number')))
+        if word in ('CAST', 'TRY_CAST'):
+            open_idx = idx + 1
+            close = matching_close(tokens, depths, open_idx)
+            inner = depths[open_idx] + 1
+            for k in range(close - 1, open_idx, -1):
+                if depths[k] == inner and tokens[k].word == 'AS':
+                    if k == open_idx + 2 and tokens[open_idx + 1].word == 'NULL':
+                        return 0
+                    return 1 if k + 1 < close and tokens[k + 1].word in CAST_COST_TYPES else 0
+        return 0
+
+    def _item_columns(self, start: int, end: int, relations: List[str], aliases: Dict[str, str],
+                      resolve: Callable[[str], Set[Ref]]) -> List[Tuple[str, Dict]]:
+        """Output columns of one select item; * expands to the relation's known columns"""
+        tokens = self.tokens
+        line = tokens[start].line
+        alias = item_alias(tokens, start, end)
+
+        if alias == '*':
+            if end - start == 3 and identifier_name(tokens[start]) in aliases:
+                sources = [aliases[identifier_name(tokens[start])]]
+            else:
+                sources = relations
+            columns = []
+            for scope_id in sources:
+                known = self.columns_of(scope_id)
+                for name in known or ['*']:
+                    columns.append((name, {'line': line, 'kind': 'passthrough', 'cost': 0, 'refs': {(scope_id, name)},
+                                           'expression': render(tokens, start, end)}))
+            return columns
+
+        expression_end = end
+        if alias is not None:
+            if end - start >= 2 and tokens[end - 2].word == 'AS':
+                expression_end = end - 2
+            elif end - start >= 2 and tokens[end - 2].value != '.':
+                expression_end = end - 1
+        refs, cost = self._expression(start, expression_end, resolve, aliases)
+
+        length = expression_end - start
+        bare = length == 1 or (length == 3 and tokens[start + 1].value == '.')
+        if not refs:
+            kind = 'constant'
+        elif bare and tokens[start].kind in ('ident', 'quoted'):
+            kind = 'passthrough'
+        else:
+            kind = 'computed'
+        name = alias or f"_col{line}_{start}"
+        return [(name, {'line': line, 'kind': kind, 'cost': cost, 'refs': refs,
+                        'expression': render(tokens, start, expression_end)})]
+
+    def _windows(self, start: int, end: int, resolve: Callable[[str], Set[Ref]],
+                 aliases: Dict[str, str]) -> List[Dict]:
+        """Window functions of a select item: {'line', 'text', 'partition' (column references)}"""
+        tokens, depths = self.tokens, self.depths
+        windows = []
+        for k in range(start, end - 1):
+            if tokens[k].word != 'OVER' or tokens[k + 1].value != '(':
+                continue
+            if any(start <= open_idx < k < close for open_idx, close in self.subqueries.items()):
+                continue
+            close = matching_close(tokens, depths, k + 1)
+            partition: Set[Ref] = set()
+            for m in range(k + 2, close - 1):
+                if tokens[m].word == 'PARTITION' and tokens[m + 1].word == 'BY' and depths[m] == depths[k + 1] + 1:
+                    stop = next((n for n in range(m + 2, close) if depths[n] == depths[m]
+                                 and tokens[n].word in ('ORDER', 'ROWS', 'RANGE', 'GROUPS')), close)
+                    partition, _ = self._expression(m + 2, stop, resolve, aliases)
+                    break
+            windows.append({'line': tokens[k].line, 'text': render(tokens, k, close + 1), 'partition': partition})
+        return windows
+
+def build_lineage(view_files: Dict[str, Path], consumers: Iterable[Path]) -> Tuple[Dict[str, Dict], Set[str]]:
+    """
+    Scopes of every view file (upstream views first) and consumer file;
+    returns (scopes, ids of the consumer files' top-level scopes)
+    """
+    scopes: Dict[str, Dict] = {}
+    for level in topological_levels(build_dependency_graph(view_files)):
+        for view in level:
+            path = view_files[view]
+            FileLineage(path.name, path.read_text(), f"view:{view}", scopes)
+
+    consumer_scopes = set()
+    for path in consumers:
+        before = set(scopes)
+        FileLineage(path.name, path.read_text(), None, scopes)
+        consumer_scopes |= {scope_id for scope_id in set(scopes) - before if ':main' in scope_id}
+    return scopes, consumer_scopes
+
+def expand_ref(scopes: Dict[str, Dict], ref: Ref) -> List[Ref]:
+    """Nodes a reference reads: the column, the scope's * output, or every column for *"""
+    scope = scopes.get(ref[0])
+    if scope is None:
+        return []
+    if ref[1] == '*':
+        return [(ref[0], column) for column in scope['columns']]
+    if ref[1] in scope['columns']:
+        return [ref]
+    if '*' in scope['columns']:
+        return [(ref[0], '*')]
+    return []
+
+def readers_by_view(scopes: Dict[str, Dict]) -> Dict[str, Set[str]]:
+    """view -> files that reference it"""
+    readers: Dict[str, Set[str]] = {}
+    for scope in scopes.values():
+        refs = set(scope['reads'])
+        for column in scope['columns'].values():
+            refs |= column['refs']
+        for scope_id, _ in refs:
+            if scope_id.startswith('view:') and scopes[scope_id]['file'] != scope['file']:
+                readers.setdefault(scope_id[5:], set()).add(scope['file'])
+    return readers
+
+def live_columns(scopes: Dict[str, Dict], roots: Set[Ref]) -> Set[Ref]:
+    """Every column read, transitively, from roots and from the filters of every scope"""
+    stack = list(roots)
+    for scope_id, scope in scopes.items():
+        stack.extend(scope['reads'])
+        if scope['kind'] == 'expression' or scope['distinct']:
+            stack.extend((scope_id, column) for column in scope['columns'])
+
+    live: Set[Ref] = set()
+    while stack:
+        for node in expand_ref(scopes, stack.pop()):
+            if node not in live:
+                live.add(node)
+                stack.extend(scopes[node[0]]['columns'][node[1]]['refs'])
+    return live
+
+def consumers_of(scopes: Dict[str, Dict]) -> Dict[Ref, Set[str]]:
+    """node -> labels of the columns and filters that read it directly"""
+    consumers: Dict[Ref, Set[str]] = {}
+    for scope_id, scope in scopes.items():
+        for ref in scope['reads']:
+            for node in expand_ref(scopes, ref):
+                consumers.setdefault(node, set()).add(f"{scope_label(scope_id)} (filter/join)")
+        for column, info in scope['columns'].items():
+            for ref in info['refs']:
+                for node in expand_ref(scopes, ref):
+                    consumers.setdefault(node, set()).add(node_label((scope_id, column)))
+    return consumers
+
+def print_sources(scopes: Dict[str, Dict], node: Ref, indent: int = 1, seen: Optional[Set[Ref]] = None):
+    seen = set() if seen is None else seen
+    for ref in sorted(scopes[node[0]]['columns'][node[1]]['refs']):
+        nodes = expand_ref(scopes, ref)
+        if not nodes:
+            print(f"{'   ' * indent}{node_label(ref)}")
+            continue
+        for source in nodes:
+            info = scopes[source[0]]['columns'][source[1]]
+            repeated = ' (see above)' if source in seen else ''
+            print(f"{'   ' * indent}{node_label(source)}  [{info['kind']}]{repeated}")
+            if not repeated:
+                seen.add(source)
+                print_sources(scopes, source, indent + 1, seen)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Column-level lineage and unread columns of the views')
+    parser.add_argument('column', nargs='?', help='Show sources and consumers of VIEW.COLUMN')
+    parser.add_argument('--consumers', nargs='+', type=Path, default=[],
+                        help='More SQL files that read the views (saved queries are always included)')
+    parser.add_argument('--no-external', action='store_true',
+                        help='Do not assume columns of views nothing in the repo reads are read externally')
+    parser.add_argument('--keep', nargs='+', default=[], metavar='VIEW.COLUMN',
+                        help='Columns read outside the repo; VIEW.* keeps a whole view')
+    parser.add_argument('--passthrough', action='store_true',
+                        help='Also list unread passthrough and constant columns')
+    parser.add_argument('--json', action='store_true', help='Print every column with its lineage as JSON')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    view_files = discover_views(VIEWS_DIR, None)
+    scopes, consumer_scopes = build_lineage(view_files, consumer_files() + args.consumers)
+    readers = readers_by_view(scopes)
+    terminal = sorted(view for view in view_files if not readers.get(view))
+
+    roots: Set[Ref] = {(scope_id, '*') for scope_id in consumer_scopes}
+    if not args.no_external:
+        roots |= {(f"view:{view}", '*') for view in terminal}
+    for keep in args.keep:
+        view, _, column = keep.partition('.')
+        if f"view:{view}" not in scopes:
+            print(f"❌ Unknown view: {view}")
+            sys.exit(1)
+        roots.add((f"view:{view}", column or '*'))
+    live = live_columns(scopes, roots)
+
+    if args.column:
+        view, _, column = args.column.partition('.')
+        node = (f"view:{view}", column)
+        if view not in view_files or column not in scopes[node[0]]['columns']:
+            print(f"❌ Unknown view column: {args.column}")
+            sys.exit(1)
+        info = scopes[node[0]]['columns'][column]
+        print(f"{args.column}  [{info['kind']}, cost {info['cost']}, {view_files[view].name}:{info['line']}]"
+              f"  {'read' if node in live else 'UNREAD'}")
+        print("\nSources:")
+        print_sources(scopes, node)
+        print("\nRead by:")
+        direct = sorted(consumers_of(scopes).get(node, ()))
+        for label in direct:
+            print(f"   {label}")
+        if not direct:
+            print(f"   {'nothing in the repo; ' if view in terminal else ''}"
+                  f"{'assumed read externally' if view in terminal and not args.no_external else 'unread'}")
+        return
+
+    unread = []
+    for scope_id, scope in scopes.items():
+        if scope_id in consumer_scopes or scope['file'] not in {path.name for path in view_files.values()}:
+            continue
+        for column, info in scope['columns'].items():
+            if (scope_id, column) not in live and (args.passthrough or info['kind'] == 'computed'):
+                unread.append((scope_id, column, info))
+
+    if args.json:
+        consumers = consumers_of(scopes)
+        json.dump({
+            'terminal_views': terminal,
+            'columns': [
+                {'scope': scope_label(scope_id), 'file': scope['file'], 'column': column, 'line': info['line'],
+                 'kind': info['kind'], 'cost': info['cost'], 'expression': info['expression'],
+                 'read': (scope_id, column) in live,
+                 'sources': sorted(node_label(ref) for ref in info['refs']),
+                 'consumers': sorted(consumers.get((scope_id, column), ()))}
+                for scope_id, scope in scopes.items() for column, info in scope['columns'].items()
+            ],
+        }, sys.stdout, indent=2)
+        print()
+        return
+
+    by_file: Dict[str, List] = {}
+    for scope_id, column, info in unread:
+        by_file.setdefault(scopes[scope_id]['file'], []).append((scope_id, column, info))
+    ranked = sorted(by_file.items(), key=lambda item: (-sum(i['cost'] for _, _, i in item[1]), item[0]))
+    view_of = {path.name: view for view, path in view_files.items()}
+
+    print("=" * 100)
+    print(f"UNREAD {'' if args.passthrough else 'COMPUTED '}VIEW COLUMNS "
+          f"({len(consumer_scopes)} consumer quer{'y' if len(consumer_scopes) == 1 else 'ies'}, "
+          f"{'external reads ignored' if args.no_external else f'{len(terminal)} terminal view(s) assumed read'})")
+    print("=" * 100)
+
+    for file, columns in ranked:
+        view = view_of[file]
+        read_by = sorted(readers.get(view, ()))
+        print(f"\n📝 {file}  (cost {sum(i['cost'] for _, _, i in columns)}/row, {len(columns)} column(s); "
+              f"read by {', '.join(read_by) if read_by else 'nothing in the repo'})")
+        for scope_id, column, info in sorted(columns, key=lambda c: (-c[2]['cost'], c[2]['line'])):
+            where = 'output' if scope_id.startswith('view:') else scope_label(scope_id)[len(file) + 1:] or 'query'
+            print(f"   {info['line']:>5}  {where:<40} {column:<45} {info['kind']:<12} {info['cost']:>4}")
+
+    print(f"\n{'=' * 100}")
+    print(f"SUMMARY: {len(unread)} unread column(s) in {len(by_file)} view(s), "
+          f"total cost {sum(info['cost'] for _, _, info in unread)} per row")
+    print("=" * 100)
+    if terminal and not args.no_external:
+        print(f"⏭️  Assumed read externally: {', '.join(terminal)}")
+
+if __name__ == '__main__':
+    main()
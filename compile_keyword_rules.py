@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Compile keyword_rules.json into the classification CASEs of the views.
+
+The timeline and hydrocephalus views classify free text with chains of
+LIKE '%keyword%' comparisons, one substring scan per keyword. The keyword
+rules now live in one versioned file, keyword_rules.json: named rule sets,
+each an ordered list of categories with their keywords and a default.
+Keywords use LIKE syntax without the surrounding '%' ('vp%shunt').
+
+Each category compiles to a single regexp_like alternation, so a CASE does
+one scan per category instead of one per keyword:
+
+    -- keyword_rules: shunt_type(LOWER(p.code_text))
+    CASE
+        WHEN regexp_like(LOWER(p.code_text), '(?s)ventriculoperitoneal|vp.*shunt|v-p.*shunt|vps') THEN 'VPS'
+        ...
+        ELSE 'Other'
+    END as shunt_type,
+
+The marker comment names the rule set and the subject expression; the CASE
+that follows it is regenerated. Matching is exactly that of the LIKE chain it
+replaces: the subject keeps its own LOWER() where the view lower-cases, and
+NULL subjects fall through to the default as before.
+
+The compiled rules are also written to views/v_keyword_rules.sql, deployed
+with the other views, so ad-hoc queries can classify with the same rules:
+
+    SELECT ... FROM t JOIN fhir_prd_db.v_keyword_rules r
+        ON r.rule_set = 'shunt_type' AND regexp_like(LOWER(t.code_text), r.pattern)
+
+Usage:
+    python3 compile_keyword_rules.py --dry-run     # show a unified diff
+    python3 compile_keyword_rules.py               # rewrite marked CASEs and v_keyword_rules.sql
+    python3 compile_keyword_rules.py --check       # exit 1 if anything is out of date
+"""
+
+import argparse
+import difflib
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sql_analyzer import VIEWS_DIR, tokenize
+
+RULES_FILE = Path(__file__).parent / 'keyword_rules.json'
+RULES_VIEW = 'v_keyword_rules'
+
+MARKER_PATTERN = re.compile(r'^([ \t]*)--[ \t]*keyword_rules:[ \t]*(\w+)\((.+)\)[ \t]*$', re.MULTILINE)
+
+REGEX_METACHARACTERS = set('\\.^$|?*+()[]{}')
+
+def load_rules(path: Path = RULES_FILE) -> Dict:
+    """Read and sanity-check the rules file"""
+    rules = json.loads(path.read_text())
+    if not isinstance(rules.get('version'), int):
+        raise ValueError(f"{path.name}: 'version' must be an integer")
+    for name, rule_set in rules['rule_sets'].items():
+        if not rule_set.get('categories'):
+            raise ValueError(f"{path.name}: rule set {name} has no categories")
+        for category in rule_set['categories']:
+            if not category.get('keywords'):
+                raise ValueError(f"{path.name}: {name}/{category['category']} has no keywords")
+    return rules
+
+def keyword_regex(keyword: str) -> str:
+    """Translate a LIKE fragment into a regex matching anywhere in the text"""
+    parts = []
+    for ch in keyword.strip('%'):
+        if ch == '%':
+            parts.append('.*')
+        elif ch == '_':
+            parts.append('.')
+        elif ch in REGEX_METACHARACTERS:
+            parts.append('\\' + ch)
+        else:
+            parts.append(ch)
+    return ''.join(parts)
+
+def category_pattern(keywords: List[str]) -> str:
+    """One alternation for all keywords of a category"""
+    pattern = '|'.join(keyword_regex(keyword) for keyword in keywords)
+    # LIKE's % also matches newlines
+    return '(?s)' + pattern if '.' in pattern.replace('\\.', '') else pattern
+
+def _sql_string(value: Optional[str]) -> str:
+    return 'NULL' if value is None else "'" + value.replace("'", "''") + "'"
+
+def compile_case(rule_set: Dict, subject: str, indent: str) -> str:
+    """The CASE expression for one rule set over subject (first line unindented)"""
+    lines = ['CASE']
+    for category in rule_set['categories']:
+        pattern = category_pattern(category['keywords'])
+        lines.append(f"{indent}    WHEN regexp_like({subject}, {_sql_string(pattern)}) "
+                     f"THEN {_sql_string(category['category'])}")
+    lines.append(f"{indent}    ELSE {_sql_string(rule_set.get('default'))}")
+    lines.append(f"{indent}END")
+    return '\n'.join(lines)
+
+def shadowed_keywords(rule_set: Dict) -> List[Tuple[str, str, str, str]]:
+    """
+    (keyword, category, earlier keyword, earlier category) for keywords that
+    can never decide a row because an earlier category's keyword is a
+    substring of them
+    """
+    shadowed = []
+    for i, category in enumerate(rule_set['categories']):
+        for keyword in category['keywords']:
+            for earlier in rule_set['categories'][:i]:
+                hit = next((k for k in earlier['keywords'] if '%' not in k and '_' not in k and k in keyword), None)
+                if hit:
+                    shadowed.append((keyword, category['category'], hit, earlier['category']))
+                    break
+    return shadowed
+
+def rewrite_sql(sql: str, rules: Dict) -> Tuple[str, List[Dict]]:
+    """
+    Regenerate the CASE after every keyword_rules marker.
+
+    Returns (new_sql, blocks) where blocks describe each marker found
+    (rule_set, subject, line, changed). Raises ValueError on an unknown rule
+    set or a marker not followed by CASE.
+    """
+    tokens = tokenize(sql)
+    blocks = []
+    parts = []
+    last = 0
+
+    for marker in MARKER_PATTERN.finditer(sql):
+        indent, name, subject = marker.group(1), marker.group(2), marker.group(3).strip()
+        line = sql.count('\n', 0, marker.start()) + 1
+        if name not in rules['rule_sets']:
+            raise ValueError(f"line {line}: unknown rule set '{name}'")
+
+        start = next((i for i, t in enumerate(tokens) if t.pos > marker.end()), None)
+        if start is None or tokens[start].word != 'CASE':
+            raise ValueError(f"line {line}: keyword_rules marker must be followed by CASE")
+
+        depth = 0
+        for end in range(start, len(tokens)):
+            if tokens[end].word == 'CASE':
+                depth += 1
+            elif tokens[end].word == 'END':
+                depth -= 1
+                if depth == 0:
+                    break
+        else:
+            raise ValueError(f"line {line}: CASE without END")
+
+        case_start = tokens[start].pos
+        case_end = tokens[end].pos + len(tokens[end].value)
+        replacement = compile_case(rules['rule_sets'][name], subject, indent)
+
+        parts.append(sql[last:case_start])
+        parts.append(replacement)
+        last = case_end
+        blocks.append({'rule_set': name, 'subject': subject, 'line': line,
+                       'changed': sql[case_start:case_end] != replacement})
+
+    parts.append(sql[last:])
+    return ''.join(parts), blocks
+
+def rules_view_sql(rules: Dict, database: str = 'fhir_prd_db') -> str:
+    """CREATE VIEW for the lookup view: one row per category, then the default with a NULL pattern"""
+    rows = []
+    for name, rule_set in rules['rule_sets'].items():
+        categories = rule_set['categories']
+        for priority, category in enumerate(categories, start=1):
+            rows.append((name, priority, category['category'], category_pattern(category['keywords']),
+                         rule_set.get('description')))
+        rows.append((name, len(categories) + 1, rule_set.get('default'), None, rule_set.get('description')))
+
+    values = ',\n'.join(
+        f"    ({_sql_string(name)}, {priority}, {_sql_string(category)}, {_sql_string(pattern)}, "
+        f"{_sql_string(description)}, {rules['version']})"
+        for name, priority, category, pattern, description in rows
+    )
+    return (
+        f"CREATE OR REPLACE VIEW {database}.{RULES_VIEW} AS\n"
+        f"-- Generated by compile_keyword_rules.py from {RULES_FILE.name}; do not edit by hand.\n"
+        f"-- Rows are tried in priority order per rule_set; the NULL-pattern row is the default.\n"
+        f"SELECT rule_set, priority, category, pattern, description, rules_version\n"
+        f"FROM (\n"
+        f"  VALUES\n"
+        f"{values}\n"
+        f") AS rules (rule_set, priority, category, pattern, description, rules_version)\n"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile keyword_rules.json into view classification CASEs')
+    parser.add_argument('files', nargs='*', type=Path,
+                        help='SQL files to rewrite (default: views/*.sql)')
+    parser.add_argument('--rules', type=Path, default=RULES_FILE,
+                        help=f'Rules file (default: {RULES_FILE.name})')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print a unified diff instead of writing files')
+    parser.add_argument('--check', action='store_true',
+                        help='Write nothing; exit 1 if any file is out of date with the rules')
+    args = parser.parse_args()
+
+    rules = load_rules(args.rules)
+    files = args.files or sorted(p for p in VIEWS_DIR.glob('*.sql') if p.stem != RULES_VIEW)
+    write = not (args.dry_run or args.check)
+
+    print("=" * 100)
+    print(f"COMPILING KEYWORD RULES (version {rules['version']}){' (DRY RUN)' if args.dry_run else ''}"
+          f"{' (CHECK)' if args.check else ''}")
+    print("=" * 100)
+
+    for name, rule_set in rules['rule_sets'].items():
+        for keyword, category, hit, earlier in shadowed_keywords(rule_set):
+            print(f"⚠️  {name}: '{keyword}' ({category}) is always caught by '{hit}' ({earlier})")
+
+    outputs = {}
+    used = set()
+    failed = False
+
+    for path in files:
+        sql = path.read_text()
+        try:
+            new_sql, blocks = rewrite_sql(sql, rules)
+        except ValueError as e:
+            print(f"❌ {path.name}: {e}")
+            failed = True
+            continue
+        used.update(block['rule_set'] for block in blocks)
+        if blocks:
+            changed = sum(1 for block in blocks if block['changed'])
+            print(f"📝 {path.name}: {len(blocks)} block(s), {changed} out of date "
+                  f"({', '.join(block['rule_set'] for block in blocks)})")
+        outputs[path] = (sql, new_sql)
+
+    rules_path = VIEWS_DIR / f'{RULES_VIEW}.sql'
+    outputs[rules_path] = (rules_path.read_text() if rules_path.exists() else '', rules_view_sql(rules))
+
+    stale = [path for path, (old, new) in outputs.items() if old != new]
+    for path in stale:
+        old, new = outputs[path]
+        if args.dry_run:
+            sys.stdout.writelines(difflib.unified_diff(
+                old.splitlines(keepends=True), new.splitlines(keepends=True),
+                fromfile=f'a/{path.name}', tofile=f'b/{path.name}'
+            ))
+        elif write:
+            path.write_text(new)
+
+    unused = sorted(set(rules['rule_sets']) - used)
+
+    print(f"\n{'=' * 100}")
+    print(f"SUMMARY: {len(stale)} file(s) {'written' if write else 'out of date'}, "
+          f"{len(used)}/{len(rules['rule_sets'])} rule set(s) used by views")
+    if unused:
+        print(f"⏭️  Only in {RULES_VIEW}: {', '.join(unused)}")
+    print("=" * 100)
+
+    if failed or (args.check and stale):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -3,17 +3,99 @@
 Deploy Athena Views to fhir_prd_db
 
 This script deploys SQL views from the views/ directory to AWS Athena.
+
+The view files deployed are listed in VIEWS_TO_DEPLOY, the set the production
+rollout uses. Files in views/ that are not listed are superseded, not rolled
+out through this script, or do not deploy as they are
+(v_chemotherapy_rxnorm_codes.sql is a placeholder for a generated VALUES list);
+the views they define are expected to exist in the database already. --all-views deploys
+every views/*.sql file instead, the v2_ file winning where two files define the
+same view.
+
+Deployment order is derived from the views themselves: each file is scanned
+for fhir_prd_db.v_*/v2_* references, the resulting dependency graph is split
+into topological levels, and each level is deployed concurrently. When a view
+fails, only the views downstream of it are skipped.
+
+Usage:
+    python3 deploy_views.py                       # deploy VIEWS_TO_DEPLOY
+    python3 deploy_views.py --all-views           # deploy every views/*.sql file
+    python3 deploy_views.py v_medications.sql     # deploy selected view files
+    python3 deploy_views.py --max-concurrency 10  # widen each level
+    python3 deploy_views.py --dry-run             # print the plan only
+    python3 deploy_views.py --incremental         # only changed views + dependents
+    python3 deploy_views.py --incremental --compare-deployed
+    python3 deploy_views.py --materialize         # deploy MATERIALIZED_VIEWS as tables
+    python3 deploy_views.py --refresh-materialized  # refresh materialized views only
+    python3 deploy_views.py --refresh-materialized --full-refresh
+    python3 deploy_views.py --preflight           # EXPLAIN the views first, then deploy
+    python3 deploy_views.py --dry-run --preflight # EXPLAIN the views, deploy nothing
+    python3 deploy_views.py --database fhir_prd_db --database fhir_v2_prd_db
+    python3 deploy_views.py --manifest-databases --incremental
+
+Incremental mode hashes each view's SELECT body with comments and whitespace
+normalized away, compares it with the hash recorded in .deploy_state.json (or,
+with --compare-deployed, with the view text currently in the Glue catalog) and
+deploys only the views that differ plus everything downstream of them.
+
+View files are written against fhir_prd_db, which acts as a template: every
+fhir_prd_db.<object> qualifier is rewritten to the target database. With
+several --database options (or --manifest-databases, for every database in
+manifest.csv) each database gets its own dependency DAG, and the DAGs run in
+parallel. --max-concurrency caps the views in flight across all of them. The
+summary is a per-database results matrix, and a failure in one database only
+skips views downstream of it in that database.
+
+With --materialize (implied by --refresh-materialized), views listed in
+materialized_views.MATERIALIZED_VIEWS are deployed as a bucketed Iceberg
+table behind a view of the same name, refreshed incrementally per patient
+(see materialized_views.py). They are added to the deploy set when it does
+not list them, unless view files are named on the command line. Without it
+every view is a plain view.
+
+With --preflight, the SELECT of every view about to be deployed (with
+--incremental, only the changed ones) is checked with EXPLAIN (TYPE VALIDATE)
+and EXPLAIN (TYPE IO) before anything is deployed. The views are checked
+concurrently, with upstream views from the same deploy inlined as CTEs.
+Syntax and semantic errors reject the whole rollout in seconds, before the
+catalog is touched, and the estimated input bytes per source table are
+reported. It costs two extra Athena queries per view, so it is off by
+default; with --dry-run it checks the views and deploys nothing.
+
+Bytes scanned and latency of every deploy statement are appended to
+.query_metrics.jsonl (see query_metrics.py).
 """
 
-import boto3
-import time
+import argparse
+import base64
+import hashlib
+import json
+import math
+import re
 import sys
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from athena_client import create_athena_client, get_session
+from athena_config import CONFIG
+from athena_query_runner import AthenaQueryRunner, QueryFailedError, QueryFuture, QueryTimeoutError
+from athena_results import iter_query_results
+from materialized_views import LIVE_SUFFIX, MATERIALIZED_VIEWS, materialize_view
+from query_metrics import QueryMetricsLog, format_bytes
+from sql_analyzer import analyze_files
+from sync_named_queries import load_manifest
+
+VIEWS_DIR = Path(__file__).parent / 'views'
+DEPLOY_STATE_FILE = Path(__file__).parent / '.deploy_state.json'
 
-# Views to deploy in dependency order
+# View files to deploy; views they read that are not listed must already exist
 VIEWS_TO_DEPLOY = [
     # Core reference views (no dependencies)
     'v_oid_reference.sql',
+    'v_keyword_rules.sql',
     'v_patient_demographics.sql',
 
     # Base clinical views
@@ -37,7 +119,7 @@ VIEWS_TO_DEPLOY = [
     'v_chemo_medications.sql',
     'v_chemo_treatment_episodes.sql',
 
-    # Radiation views (in dependency order)
+    # Radiation views
     'v_radiation_documents.sql',
     'v_radiation_care_plan_hierarchy.sql',
     'v2_radiation_treatment_episodes.sql',
@@ -52,109 +134,801 @@ VIEWS_TO_DEPLOY = [
     'v_visits_unified.sql',
 ]
 
-def deploy_view(client, view_file: Path, database: str = 'fhir_prd_db') -> bool:
-    """Deploy a single view to Athena"""
+# View files are written against fhir_prd_db; the qualifier is rewritten per target database
+TEMPLATE_DATABASE = 'fhir_prd_db'
+
+# Matches the view defined by a file, e.g. CREATE OR REPLACE VIEW fhir_prd_db.v_imaging AS
+CREATE_VIEW_PATTERN = re.compile(
+    r'CREATE\s+OR\s+REPLACE\s+VIEW\s+fhir_prd_db\.(\w+)\s+AS', re.IGNORECASE
+)
+
+# Matches references to other views, e.g. FROM fhir_prd_db.v_procedures_tumor
+VIEW_REFERENCE_PATTERN = re.compile(r'\bfhir_prd_db\.(v2?_\w+)', re.IGNORECASE)
+
+# String literals are kept verbatim when normalizing whitespace
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'")
+
+# Comments and string literals, skipped when rewriting database qualifiers
+NON_CODE_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/|'(?:[^']|'')*'", re.DOTALL)
+
+# Glue stores Athena view text as /* Presto View: <base64 JSON> */
+PRESTO_VIEW_PATTERN = re.compile(r'/\*\s*Presto View:\s*(\S+)\s*\*/', re.DOTALL)
+
+# Error positions in Athena messages, e.g. line 12:5: Column 'x' cannot be resolved
+ERROR_LINE_PATTERN = re.compile(r'\bline (\d+):(\d+)')
+
+DEFAULT_MAX_CONCURRENCY = 5
+
+# CTAS refreshes of materialized views run far longer than CREATE VIEW
+DEFAULT_TIMEOUT = 1800
+
+def strip_sql_comments(sql: str) -> str:
+    """Remove -- and /* */ comments from SQL, leaving string literals intact"""
+    out = []
+    i = 0
+    n = len(sql)
+
+    while i < n:
+        ch = sql[i]
+
+        if ch == "'":
+            # String literal ('' is an escaped quote)
+            j = i + 1
+            while j < n:
+                if sql[j] == "'":
+                    if j + 1 < n and sql[j + 1] == "'":
+                        j += 2
+                        continue
+                    break
+                j += 1
+            out.append(sql[i:j + 1])
+            i = j + 1
+        elif sql.startswith('--', i):
+            j = sql.find('\n', i)
+            i = n if j == -1 else j
+        elif sql.startswith('/*', i):
+            j = sql.find('*/', i + 2)
+            # Keep the comment's line breaks so line numbers still match the file
+            out.append('\n' * sql.count('\n', i, n if j == -1 else j) or ' ')
+            i = n if j == -1 else j + 2
+        else:
+            out.append(ch)
+            i += 1
+
+    return ''.join(out)
+
+def extract_view_name(sql: str) -> Optional[str]:
+    """Return the view name created by a SQL file, or None"""
+    match = CREATE_VIEW_PATTERN.search(strip_sql_comments(sql))
+    return match.group(1).lower() if match else None
+
+def extract_view_references(sql: str) -> Set[str]:
+    """Return the set of fhir_prd_db views referenced by a SQL file"""
+    return {m.lower() for m in VIEW_REFERENCE_PATTERN.findall(strip_sql_comments(sql))}
+
+def normalize_sql(sql: str) -> str:
+    """Strip comments, collapse whitespace outside string literals and drop a trailing ;"""
+    sql = strip_sql_comments(sql)
+
+    parts = []
+    last = 0
+    for match in STRING_LITERAL_PATTERN.finditer(sql):
+        parts.append(re.sub(r'\s+', ' ', sql[last:match.start()]))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(re.sub(r'\s+', ' ', sql[last:]))
+
+    return ''.join(parts).strip().rstrip(';').strip()
+
+def rename_view(sql: str, view_name: str) -> str:
+    """Rewrite CREATE OR REPLACE VIEW fhir_prd_db.<name> to create view_name instead"""
+    match = CREATE_VIEW_PATTERN.search(sql)
+    if not match:
+        raise ValueError('No CREATE OR REPLACE VIEW statement found')
+    return sql[:match.start(1)] + view_name + sql[match.end(1):]
+
+def retarget_sql(sql: str, database: str, source: str = TEMPLATE_DATABASE) -> str:
+    """Rewrite every source.<object> qualifier outside comments and string literals to database.<object>"""
+    if database == source:
+        return sql
+    qualifier = re.compile(rf'\b{re.escape(source)}\.', re.IGNORECASE)
+    parts = []
+    last = 0
+    for match in NON_CODE_PATTERN.finditer(sql):
+        parts.append(qualifier.sub(f'{database}.', sql[last:match.start()]))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(qualifier.sub(f'{database}.', sql[last:]))
+    return ''.join(parts)
+
+def view_body_hash(sql: str) -> str:
+    """
+    Hash the normalized SELECT body of a view.
+
+    Accepts either a full CREATE OR REPLACE VIEW statement or the bare SELECT
+    stored in the catalog, so file and deployed hashes are comparable.
+    """
+    normalized = normalize_sql(sql)
+    match = CREATE_VIEW_PATTERN.search(normalized)
+    if match:
+        normalized = normalized[match.end():].strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def load_deploy_state(state_file: Path, database: str) -> Dict[str, str]:
+    """Return view -> body hash recorded by previous deployments to database"""
+    if not state_file.exists():
+        return {}
+    state = json.loads(state_file.read_text())
+    return {view: entry['hash'] for view, entry in state.get(database, {}).items()}
+
+def save_deploy_state(state_file: Path, database: str, view_files: Dict[str, Path],
+                      deployed: List[str]):
+    """Record the body hash of each successfully deployed view"""
+    state = json.loads(state_file.read_text()) if state_file.exists() else {}
+    db_state = state.setdefault(database, {})
+    deployed_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+    for view_name in deployed:
+        db_state[view_name] = {
+            'file': view_files[view_name].name,
+            'hash': view_body_hash(view_files[view_name].read_text()),
+            'deployed_at': deployed_at,
+        }
+
+    state_file.write_text(json.dumps(state, indent=2, sort_keys=True) + '\n')
+
+def deployed_view_hashes(glue_client, database: str) -> Dict[str, str]:
+    """
+    Return view -> body hash for the views currently in the Glue catalog.
+
+    The deployed text is mapped back to the template database first, so the
+    hashes compare with those of the view files for any target database.
+    """
+    hashes = {}
+
+    paginator = glue_client.get_paginator('get_tables')
+    for page in paginator.paginate(DatabaseName=database, Expression='v_*|v2_*'):
+        for table in page['TableList']:
+            match = PRESTO_VIEW_PATTERN.match(table.get('ViewOriginalText') or '')
+            if not match:
+                continue
+            view_definition = json.loads(base64.b64decode(match.group(1)))
+            hashes[table['Name'].lower()] = view_body_hash(
+                retarget_sql(view_definition['originalSql'], TEMPLATE_DATABASE, source=database)
+            )
+
+    return hashes
+
+def changed_views(view_files: Dict[str, Path], graph: Dict[str, Set[str]],
+                  known_hashes: Dict[str, str]) -> Set[str]:
+    """Return views whose body hash differs from known_hashes, plus their dependents"""
+    changed = {
+        view_name for view_name, sql_file in view_files.items()
+        if known_hashes.get(view_name) != view_body_hash(sql_file.read_text())
+    }
 
-    print(f"\n{'='*80}")
-    print(f"Deploying: {view_file.name}")
-    print('='*80)
+    for view_name in list(changed):
+        changed |= downstream_views(graph, view_name)
 
-    try:
-        # Read SQL file
-        sql = view_file.read_text()
-
-        # Execute CREATE OR REPLACE VIEW
-        response = client.start_query_execution(
-            QueryString=sql,
-            QueryExecutionContext={'Database': database},
-            ResultConfiguration={
-                'OutputLocation': 's3://aws-athena-query-results-343218191717-us-east-1/'
-            }
-        )
+    return changed
 
-        query_id = response['QueryExecutionId']
-        print(f"Query ID: {query_id}")
+def discover_views(views_dir: Path, files: Optional[List[str]] = VIEWS_TO_DEPLOY) -> Dict[str, Path]:
+    """
+    Map each view name to the file that defines it.
 
-        # Wait for completion
-        for i in range(60):
-            status = client.get_query_execution(QueryExecutionId=query_id)
-            state = status['QueryExecution']['Status']['State']
+    Only the given file names are read (missing ones are left out); with
+    files=None every views_dir/*.sql file is. Several views have both a v_ and
+    a v2_ file creating the same Athena view (e.g. v_molecular_tests.sql and
+    v2_molecular_tests.sql). The v2_ file is the current definition and wins.
+    """
+    views = {}
 
-            if state == 'SUCCEEDED':
-                print(f"✅ SUCCESS: {view_file.name}")
-                return True
-            elif state in ['FAILED', 'CANCELLED']:
-                reason = status['QueryExecution']['Status'].get('StateChangeReason', 'Unknown')
-                print(f"❌ FAILED: {view_file.name}")
-                print(f"   Reason: {reason}")
-                return False
+    if files is None:
+        sql_files = sorted(views_dir.glob('*.sql'))
+    else:
+        sql_files = [views_dir / name for name in files if (views_dir / name).exists()]
 
-            time.sleep(2)
+    for sql_file in sql_files:
+        view_name = extract_view_name(sql_file.read_text())
+        if not view_name:
+            continue
 
-        print(f"⏱️  TIMEOUT: {view_file.name}")
-        return False
+        current = views.get(view_name)
+        if current is None or (sql_file.name.startswith('v2_') and not current.name.startswith('v2_')):
+            views[view_name] = sql_file
+
+    return views
+
+def build_dependency_graph(view_files: Dict[str, Path]) -> Dict[str, Set[str]]:
+    """
+    Build view -> set of upstream views it depends on.
+
+    Only views present in view_files are kept as dependencies; references to
+    views outside the deployment set are assumed to exist already.
+    """
+    graph = {}
+
+    for view_name, sql_file in view_files.items():
+        references = extract_view_references(sql_file.read_text())
+        references.discard(view_name)
+        graph[view_name] = references & view_files.keys()
+
+    return graph
+
+def topological_levels(graph: Dict[str, Set[str]]) -> List[List[str]]:
+    """
+    Group views into levels; every view depends only on views in earlier levels.
+
+    Raises ValueError if the graph contains a cycle.
+    """
+    remaining = {view: set(deps) for view, deps in graph.items()}
+    levels = []
+
+    while remaining:
+        level = sorted(view for view, deps in remaining.items() if not deps)
+        if not level:
+            raise ValueError(f"Dependency cycle between views: {', '.join(sorted(remaining))}")
+
+        levels.append(level)
+        for view in level:
+            del remaining[view]
+        for deps in remaining.values():
+            deps.difference_update(level)
+
+    return levels
+
+def downstream_views(graph: Dict[str, Set[str]], view_name: str) -> Set[str]:
+    """Return every view that transitively depends on view_name"""
+    dependents = {}
+    for view, deps in graph.items():
+        for dep in deps:
+            dependents.setdefault(dep, set()).add(view)
+
+    found = set()
+    stack = [view_name]
+    while stack:
+        for child in dependents.get(stack.pop(), ()):
+            if child not in found:
+                found.add(child)
+                stack.append(child)
+
+    return found
+
+def upstream_views(graph: Dict[str, Set[str]], view_name: str) -> Set[str]:
+    """Return every view that view_name transitively depends on"""
+    found = set()
+    stack = [view_name]
+    while stack:
+        for dep in graph.get(stack.pop(), ()):
+            if dep not in found:
+                found.add(dep)
+                stack.append(dep)
+
+    return found
+
+def materialization_plans(view_files: Dict[str, Path], graph: Dict[str, Set[str]],
+                          views: Set[str], database: str = TEMPLATE_DATABASE) -> Dict[str, Dict]:
+    """
+    Build the materialize_view plan for each materialized view in views.
+
+    view_files and graph must cover every view, not just the ones being
+    deployed: the source tables and definition hash of a materialized view
+    include everything upstream of it.
+    """
+    analyses = analyze_files(sorted(view_files.values()))
+    plans = {}
+
+    for view_name in sorted(views & MATERIALIZED_VIEWS.keys()):
+        upstream = {view_name} | upstream_views(graph, view_name)
+
+        source_tables = set()
+        for name in upstream:
+            for table in analyses[view_files[name].name]['tables']:
+                schema, _, table_name = table.lower().rpartition('.')
+                if schema == database and table_name not in view_files:
+                    source_tables.add(table_name)
+
+        definition = hashlib.sha256(''.join(
+            view_body_hash(view_files[name].read_text()) for name in sorted(upstream)
+        ).encode('utf-8')).hexdigest()
+
+        plans[view_name] = {
+            'key_column': MATERIALIZED_VIEWS[view_name],
+            'source_tables': sorted(source_tables),
+            'definition_hash': definition,
+            'live_sql': rename_view(view_files[view_name].read_text(), view_name + LIVE_SUFFIX),
+        }
+
+    return plans
+
+def view_select_body(sql: str) -> Tuple[str, int]:
+    """
+    Return (body, line) for the SELECT a CREATE OR REPLACE VIEW file defines.
+
+    Comments and the trailing ; are removed but line breaks are kept, so the
+    body's lines map onto the file from line onwards.
+    """
+    sql = strip_sql_comments(sql)
+    match = CREATE_VIEW_PATTERN.search(sql)
+    if not match:
+        raise ValueError('No CREATE OR REPLACE VIEW statement found')
+    return sql[match.end():].rstrip().rstrip(';').rstrip(), sql.count('\n', 0, match.end()) + 1
+
+def preflight_sql(view_name: str, view_files: Dict[str, Path], graph: Dict[str, Set[str]],
+                  database: str = TEMPLATE_DATABASE) -> Tuple[str, int]:
+    """
+    Return (sql, offset): the view's SELECT for database with upstream views from view_files inlined as CTEs.
+
+    Upstream views deployed in the same run may not exist yet or may be about
+    to change shape, so EXPLAIN has to see their new definitions instead of
+    the catalog's. Line n of the view body is line n + offset of sql.
+    """
+    inlined = upstream_views(graph, view_name)
+
+    def rewrite(sql: str) -> str:
+        return VIEW_REFERENCE_PATTERN.sub(
+            lambda m: m.group(1).lower() if m.group(1).lower() in inlined else m.group(0), sql
+        )
 
-    except Exception as e:
-        print(f"❌ ERROR: {view_file.name}")
-        print(f"   Exception: {e}")
-        return False
+    body = retarget_sql(rewrite(view_select_body(view_files[view_name].read_text())[0]), database)
+    if not inlined:
+        return body, 0
+
+    ctes = ',\n'.join(
+        f"{name} AS (\n{retarget_sql(rewrite(view_select_body(view_files[name].read_text())[0]), database)}\n)"
+        for level in topological_levels({name: graph[name] & inlined for name in inlined})
+        for name in level
+    )
+    stripped = body.lstrip()
+    with_clause = re.match(r'WITH\b(?!\s+RECURSIVE\b)', stripped, re.IGNORECASE)
+    if with_clause:
+        # Join the view's own WITH list; the body keeps its line breaks
+        prefix = f"WITH {ctes},\n"
+        sql = prefix + body[:len(body) - len(stripped)] + stripped[with_clause.end():]
+    else:
+        prefix = f"WITH {ctes}\n"
+        sql = prefix + body
+    return sql, prefix.count('\n')
+
+def explain_io_estimates(plan: Dict) -> Dict[str, Optional[float]]:
+    """{schema.table: estimated input bytes, or None without table statistics} from EXPLAIN (TYPE IO, FORMAT JSON)"""
+    estimates = {}
+    for info in plan.get('inputTableColumnInfos', []):
+        table = info['table']['schemaTable']
+        name = f"{table['schema']}.{table['table']}"
+        # Without statistics the estimate is NaN (written as "NaN")
+        size = info.get('estimate', {}).get('outputSizeInBytes')
+        size = None if size is None or math.isnan(float(size)) else float(size)
+        if size is None:
+            estimates[name] = None
+        elif name not in estimates or estimates[name] is not None:
+            # A table read twice (self join, UNION) is scanned twice
+            estimates[name] = estimates.get(name, 0) + size
+    return estimates
+
+def _error_at_file_line(reason: str, offset: int, body_line: int) -> str:
+    """Rewrite 'line N:C' in an EXPLAIN error to the line in the view file"""
+    def replace(match):
+        line = int(match.group(1)) - offset
+        if line < 1:
+            return f"{match.group(0)} (in an inlined upstream view)"
+        return f"line {line + body_line - 1}:{match.group(2)}"
+    return ERROR_LINE_PATTERN.sub(replace, reason)
+
+def preflight_views(runner: AthenaQueryRunner, view_files: Dict[str, Path],
+                    graph: Dict[str, Set[str]], database: str = TEMPLATE_DATABASE) -> Dict[str, Dict]:
+    """
+    EXPLAIN every view's SELECT before anything is deployed.
+
+    EXPLAIN (TYPE VALIDATE) and EXPLAIN (TYPE IO) run concurrently for all
+    views; neither scans data. Returns view -> {'error', 'tables'} where error
+    is None for a valid view and tables maps each source table to its
+    estimated input bytes (None when the table has no statistics).
+    """
+    submitted = {}
+    results = {}
+    for view_name in view_files:
+        try:
+            sql, offset = preflight_sql(view_name, view_files, graph, database)
+        except ValueError as e:
+            results[view_name] = {'error': str(e), 'tables': {}}
+            continue
+        # EXPLAIN (TYPE ...) adds no lines, so offsets only come from inlined CTEs
+        submitted[view_name] = (
+            runner.submit(f"EXPLAIN (TYPE VALIDATE) {sql}", database, tag=f'preflight:{view_name}'),
+            runner.submit(f"EXPLAIN (TYPE IO, FORMAT JSON) {sql}", database, tag=f'preflight:{view_name}'),
+            offset,
+        )
 
-def main():
-    print("="*80)
-    print("ATHENA VIEW DEPLOYMENT")
+    for view_name, (validate, io, offset) in submitted.items():
+        body_line = view_select_body(view_files[view_name].read_text())[1]
+        result = {'error': None, 'tables': {}}
+        try:
+            validate.result()
+            execution = io.result()
+            plan = ''.join(str(next(iter(row.values())))
+                           for row in iter_query_results(runner.client, execution['QueryExecutionId']))
+            result['tables'] = explain_io_estimates(json.loads(plan))
+        except QueryFailedError as e:
+            result['error'] = _error_at_file_line(e.reason, offset, body_line)
+        except QueryTimeoutError:
+            result['error'] = 'EXPLAIN timed out'
+        except (ValueError, KeyError) as e:
+            # The view is valid; only the IO plan could not be read
+            result['tables'] = None
+            print(f"⚠️  {view_files[view_name].name}: unreadable EXPLAIN IO output ({e})")
+        results[view_name] = result
+
+    return results
+
+def report_preflight(view_files: Dict[str, Path], results: Dict[str, Dict], database: str = '') -> bool:
+    """Print preflight errors and estimated input bytes; returns True if every view is valid"""
+    print("\n" + "="*80)
+    print(f"PREFLIGHT: EXPLAIN {len(results)} view(s){f' in {database}' if database else ''}")
     print("="*80)
-    print(f"Database: fhir_prd_db")
-    print(f"Views to deploy: {len(VIEWS_TO_DEPLOY)}")
-    print()
 
-    # Initialize Athena client
-    client = boto3.client('athena', region_name='us-east-1')
+    tables: Dict[str, Dict] = {}
+    for view_name in sorted(results, key=lambda name: view_files[name].name):
+        result = results[view_name]
+        filename = view_files[view_name].name
+        if result['error']:
+            print(f"❌ INVALID: {filename}\n   Reason: {result['error']}")
+            continue
+        estimates = result['tables'] or {}
+        known = [size for size in estimates.values() if size is not None]
+        estimate = format_bytes(sum(known)) if len(known) == len(estimates) else \
+            f"≥{format_bytes(sum(known))}" if known else 'unknown'
+        print(f"✅ VALID: {filename} ({len(estimates)} source table(s), est. input {estimate})")
+        for table, size in estimates.items():
+            entry = tables.setdefault(table, {'bytes': size, 'views': 0})
+            # Estimates differ per view with the filters pushed into the scan
+            if size is None or entry['bytes'] is None:
+                entry['bytes'] = None
+            else:
+                entry['bytes'] = max(entry['bytes'], size)
+            entry['views'] += 1
+
+    if tables:
+        print(f"\n{'Source table':<50} {'Max est. input':>14} {'Views':>6}")
+        print('-'*70)
+        for table, entry in sorted(tables.items(), key=lambda item: -(item[1]['bytes'] or 0)):
+            size = format_bytes(entry['bytes']) if entry['bytes'] is not None else 'no stats'
+            print(f"{table:<50} {size:>14} {entry['views']:>6}")
+
+    invalid = [view_files[name].name for name, result in results.items() if result['error']]
+    if invalid:
+        print(f"\n❌ Preflight failed for {len(invalid)} view(s): {', '.join(sorted(invalid))}")
+    return not invalid
+
+def deploy_view(runner: AthenaQueryRunner, view_file: Path, database: str = TEMPLATE_DATABASE,
+                view_name: Optional[str] = None, label: str = '') -> QueryFuture:
+    """Submit CREATE OR REPLACE VIEW for a single view in database; returns the query future"""
+    sql = retarget_sql(view_file.read_text(), database)
+    future = runner.submit(sql, database=database, tag=view_name or view_file.stem)
+
+    if future.query_id:
+        print(f"{label}🚀 Submitted: {view_file.name} (Query ID: {future.query_id})")
+
+    return future
+
+def report_deployment(view_file: Path, future: Future, label: str = '') -> bool:
+    """Print the outcome of a deploy_view future and return True on success"""
+    try:
+        result = future.result()
+    except QueryFailedError as e:
+        print(f"{label}❌ FAILED: {view_file.name}\n   Reason: {e.reason}")
+        return False
+    except QueryTimeoutError:
+        print(f"{label}⏱️  TIMEOUT: {view_file.name}")
+        return False
+    except Exception as e:
+        print(f"{label}❌ ERROR: {view_file.name}\n   Exception: {e}")
+        return False
 
-    # Views directory
-    views_dir = Path(__file__).parent / 'views'
+    if 'mode' in result:
+        print(f"{label}✅ SUCCESS: {view_file.name} (materialized: {result['mode']} refresh, "
+              f"{result['patients']} changed patient(s))")
+    else:
+        print(f"{label}✅ SUCCESS: {view_file.name}")
+    return True
+
+def deploy_all(runner: AthenaQueryRunner, view_files: Dict[str, Path], graph: Dict[str, Set[str]],
+               max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+               database: str = TEMPLATE_DATABASE, materialized: Optional[Dict[str, Dict]] = None,
+               full_refresh: bool = False, slots: Optional[threading.Semaphore] = None,
+               label: str = '') -> Dict[str, List[str]]:
+    """
+    Deploy views level by level, keeping up to max_concurrency views in flight.
+
+    Views with a plan in materialized (see materialization_plans) are built
+    with materialize_view on a worker thread instead of a single CREATE VIEW.
+    slots, shared by deploy_all calls running in parallel for several
+    databases, caps the views in flight across all of them. label prefixes
+    every line printed.
+    """
+    materialized = materialized or {}
+    executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='materialize')
 
-    # Deploy views
     results = {
         'success': [],
         'failed': [],
         'skipped': []
     }
+    blocked = set()
 
-    for view_filename in VIEWS_TO_DEPLOY:
-        view_path = views_dir / view_filename
+    levels = topological_levels(graph)
 
-        if not view_path.exists():
-            print(f"\n⚠️  SKIPPED: {view_filename} (file not found)")
-            results['skipped'].append(view_filename)
-            continue
+    for level_num, level in enumerate(levels, 1):
+        if label:
+            print(f"{label}Level {level_num}/{len(levels)}: {len(level)} view(s)")
+        else:
+            print(f"\n{'='*80}")
+            print(f"Level {level_num}/{len(levels)}: {len(level)} view(s)")
+            print('='*80)
+
+        pending = []
+        for view_name in level:
+            if view_name in blocked:
+                print(f"{label}⚠️  SKIPPED: {view_files[view_name].name} (upstream view failed)")
+                results['skipped'].append(view_files[view_name].name)
+            else:
+                pending.append(view_name)
+
+        in_flight = {}
+        while pending or in_flight:
+            while pending and len(in_flight) < max_concurrency:
+                view_name = pending.pop(0)
+                if slots:
+                    slots.acquire()
+                if view_name in materialized:
+                    print(f"{label}🚀 Materializing: {view_files[view_name].name}")
+                    future = executor.submit(materialize_view, runner, view_name, materialized[view_name],
+                                             database, full_refresh=full_refresh)
+                else:
+                    future = deploy_view(runner, view_files[view_name], database, view_name, label)
+                if slots:
+                    # Released from the callback so a waiting database never holds up this one
+                    future.add_done_callback(lambda _: slots.release())
+                in_flight[future] = view_name
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                view_name = in_flight.pop(future)
+                if report_deployment(view_files[view_name], future, label):
+                    results['success'].append(view_files[view_name].name)
+                else:
+                    results['failed'].append(view_files[view_name].name)
+                    blocked |= downstream_views(graph, view_name)
+
+    executor.shutdown()
+    return results
+
+def print_results_matrix(results: Dict[str, Dict[str, List[str]]]):
+    """Print one row per view file and one column per database"""
+    status = {}
+    for database, db_results in results.items():
+        for outcome, mark in (('success', '✅'), ('failed', '❌'), ('skipped', '⚠️')):
+            for filename in db_results[outcome]:
+                status.setdefault(filename, {})[database] = mark
+
+    width = max(len(database) for database in results) + 2
+    print(f"{'View':<45}" + ''.join(f"{database:<{width}}" for database in results))
+    print('-'*(45 + width * len(results)))
+    for filename in sorted(status):
+        # Emoji are two columns wide; pad the rest with the text width of a mark
+        print(f"{filename:<45}" + ''.join(f"{status[filename].get(database, '-'):<{width - 1}}"
+                                           for database in results))
+    print()
 
-        success = deploy_view(client, view_path)
+def parse_args():
+    parser = argparse.ArgumentParser(description='Deploy views/*.sql to Athena in dependency order')
+    parser.add_argument('views', nargs='*',
+                        help='View files to deploy (default: VIEWS_TO_DEPLOY)')
+    parser.add_argument('--all-views', action='store_true',
+                        help='Deploy every views/*.sql file, including ones not in VIEWS_TO_DEPLOY')
+    parser.add_argument('--max-concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help=f'Maximum views deployed at once, across all databases '
+                             f'(default: {DEFAULT_MAX_CONCURRENCY})')
+    parser.add_argument('--database', action='append',
+                        help=f"Target database; repeat to deploy to several in one run "
+                             f"(default: {CONFIG['database']})")
+    parser.add_argument('--manifest-databases', action='store_true',
+                        help='Also deploy to every database named in manifest.csv')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print the deployment levels and deploy nothing (with --preflight, only EXPLAIN)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Deploy only views whose SQL changed, plus their dependents')
+    parser.add_argument('--compare-deployed', action='store_true',
+                        help='With --incremental, compare against the view text in the Glue '
+                             f'catalog instead of {DEPLOY_STATE_FILE.name}')
+    parser.add_argument('--refresh-materialized', action='store_true',
+                        help='Only refresh the materialized views (e.g. after a source data load)')
+    parser.add_argument('--full-refresh', action='store_true',
+                        help='Rebuild materialized tables from scratch instead of per changed patient')
+    parser.add_argument('--materialize', action='store_true',
+                        help='Deploy MATERIALIZED_VIEWS as Iceberg tables behind their views')
+    parser.add_argument('--preflight', action='store_true',
+                        help='EXPLAIN the views first: report errors and estimated input bytes, '
+                             'deploy only if all are valid')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Per-query timeout in seconds (default: {DEFAULT_TIMEOUT})')
+    return parser.parse_args()
 
-        if success:
-            results['success'].append(view_filename)
-        else:
-            results['failed'].append(view_filename)
+def main():
+    args = parse_args()
+
+    view_files = discover_views(VIEWS_DIR, None if args.all_views else VIEWS_TO_DEPLOY)
+    all_view_files = view_files
+
+    if args.views:
+        selected = {}
+        for view_filename in args.views:
+            found = discover_views(VIEWS_DIR, [Path(view_filename).name])
+            if not found:
+                print(f"❌ Unknown view file: {view_filename}")
+                sys.exit(1)
+            selected.update(found)
+        view_files = selected
+        all_view_files = dict(all_view_files, **selected)
+
+    materialize = args.materialize or args.refresh_materialized
+    if materialize:
+        # Lineage for the plans covers every view file; the deploy set's choice of file wins
+        every_view_file = dict(discover_views(VIEWS_DIR, None), **all_view_files)
+        unknown = sorted(set(MATERIALIZED_VIEWS) - set(every_view_file))
+        if unknown:
+            print(f"❌ No view file for materialized view(s): {', '.join(unknown)}")
+            sys.exit(1)
+        if not args.views:
+            added = {name: every_view_file[name] for name in sorted(MATERIALIZED_VIEWS) if name not in view_files}
+            if added:
+                print(f"➕ Materialized views not in the deploy set, deployed too: {', '.join(added)}")
+                view_files = dict(view_files, **added)
+                all_view_files = dict(all_view_files, **added)
+
+    graph = build_dependency_graph(view_files)
+
+    if materialize:
+        # A CTAS reads through views outside the deploy set too; build it after
+        # every deployed view upstream of it, e.g. the timeline after v_radiation_treatments
+        full_graph = build_dependency_graph(every_view_file)
+        for name in MATERIALIZED_VIEWS.keys() & view_files.keys():
+            graph[name] |= upstream_views(full_graph, name) & view_files.keys()
+
+    if args.refresh_materialized:
+        view_files = {name: path for name, path in view_files.items() if name in MATERIALIZED_VIEWS}
+        graph = {name: upstream_views(full_graph, name) & view_files.keys() for name in view_files}
+
+    databases = list(dict.fromkeys(args.database or [CONFIG['database']]))
+    if args.manifest_databases:
+        databases += sorted({row['database'] for row in load_manifest() if row['database']} - set(databases))
+    label = (lambda database: f"[{database}] ") if len(databases) > 1 else (lambda database: '')
+
+    # Per database: the views to deploy and their graph
+    targets = {}
+    for database in databases:
+        db_view_files, db_graph = view_files, graph
+        if args.incremental:
+            if args.compare_deployed:
+                glue = get_session().client('glue', region_name=CONFIG['region'])
+                known_hashes = deployed_view_hashes(glue, database)
+            else:
+                known_hashes = load_deploy_state(DEPLOY_STATE_FILE, database)
+
+            to_deploy = changed_views(view_files, graph, known_hashes)
+            print(f"{label(database)}Incremental: {len(to_deploy)} of {len(view_files)} view(s) "
+                  f"changed or downstream of a change")
+            db_view_files = {name: path for name, path in view_files.items() if name in to_deploy}
+            db_graph = {name: graph[name] & db_view_files.keys() for name in db_view_files}
+        if db_view_files:
+            targets[database] = (db_view_files, db_graph)
+
+    if not targets:
+        print("\n✅ All views are up to date - nothing to deploy")
+        sys.exit(0)
+
+    plans = {}
+    if materialize:
+        plans = materialization_plans(every_view_file, full_graph,
+                                      set().union(*(files.keys() for files, _ in targets.values())))
+    materialized = {
+        database: {name: dict(plan, live_sql=retarget_sql(plan['live_sql'], database))
+                   for name, plan in plans.items() if name in files}
+        for database, (files, _) in targets.items()
+    }
+
+    print("="*80)
+    print("ATHENA VIEW DEPLOYMENT")
+    print("="*80)
+    if len(databases) == 1:
+        print(f"Database: {databases[0]}")
+        print(f"Views to deploy: {len(targets[databases[0]][0])}")
+    else:
+        print(f"Databases: {len(databases)}")
+        for database in databases:
+            print(f"  {database:<40} {len(targets.get(database, ({},))[0])} view(s)")
+    print(f"Max concurrency: {args.max_concurrency}{' (across all databases)' if len(databases) > 1 else ''}")
+    if plans:
+        print(f"Materialized: {', '.join(sorted(plans))}"
+              f"{' (full refresh)' if args.full_refresh else ''}")
+    print()
+
+    if args.dry_run:
+        for database, (db_view_files, db_graph) in targets.items():
+            if len(databases) > 1:
+                print(f"{database}:")
+            for level_num, level in enumerate(topological_levels(db_graph), 1):
+                print(f"Level {level_num}:")
+                for view_name in level:
+                    deps = ', '.join(sorted(db_graph[view_name])) or '-'
+                    mode = ' [materialized]' if view_name in materialized[database] else ''
+                    print(f"  {db_view_files[view_name].name:<45} depends on: {deps}{mode}")
+        if not args.preflight:
+            sys.exit(0)
+
+    # Initialize Athena client
+    client = create_athena_client()
+
+    with AthenaQueryRunner(client, timeout=args.timeout, metrics=QueryMetricsLog()) as runner, \
+            ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix='database') as databases_pool:
+        if args.preflight:
+            preflight = dict(zip(targets, databases_pool.map(
+                lambda database: preflight_views(runner, *targets[database], database), targets
+            )))
+            passed = [report_preflight(targets[database][0], preflight[database],
+                                       database if len(databases) > 1 else '')
+                      for database in targets]
+            if not all(passed):
+                print("\n❌ Nothing deployed - fix the views above or deploy without --preflight")
+                sys.exit(1)
+            if args.dry_run:
+                print("\n✅ All views passed preflight")
+                sys.exit(0)
+
+        # Deploy views: one DAG per database, all sharing the concurrency cap
+        slots = threading.BoundedSemaphore(args.max_concurrency)
+        futures = {
+            database: databases_pool.submit(
+                deploy_all, runner, db_view_files, db_graph, max_concurrency=args.max_concurrency,
+                database=database, materialized=materialized[database], full_refresh=args.full_refresh,
+                slots=slots, label=label(database)
+            )
+            for database, (db_view_files, db_graph) in targets.items()
+        }
+        results = {database: future.result() for database, future in futures.items()}
+
+    for database, (db_view_files, _) in targets.items():
+        by_file = {path.name: name for name, path in db_view_files.items()}
+        save_deploy_state(DEPLOY_STATE_FILE, database, db_view_files,
+                          [by_file[filename] for filename in results[database]['success']])
 
     # Summary
     print("\n" + "="*80)
     print("DEPLOYMENT SUMMARY")
     print("="*80)
-    print(f"✅ Successful: {len(results['success'])}")
-    print(f"❌ Failed: {len(results['failed'])}")
-    print(f"⚠️  Skipped: {len(results['skipped'])}")
-
-    if results['failed']:
-        print("\nFailed views:")
-        for view in results['failed']:
-            print(f"  - {view}")
+    if len(databases) > 1:
+        print_results_matrix(results)
+
+    for database, db_results in results.items():
+        prefix = f"{database}: " if len(databases) > 1 else ''
+        print(f"{prefix}✅ Successful: {len(db_results['success'])}")
+        print(f"{prefix}❌ Failed: {len(db_results['failed'])}")
+        print(f"{prefix}⚠️  Skipped: {len(db_results['skipped'])}")
+
+        if db_results['failed']:
+            print(f"\n{prefix}Failed views:")
+            for view in db_results['failed']:
+                print(f"  - {view}")
+
+        if db_results['skipped']:
+            print(f"\n{prefix}Skipped views (upstream failure):")
+            for view in db_results['skipped']:
+                print(f"  - {view}")
+
+    if any(db_results['failed'] or db_results['skipped'] for db_results in results.values()):
         sys.exit(1)
 
-    if results['skipped']:
-        print("\nSkipped views:")
-        for view in results['skipped']:
-            print(f"  - {view}")
-
-    print("\n✅ All views deployed successfully!")
+    print(f"\n✅ All views deployed successfully{f' to {len(results)} databases' if len(results) > 1 else ''}!")
     sys.exit(0)
 
 if __name__ == '__main__':
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic FHIR dataset for scale testing the views locally.
+
+Probing production to see how views like v_unified_patient_timeline scale
+means querying PHI. This script writes synthetic versions of every source
+table the views read (fixtures/schema.json plus the columns local_engine
+infers from views/*.sql) as Parquet partitioned by patient bucket:
+
+    synthetic/<table>/patient_bucket=<n>/data_0.parquet
+
+Rows are generated inside DuckDB from hash(seed, table, column, row), so a
+given --seed always produces the same dataset. Generation is linear in the
+number of rows: with the defaults, about 1s per 1,000 patients on one core.
+Tables are shaped by their columns:
+
+- patient tables (patient, patient_access): one row per patient
+- event tables (subject_reference / patient_reference / patient_id ...):
+  --events-per-patient rows per patient, encounter_reference etc. pointing at
+  events of the same patient
+- child tables (condition_code_coding, appointment_participant, ...): one
+  row per parent row, linked by <parent>_id or a shared key column
+- everything else (medication, organization, ...): a small lookup table
+
+A <table>_id column of another table (patient_medications.medication_request_id)
+holds ids in that table's scheme ('medication_request-<n>'), pointing at a row
+of the same patient for event tables, so joins between them match.
+
+Date columns mix the shapes the date-validation work found in production:
+ISO 8601 timestamps, '%Y-%m-%d' dates, empty strings and NULLs (DATE_FORMAT_MIX).
+
+The output directory (with its schema.json and a manifest.json of the
+parameters and row counts) is a fixtures directory for local_engine. With
+--tables, the other tables' row counts in manifest.json are kept.
+
+Usage:
+    python3 generate_synthetic_fhir.py --patients 1000
+    python3 generate_synthetic_fhir.py --patients 1000000 --events-per-patient 10 --output /data/synthetic_1m
+    python3 local_engine.py --fixtures synthetic --query "SELECT count(*) FROM v_unified_patient_timeline"
+"""
+
+import argparse
+import json
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+
+from athena_query_runner import DEFAULT_DATABASE
+from deploy_views import VIEWS_DIR, discover_views
+from local_engine import FIXTURES_DIR, SCHEMA_FILE_NAME, source_table_schema
+from sql_analyzer import is_date_column_name
+
+DEFAULT_OUTPUT_DIR = Path(__file__).parent / 'synthetic'
+DEFAULT_PATIENTS = 1000
+DEFAULT_EVENTS_PER_PATIENT = 5
+DEFAULT_PARTITIONS = 8
+DEFAULT_SEED = 42
+LOOKUP_ROWS = 500
+
+MANIFEST_FILE_NAME = 'manifest.json'
+
+PATIENT_TABLES = {'patient', 'patient_access'}
+PATIENT_REFERENCE_COLUMNS = {'subject_reference', 'patient_reference', 'participant_actor_reference'}
+PATIENT_ID_COLUMNS = {'patient_id', 'patient_fhir_id'}
+
+# Reference columns the views join to a table's bare id, e.g. care_plan.id = based_on_reference
+ID_REFERENCE_COLUMNS = {'based_on_reference': 'care_plan'}
+
+# Percent of date values in each shape; must add up to 100
+DATE_FORMAT_MIX = [
+    ('iso8601', 70),    # 2021-06-01T14:30:00Z
+    ('date', 20),       # 2021-06-01
+    ('empty', 5),       # ''
+    ('null', 5),
+]
+
+# Events fall between these dates; birth dates between the first two
+BIRTH_DATE_START = '2000-01-01'
+EVENT_DATE_START = '2012-01-01'
+EVENT_SPAN_DAYS = 12 * 365
+
+# Free text is drawn from terms the view filters look for
+CLINICAL_TERMS = [
+    'MRI brain with and without contrast', 'CT head without contrast', 'Craniotomy for tumor resection',
+    'Radiation oncology consult', 'Proton radiation therapy', 'Radiation treatment plan',
+    'Temozolomide 140 mg capsule', 'Vincristine 1 mg/mL injection', 'Carboplatin infusion',
+    'Dexamethasone 4 mg tablet', 'Ondansetron 4 mg tablet', 'Chemotherapy infusion',
+    'Pilocytic astrocytoma', 'Medulloblastoma', 'Low grade glioma', 'Hydrocephalus',
+    'Ventriculoperitoneal shunt placement', 'Surgical pathology report', 'Molecular genetics panel',
+    'Audiogram 1000 Hz left ear', 'Hearing loss sensorineural', 'Ophthalmology exam visual acuity',
+    'Neuro-oncology follow up', 'Oncology clinic visit', 'Stem cell collection', 'Autologous transplant',
+    'Height', 'Weight', 'Blood pressure', 'Complete blood count',
+]
+STATUS_VALUES = ['completed', 'active', 'final', 'fulfilled', 'booked', 'cancelled', 'stopped', 'entered-in-error']
+CODE_SYSTEMS = [
+    'http://snomed.info/sct', 'http://hl7.org/fhir/sid/icd-10-cm',
+    'http://www.nlm.nih.gov/research/umls/rxnorm', 'http://loinc.org', 'http://www.ama-assn.org/go/cpt',
+]
+GENDER_VALUES = ['female', 'male', 'other', 'unknown']
+RACE_VALUES = ['White', 'Black or African American', 'Asian', 'Other', 'Unavailable']
+ETHNICITY_VALUES = ['Not Hispanic or Latino', 'Hispanic or Latino', 'Unavailable']
+
+NUMERIC_HINTS = ('_value', '_duration', 'duration_', 'minutes_', '_quantity', '_number', '_count', '_size')
+
+def _sql_list(values: List[str]) -> str:
+    return '[' + ', '.join("'" + v.replace("'", "''") + "'" for v in values) + ']'
+
+def _resource_type(table: str) -> str:
+    """FHIR resource type of a table: medication_request -> MedicationRequest"""
+    return ''.join(part.capitalize() for part in table.split('_'))
+
+def classify_tables(schema: Dict[str, Dict[str, str]]) -> Dict[str, Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Map each table to (role, parent table, link column).
+
+    role is 'patient', 'event', 'child' or 'lookup'; parent/link are only set
+    for child tables.
+    """
+    patient_columns = PATIENT_REFERENCE_COLUMNS | PATIENT_ID_COLUMNS
+    roles = {}
+    for table, cols in schema.items():
+        if table in PATIENT_TABLES:
+            roles[table] = ('patient', None, None)
+            continue
+        if any(table.startswith(other + '_') for other in schema if other != table and other not in PATIENT_TABLES):
+            continue
+        # appointment has no patient column itself; appointment_participant does
+        children_cols = set().union(*(
+            child_cols for child, child_cols in schema.items()
+            if child.startswith(table + '_') and f'{table}_id' in child_cols
+        ))
+        if (set(cols) | children_cols) & patient_columns:
+            roles[table] = ('event', None, None)
+
+    for table, cols in schema.items():
+        if table in roles:
+            continue
+        # Longest table-name prefix wins: medication_request_note -> medication_request
+        parents = sorted((other for other in schema if table.startswith(other + '_') and other not in PATIENT_TABLES),
+                         key=len, reverse=True)
+        for parent in parents:
+            if f'{parent}_id' in cols:
+                roles[table] = ('child', parent, f'{parent}_id')
+                break
+            shared = sorted(col for col in cols if col.endswith('_id') and col in schema[parent])
+            if shared:
+                roles[table] = ('child', parent, shared[0])
+                break
+        else:
+            if set(cols) & patient_columns:
+                roles[table] = ('event', None, None)
+            else:
+                roles[table] = ('lookup', None, None)
+
+    return roles
+
+class _Generator:
+    """Builds the SELECT that generates one table"""
+
+    def __init__(self, schema: Dict[str, Dict[str, str]], roles: Dict, patients: int,
+                 events_per_patient: int, seed: int):
+        self.schema = schema
+        self.roles = roles
+        self.patients = patients
+        self.events = events_per_patient
+        self.seed = seed
+
+    def rand(self, table: str, column: str, n: int, row: str = 'i') -> str:
+        """Deterministic pseudo-random integer in [0, n) for this row and column"""
+        return f"CAST(hash({row}, {self.seed}, '{table}.{column}') % {n} AS BIGINT)"
+
+    def pick(self, table: str, column: str, values: List[str]) -> str:
+        return f"{_sql_list(values)}[{self.rand(table, column, len(values))} + 1]"
+
+    def row_source(self, table: str) -> str:
+        """Subquery yielding i (row number) and p (patient number)"""
+        role, parent, _ = self.roles[table]
+        # Child rows line up 1:1 with their root table's rows
+        while role == 'child':
+            role, parent, _ = self.roles[parent]
+
+        if role == 'patient':
+            return f'SELECT range AS i, range AS p FROM range({self.patients})'
+        if role == 'event':
+            return (f'SELECT range AS i, range // {self.events} AS p '
+                    f'FROM range({self.patients * self.events})')
+        rows = min(LOOKUP_ROWS, self.patients)
+        return f'SELECT range AS i, range % {self.patients} AS p FROM range({rows})'
+
+    def event_timestamp(self, table: str) -> str:
+        """One base timestamp per row so start/end columns of a row stay close together"""
+        return (f"(TIMESTAMP '{EVENT_DATE_START}' + to_seconds("
+                f"{self.rand(table, '_event', EVENT_SPAN_DAYS * 86400)}))")
+
+    def date_value(self, table: str, column: str) -> str:
+        if column == 'birth_date':
+            birth = f"(DATE '{BIRTH_DATE_START}' + CAST({self.rand('patient', 'birth_date', 6500, 'p')} AS INTEGER))"
+            return f"strftime({birth}, '%Y-%m-%d')"
+
+        timestamp = self.event_timestamp(table)
+        if column.endswith(('_end', '_stop')) or column == 'end':
+            timestamp = f"({timestamp} + to_seconds({self.rand(table, column, 14 * 86400)}))"
+
+        shape = self.rand(table, column + '.shape', 100)
+        cases = []
+        threshold = 0
+        for name, percent in DATE_FORMAT_MIX:
+            threshold += percent
+            if name == 'iso8601':
+                value = f"strftime({timestamp}, '%Y-%m-%dT%H:%M:%SZ')"
+            elif name == 'date':
+                value = f"strftime({timestamp}, '%Y-%m-%d')"
+            elif name == 'empty':
+                value = "''"
+            else:
+                value = 'NULL'
+            cases.append(f'WHEN {shape} < {threshold} THEN {value}')
+        return 'CASE ' + ' '.join(cases) + ' END'
+
+    def reference(self, table: str, column: str) -> str:
+        """Reference to another generated row of the same patient where possible"""
+        for target, (role, _, _) in self.roles.items():
+            if role == 'event' and column.endswith(f'{target}_reference'):
+                row = f'p * {self.events} + {self.rand(table, column, self.events)}'
+                return f"'{_resource_type(target)}/{target}-' || ({row})"
+        return f"'Practitioner/practitioner-' || {self.rand(table, column, 200)}"
+
+    def foreign_key(self, table: str, column: str, target: str) -> str:
+        """Id of a generated row of target, in target's id scheme; event rows belong to the same patient"""
+        role = self.roles[target][0]
+        root = target
+        while role == 'child':
+            root = self.roles[root][1]
+            role = self.roles[root][0]
+
+        if role == 'patient':
+            return "'synthetic-patient-' || p"
+        if role == 'event':
+            row = f'p * {self.events} + {self.rand(table, column, self.events)}'
+        else:
+            row = str(self.rand(table, column, min(LOOKUP_ROWS, self.patients)))
+        return f"'{target}-' || ({row})"
+
+    def column_value(self, table: str, column: str) -> str:
+        role, parent, link = self.roles[table]
+        patient_id = "'synthetic-patient-' || p"
+
+        if column == link:
+            return f"'{parent}-' || i" if link == f'{parent}_id' else f"'{link}-' || i"
+        if column == 'id':
+            return patient_id if role == 'patient' else f"'{table}-' || i"
+        if column in PATIENT_REFERENCE_COLUMNS:
+            return "'Patient/' || " + patient_id
+        if column in PATIENT_ID_COLUMNS:
+            return patient_id
+        if column == 'mrn':
+            return "'MRN' || lpad(CAST(p AS VARCHAR), 8, '0')"
+        if column in ID_REFERENCE_COLUMNS and ID_REFERENCE_COLUMNS[column] in self.schema:
+            return self.foreign_key(table, column, ID_REFERENCE_COLUMNS[column])
+        if column.endswith('_reference'):
+            return self.reference(table, column)
+        if column.endswith('_id'):
+            target = column[:-len('_id')]
+            if target in self.schema and target != table and 'id' in self.schema[target]:
+                return self.foreign_key(table, column, target)
+            return f"'{column}-' || i"
+        if is_date_column_name(column):
+            return self.date_value(table, column)
+        if column == 'gender':
+            return self.pick(table, column, GENDER_VALUES)
+        if column == 'race':
+            return self.pick(table, column, RACE_VALUES)
+        if column == 'ethnicity':
+            return self.pick(table, column, ETHNICITY_VALUES)
+        if column == 'status' or column.endswith('_status'):
+            return self.pick(table, column, STATUS_VALUES)
+        if column.endswith('_system'):
+            return self.pick(table, column, CODE_SYSTEMS)
+        if column.endswith('_code') or column == 'code':
+            return f'CAST({self.rand(table, column, 900000)} + 100000 AS VARCHAR)'
+        if 'boolean' in column or column.startswith(('is_', 'do_not_')):
+            return f"CASE WHEN {self.rand(table, column, 2)} = 0 THEN 'true' ELSE 'false' END"
+        if any(hint in column for hint in NUMERIC_HINTS):
+            return f'CAST({self.rand(table, column, 500)} AS VARCHAR)'
+        return self.pick(table, column, CLINICAL_TERMS)
+
+    def select(self, table: str, partitions: int) -> str:
+        columns = [
+            f'CAST({self.column_value(table, col)} AS {col_type}) AS "{col}"'
+            for col, col_type in self.schema[table].items()
+        ]
+        columns.append(f'CAST(p % {partitions} AS INTEGER) AS patient_bucket')
+        return f"SELECT {', '.join(columns)} FROM ({self.row_source(table)}) rows"
+
+def generate(output_dir: Path, patients: int, events_per_patient: int, partitions: int, seed: int,
+             tables: Optional[List[str]] = None, fixtures_dir: Path = FIXTURES_DIR,
+             database: str = DEFAULT_DATABASE) -> Dict[str, int]:
+    """Write every (or the given) source table as partitioned Parquet; returns table -> rows"""
+    schema = source_table_schema(discover_views(VIEWS_DIR, None), fixtures_dir, database)
+    roles = classify_tables(schema)
+    generator = _Generator(schema, roles, patients, events_per_patient, seed)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / SCHEMA_FILE_NAME).write_text(json.dumps(schema, indent=2, sort_keys=True) + '\n')
+
+    connection = duckdb.connect()
+    counts = {}
+
+    for table in sorted(tables or schema):
+        if table not in schema:
+            print(f"⚠️  {table}: not a source table of any view, skipped")
+            continue
+
+        started = time.perf_counter()
+        table_dir = output_dir / table
+        if table_dir.exists():
+            shutil.rmtree(table_dir)
+
+        connection.execute(
+            f"COPY ({generator.select(table, partitions)}) TO '{table_dir}' "
+            f"(FORMAT PARQUET, PARTITION_BY (patient_bucket))"
+        )
+        counts[table] = connection.execute(
+            f"SELECT count(*) FROM read_parquet('{table_dir}/**/*.parquet')"
+        ).fetchone()[0]
+
+        role = roles[table][0]
+        print(f"✅ {table:<45} {role:<8} {counts[table]:>12,} rows  {time.perf_counter() - started:6.2f}s")
+
+    manifest_file = output_dir / MANIFEST_FILE_NAME
+    row_counts = counts
+    if tables and manifest_file.exists():
+        # Keep the counts of the tables not regenerated
+        row_counts = dict(json.loads(manifest_file.read_text()).get('row_counts', {}), **counts)
+
+    manifest = {
+        'patients': patients,
+        'events_per_patient': events_per_patient,
+        'partitions': partitions,
+        'seed': seed,
+        'date_format_mix': dict(DATE_FORMAT_MIX),
+        'row_counts': dict(sorted(row_counts.items())),
+    }
+    manifest_file.write_text(json.dumps(manifest, indent=2) + '\n')
+
+    return counts
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate synthetic FHIR source tables as partitioned Parquet')
+    parser.add_argument('--patients', type=int, default=DEFAULT_PATIENTS,
+                        help=f'Number of patients (default: {DEFAULT_PATIENTS})')
+    parser.add_argument('--events-per-patient', type=int, default=DEFAULT_EVENTS_PER_PATIENT,
+                        help=f'Rows per patient in each event table (default: {DEFAULT_EVENTS_PER_PATIENT})')
+    parser.add_argument('--partitions', type=int, default=DEFAULT_PARTITIONS,
+                        help=f'Patient buckets to partition each table by (default: {DEFAULT_PARTITIONS})')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help=f'Random seed; the same seed gives the same data (default: {DEFAULT_SEED})')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT_DIR,
+                        help=f'Output directory (default: {DEFAULT_OUTPUT_DIR.name}/)')
+    parser.add_argument('--tables', nargs='+', help='Only generate these tables')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    print("=" * 100)
+    print(f"GENERATING SYNTHETIC FHIR DATA: {args.patients:,} patients, "
+          f"{args.events_per_patient} events/patient, seed {args.seed}")
+    print("=" * 100)
+
+    started = time.perf_counter()
+    counts = generate(args.output, args.patients, args.events_per_patient, args.partitions,
+                      args.seed, args.tables)
+
+    print(f"\n{'=' * 100}")
+    print(f"SUMMARY: {len(counts)} tables, {sum(counts.values()):,} rows in "
+          f"{time.perf_counter() - started:.1f}s -> {args.output}")
+    print("=" * 100)
+
+if __name__ == '__main__':
+    main()
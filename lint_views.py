@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Static performance linter for views/*.sql and the saved-query .sql files.
+
+Each file is tokenized (sql_analyzer) and checked for patterns that are
+expensive on Athena:
+
+- like-chain:           three or more LIKE '%...%' scans of the same
+                        expression; each one is a full substring scan per row,
+                        plus a LOWER() pass when the expression is lowercased
+- repeated-like:        the same LIKE keyword tested on the same expression in
+                        more than one place (e.g. the category and subtype CASEs)
+- duplicate-date-parse: the same date_parse / from_iso8601 call on the same
+                        column repeated in a file
+- multi-format-parse:   one column parsed with several formats (COALESCE
+                        fallbacks); normalize_date_parsing.py rewrites these
+- unpartitioned-window: OVER (...) without PARTITION BY, e.g. ROW_NUMBER()
+                        OVER (ORDER BY (SELECT NULL)); every row is sorted on
+                        a single worker
+- select-star:          SELECT * from a table, which defeats Parquet column
+                        pruning
+- subquery-order-by:    ORDER BY in a CTE or subquery without LIMIT; the sort
+                        is discarded by the enclosing query
+
+Costs are relative per-row units: one unit is one pass over a string value
+(a LIKE scan, a LOWER() or a date parse). Structural findings carry fixed
+weights (STRUCTURAL_COSTS) so they rank alongside them. The report ranks
+files by total cost; --json prints the same data for CI, and --max-cost /
+--fail-on turn findings into a non-zero exit status.
+
+Usage:
+    python3 lint_views.py                          # ranked report
+    python3 lint_views.py views/v2_unified_patient_timeline.sql
+    python3 lint_views.py --json > lint.json
+    python3 lint_views.py --max-cost 100 --fail-on unpartitioned-window select-star
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sql_analyzer import (
+    CLOSE_BRACKETS, DATE_PARSE_FUNCTIONS, ISO8601_FUNCTIONS, OPEN_BRACKETS, VIEWS_DIR,
+    Token, bracket_depths, matching_close, render, split_args, tokenize, unquote_string,
+)
+
+REPO_DIR = Path(__file__).parent
+
+# Concatenated export of the saved queries; its contents are linted via the individual files
+EXPORT_FILE = REPO_DIR / 'athena_saved_queries_all.sql'
+
+MIN_LIKE_CHAIN = 3
+
+STRUCTURAL_COSTS = {
+    'unpartitioned-window': 25,
+    'subquery-order-by': 10,
+    'select-star': 10,
+}
+
+RULES = [
+    'like-chain', 'repeated-like', 'duplicate-date-parse', 'multi-format-parse',
+    'unpartitioned-window', 'select-star', 'subquery-order-by',
+]
+
+def default_files() -> List[Path]:
+    """views/*.sql plus the saved-query .sql files at the top level"""
+    saved = [path for path in sorted(REPO_DIR.glob('*.sql')) if path != EXPORT_FILE]
+    return sorted(VIEWS_DIR.glob('*.sql')) + saved
+
+def _finding(rule: str, line: int, cost: int, message: str, lines: Optional[List[int]] = None) -> Dict:
+    return {'rule': rule, 'line': line, 'lines': lines or [line], 'cost': cost, 'message': message}
+
+def _expression_before(tokens: List[Token], depths: List[int], end: int) -> Optional[int]:
+    """Start index of the operand ending just before tokens[end] (column, a.b or f(...))"""
+    j = end - 1
+    if j < 0:
+        return None
+    if tokens[j].value in CLOSE_BRACKETS:
+        depth = depths[j]
+        start = j - 1
+        while start >= 0 and not (depths[start] == depth and tokens[start].value in OPEN_BRACKETS):
+            start -= 1
+        if start < 0:
+            return None
+        if start > 0 and tokens[start - 1].kind == 'ident':
+            start -= 1
+        return start
+    if tokens[j].kind in ('ident', 'quoted'):
+        start = j
+        while start >= 2 and tokens[start - 1].value == '.' and tokens[start - 2].kind in ('ident', 'quoted'):
+            start -= 2
+        return start
+    return None
+
+def check_like_scans(tokens: List[Token], depths: List[int]) -> List[Dict]:
+    """like-chain and repeated-like findings"""
+    scans: Dict[str, List[Tuple[int, str]]] = {}
+
+    for idx, token in enumerate(tokens):
+        if token.word != 'LIKE' or idx + 1 >= len(tokens) or tokens[idx + 1].kind != 'string':
+            continue
+        pattern = unquote_string(tokens[idx + 1])
+        if not pattern.startswith('%'):
+            # A prefix match can use min/max statistics; only leading wildcards force a scan
+            continue
+        end = idx - 1 if tokens[idx - 1].word == 'NOT' else idx
+        start = _expression_before(tokens, depths, end)
+        if start is None:
+            continue
+        scans.setdefault(render(tokens, start, end), []).append((token.line, pattern.lower()))
+
+    findings = []
+    for subject, uses in scans.items():
+        per_scan = 2 if subject.upper().startswith('LOWER(') else 1
+        lines = sorted({line for line, _ in uses})
+
+        if len(uses) >= MIN_LIKE_CHAIN:
+            lowered = ' (each with its own LOWER())' if per_scan == 2 else ''
+            findings.append(_finding(
+                'like-chain', lines[0], len(uses) * per_scan,
+                f"{len(uses)} LIKE '%...%' scans of {subject}{lowered}; "
+                f"a lookup table or one regexp_like alternation scans it once", lines
+            ))
+
+        counts: Dict[str, List[int]] = {}
+        for line, pattern in uses:
+            counts.setdefault(pattern, []).append(line)
+        repeated = {pattern: at for pattern, at in counts.items() if len(at) > 1}
+        if repeated:
+            extra = sum(len(at) - 1 for at in repeated.values())
+            keywords = ', '.join(f"'{pattern}'" for pattern in sorted(repeated))
+            findings.append(_finding(
+                'repeated-like', min(min(at) for at in repeated.values()), extra * per_scan,
+                f"{subject} is tested for {keywords} more than once ({extra} redundant scan(s))",
+                sorted({line for at in repeated.values() for line in at})
+            ))
+
+    return findings
+
+def check_date_parsing(tokens: List[Token], depths: List[int]) -> List[Dict]:
+    """duplicate-date-parse and multi-format-parse findings"""
+    calls: Dict[Tuple[str, str, str], List[int]] = {}
+    formats: Dict[str, Dict[str, int]] = {}
+
+    for idx, token in enumerate(tokens):
+        word = token.word
+        if word not in DATE_PARSE_FUNCTIONS | ISO8601_FUNCTIONS:
+            continue
+        if idx + 1 >= len(tokens) or tokens[idx + 1].value != '(' or tokens[idx - 1].value == '.':
+            continue
+        close = matching_close(tokens, depths, idx + 1)
+        args = split_args(tokens, depths, idx + 1, close)
+        if not args:
+            continue
+        source = render(tokens, *args[0])
+        fmt = ''
+        if word in DATE_PARSE_FUNCTIONS and len(args) > 1:
+            fmt = render(tokens, *args[1])
+        calls.setdefault((word.lower(), source, fmt), []).append(token.line)
+        formats.setdefault(source, {}).setdefault(fmt or word.lower(), token.line)
+
+    findings = []
+    for (function, source, fmt), lines in calls.items():
+        if len(lines) > 1:
+            shown = f"{function}({source}{', ' + fmt if fmt else ''})"
+            findings.append(_finding(
+                'duplicate-date-parse', lines[0], len(lines) - 1,
+                f"{shown} is evaluated {len(lines)} times; parse once in a CTE and reuse the column",
+                lines
+            ))
+    for source, seen in formats.items():
+        if len(seen) > 1:
+            findings.append(_finding(
+                'multi-format-parse', min(seen.values()), len(seen) - 1,
+                f"{source} is parsed with {len(seen)} formats ({', '.join(sorted(seen))}); "
+                f"see normalize_date_parsing.py", sorted(seen.values())
+            ))
+
+    return findings
+
+def check_windows(tokens: List[Token], depths: List[int]) -> List[Dict]:
+    """unpartitioned-window findings"""
+    findings = []
+
+    for idx, token in enumerate(tokens):
+        if token.word != 'OVER' or idx + 1 >= len(tokens) or tokens[idx + 1].value != '(':
+            continue
+        close = matching_close(tokens, depths, idx + 1)
+        inner = depths[idx + 1] + 1
+        words = [t.word for t, d in zip(tokens[idx + 2:close], depths[idx + 2:close]) if d == inner]
+        if 'PARTITION' in words:
+            continue
+
+        function = render(tokens, _expression_before(tokens, depths, idx) or idx, idx)
+        window = render(tokens, idx, close + 1)
+        constant_order = 'ORDER' in words and all(
+            t.word in ('ORDER', 'BY', 'SELECT', 'NULL') or t.kind == 'number' or t.value in ('(', ')')
+            for t in tokens[idx + 2:close]
+        )
+        detail = ('numbering is arbitrary and ' if constant_order else '') + \
+            'every row is sorted on a single worker'
+        findings.append(_finding(
+            'unpartitioned-window', token.line, STRUCTURAL_COSTS['unpartitioned-window'],
+            f"{function} {window}: {detail}"
+        ))
+
+    return findings
+
+def _cte_names(tokens: List[Token], depths: List[int]) -> set:
+    names = set()
+    for idx, token in enumerate(tokens):
+        if token.word == 'AS' and idx + 1 < len(tokens) and tokens[idx + 1].value == '(' \
+                and idx + 2 < len(tokens) and tokens[idx + 2].word in ('SELECT', 'WITH') \
+                and tokens[idx - 1].kind in ('ident', 'quoted'):
+            names.add(tokens[idx - 1].value.strip('"').lower())
+    return names
+
+def check_select_star(tokens: List[Token], depths: List[int]) -> List[Dict]:
+    """select-star findings (SELECT * / t.* reading a table rather than a CTE)"""
+    ctes = _cte_names(tokens, depths)
+    findings = []
+
+    for idx, token in enumerate(tokens):
+        if token.word != 'SELECT':
+            continue
+        depth = depths[idx]
+        j = idx + 1
+        while j < len(tokens) and tokens[j].word in ('DISTINCT', 'ALL'):
+            j += 1
+
+        star = False
+        source = None
+        while j < len(tokens) and depths[j] >= depth:
+            if depths[j] == depth:
+                if tokens[j].value == '*' and (tokens[j - 1].value in (',', '.') or tokens[j - 1].word in
+                                               ('SELECT', 'DISTINCT', 'ALL')):
+                    star = True
+                if tokens[j].word == 'FROM':
+                    k = j + 1
+                    if k < len(tokens) and tokens[k].kind in ('ident', 'quoted') \
+                            and tokens[k].word not in ('UNNEST', 'LATERAL', 'SELECT'):
+                        parts = [tokens[k].value.strip('"').lower()]
+                        while k + 2 < len(tokens) and tokens[k + 1].value == '.':
+                            k += 2
+                            parts.append(tokens[k].value.strip('"').lower())
+                        source = '.'.join(parts)
+                    break
+                if tokens[j].word in ('UNION', 'EXCEPT', 'INTERSECT') or tokens[j].value == ';':
+                    break
+            j += 1
+
+        if star and source and source not in ctes:
+            findings.append(_finding(
+                'select-star', token.line, STRUCTURAL_COSTS['select-star'],
+                f"SELECT * from {source} reads every column; name the columns so Parquet scans only those"
+            ))
+
+    return findings
+
+def _is_ctas_body(tokens: List[Token], depths: List[int], open_idx: int) -> bool:
+    """True for the ( of CREATE TABLE name [WITH (...)] AS (SELECT ...), whose order is written out"""
+    k = open_idx - 1
+    if k < 0 or tokens[k].word != 'AS':
+        return False
+    k -= 1
+    if k >= 0 and tokens[k].value == ')':
+        while k >= 0 and not (depths[k] == depths[open_idx] and tokens[k].value == '('):
+            k -= 1
+        k -= 2  # WITH and the table name
+    start = _expression_before(tokens, depths, k + 1)
+    return start is not None and start > 0 and tokens[start - 1].word == 'TABLE'
+
+def check_subquery_order_by(tokens: List[Token], depths: List[int]) -> List[Dict]:
+    """subquery-order-by findings"""
+    findings = []
+
+    for idx, token in enumerate(tokens):
+        if token.word != 'ORDER' or idx + 1 >= len(tokens) or tokens[idx + 1].word != 'BY':
+            continue
+        depth = depths[idx]
+        if depth == 0:
+            continue
+
+        # Enclosing bracket: skip OVER (...), WITHIN GROUP (...) and aggregate calls
+        open_idx = idx - 1
+        while open_idx >= 0 and not (depths[open_idx] == depth - 1 and tokens[open_idx].value in OPEN_BRACKETS):
+            open_idx -= 1
+        if open_idx < 0 or tokens[open_idx + 1].word not in ('SELECT', 'WITH'):
+            continue
+        if _is_ctas_body(tokens, depths, open_idx):
+            continue
+
+        close = matching_close(tokens, depths, open_idx)
+        if any(t.word in ('LIMIT', 'FETCH', 'OFFSET') and d == depth
+               for t, d in zip(tokens[idx:close], depths[idx:close])):
+            continue
+
+        findings.append(_finding(
+            'subquery-order-by', token.line, STRUCTURAL_COSTS['subquery-order-by'],
+            'ORDER BY in a CTE/subquery without LIMIT sorts rows the outer query does not keep in order'
+        ))
+
+    return findings
+
+CHECKS = [check_like_scans, check_date_parsing, check_windows, check_select_star, check_subquery_order_by]
+
+def lint_sql(sql: str) -> List[Dict]:
+    """Run every check over one file's SQL; findings sorted by cost, highest first"""
+    tokens = tokenize(sql)
+    depths = bracket_depths(tokens)
+
+    findings = []
+    for check in CHECKS:
+        findings.extend(check(tokens, depths))
+    return sorted(findings, key=lambda f: (-f['cost'], f['line']))
+
+def lint_files(paths: List[Path]) -> List[Dict]:
+    """Lint each file; returns per-file results ranked by total cost"""
+    results = []
+    for path in paths:
+        findings = lint_sql(path.read_text())
+        try:
+            name = str(path.resolve().relative_to(REPO_DIR))
+        except ValueError:
+            name = str(path)
+        results.append({
+            'file': name,
+            'total_cost': sum(f['cost'] for f in findings),
+            'findings': findings,
+        })
+    return sorted(results, key=lambda r: (-r['total_cost'], r['file']))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Flag expensive SQL patterns in views and saved queries')
+    parser.add_argument('files', nargs='*', type=Path,
+                        help='SQL files to lint (default: views/*.sql and the top-level saved queries)')
+    parser.add_argument('--json', action='store_true',
+                        help='Print machine-readable results instead of the report')
+    parser.add_argument('--top', type=int, default=10,
+                        help='Findings shown per file in the report (default: 10)')
+    parser.add_argument('--max-cost', type=int,
+                        help='Exit 1 if any file has a total cost above this')
+    parser.add_argument('--fail-on', nargs='+', choices=RULES, default=[],
+                        help='Exit 1 if any finding of these rules is present')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    results = lint_files(args.files or default_files())
+
+    rule_totals = {rule: {'findings': 0, 'cost': 0} for rule in RULES}
+    for result in results:
+        for finding in result['findings']:
+            rule_totals[finding['rule']]['findings'] += 1
+            rule_totals[finding['rule']]['cost'] += finding['cost']
+
+    failures = []
+    for result in results:
+        if args.max_cost is not None and result['total_cost'] > args.max_cost:
+            failures.append(f"{result['file']}: total cost {result['total_cost']} > {args.max_cost}")
+        for finding in result['findings']:
+            if finding['rule'] in args.fail_on:
+                failures.append(f"{result['file']}:{finding['line']}: {finding['rule']}")
+
+    if args.json:
+        json.dump({
+            'files': results,
+            'rules': rule_totals,
+            'total_cost': sum(r['total_cost'] for r in results),
+            'failures': failures,
+        }, sys.stdout, indent=2)
+        print()
+        sys.exit(1 if failures else 0)
+
+    print("=" * 100)
+    print("SQL PERFORMANCE LINT")
+    print("=" * 100)
+
+    flagged = [r for r in results if r['findings']]
+    for result in flagged:
+        print(f"\n📝 {result['file']}  (cost {result['total_cost']}, {len(result['findings'])} finding(s))")
+        for finding in result['findings'][:args.top]:
+            print(f"   {finding['line']:>5}  {finding['rule']:<22} {finding['cost']:>4}  {finding['message']}")
+        if len(result['findings']) > args.top:
+            print(f"   ... {len(result['findings']) - args.top} more (use --top)")
+
+    print(f"\n{'=' * 100}")
+    print(f"SUMMARY: {len(results)} file(s) scanned, {len(flagged)} with findings, "
+          f"total cost {sum(r['total_cost'] for r in results)}")
+    print("=" * 100)
+    for rule, totals in rule_totals.items():
+        if totals['findings']:
+            print(f"   {rule:<22} {totals['findings']:>4} finding(s)  cost {totals['cost']}")
+
+    if failures:
+        print(f"\n❌ {len(failures)} gate failure(s):")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
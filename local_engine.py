@@ -0,0 +1,673 @@
+#!/usr/bin/env python3
+"""
+Offline execution of the views against fixture FHIR tables, using DuckDB.
+
+Every validation script needs live Athena and the production results bucket;
+each iteration costs money and tens of seconds of queue time. This module runs
+the same SQL in-process:
+
+- transpile() rewrites the Presto dialect used in views/*.sql into DuckDB SQL
+  (LISTAGG ... WITHIN GROUP, DATE_ADD, CONCAT NULL semantics, global
+  REGEXP_REPLACE, ARRAY(T) types, MySQL-style date_parse formats, TRY(...)
+  as non-raising TRY_CAST/try_* calls); functions
+  DuckDB lacks (from_iso8601_timestamp, date_parse, array_join, ...) are
+  defined as macros
+- the source FHIR tables (patient, encounter, medication_request, ...) are
+  created in a fhir_prd_db schema from fixtures/schema.json plus every
+  alias.column the views reference, all VARCHAR unless schema.json says
+  otherwise, and filled from fixtures/<table>.csv when present (a quoted ""
+  field loads as '', an empty unquoted field as NULL, mirroring the FHIR
+  export's blank strings vs missing values); Parquet
+  (<table>.parquet or a partitioned <table>/ directory, e.g. from
+  generate_synthetic_fhir.py) is queried in place instead of copied
+- every view in views/ is created in dependency order (deploy_views DAG,
+  including files not in VIEWS_TO_DEPLOY, the v2_ file winning as with
+  deploy_views.py --all-views); a failing view skips only its dependents.
+  Views whose file is a placeholder (PLACEHOLDER_VIEWS) are created as empty
+  source tables with the columns the other views read from them
+
+LocalAthenaClient implements the Athena calls the repo uses
+(start_query_execution, batch_get_query_execution, get_query_execution,
+get_query_results with NextToken paging), so AthenaQueryRunner and
+athena_results work against it unchanged.
+
+Requires: pip install duckdb
+
+Usage:
+    python3 local_engine.py                              # build tables + views, report
+    python3 local_engine.py --query "SELECT * FROM v_patient_demographics LIMIT 5"
+    python3 local_engine.py --write-schema               # refresh fixtures/schema.json
+    python3 validate_all_date_columns.py --local
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import duckdb
+
+from athena_query_runner import DEFAULT_DATABASE
+from athena_results import MAX_PAGE_SIZE, athena_text, iter_query_results
+from deploy_views import (VIEWS_DIR, build_dependency_graph, discover_views, downstream_views,
+                          topological_levels)
+from sql_analyzer import Token, bracket_depths, matching_close, split_args, tokenize, unquote_string
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+SCHEMA_FILE_NAME = 'schema.json'
+
+LOCAL_OUTPUT_LOCATION = 'local://duckdb/'
+
+# View files that do not hold a real definition, e.g. a VALUES list still to be generated
+PLACEHOLDER_VIEWS = {'v_chemotherapy_rxnorm_codes'}
+
+# Patient in fixtures/ with rows in most tables, for probe queries
+FIXTURE_PATIENT_ID = 'fixture-patient-1'
+
+# Local queries finish before start_query_execution returns; poll AthenaQueryRunner right away
+LOCAL_POLL_INTERVAL = 0.01
+
+# Presto (MySQL-style) date_parse/date_format specifiers that differ in strptime/strftime
+PRESTO_FORMAT_SPECIFIERS = {
+    '%i': '%M',
+    '%s': '%S',
+    '%T': '%H:%M:%S',
+    '%h': '%I',
+    '%r': '%I:%M:%S %p',
+}
+
+# Presto functions DuckDB does not have; the Presto name is kept in the SQL
+MACROS = [
+    'CREATE OR REPLACE MACRO from_iso8601_timestamp(s) AS CAST(CAST(s AS TIMESTAMPTZ) AS TIMESTAMP)',
+    'CREATE OR REPLACE MACRO from_iso8601_date(s) AS CAST(s AS DATE)',
+    'CREATE OR REPLACE MACRO date_parse(s, fmt) AS strptime(s, fmt)',
+    'CREATE OR REPLACE MACRO date_format(t, fmt) AS strftime(t, fmt)',
+    'CREATE OR REPLACE MACRO array_join(a, sep) AS array_to_string(a, sep)',
+    'CREATE OR REPLACE MACRO regexp_like(s, pattern) AS regexp_matches(s, pattern)',
+    # Non-raising variants used inside TRY(...)
+    'CREATE OR REPLACE MACRO try_from_iso8601_timestamp(s) AS TRY_CAST(TRY_CAST(s AS TIMESTAMPTZ) AS TIMESTAMP)',
+    'CREATE OR REPLACE MACRO try_from_iso8601_date(s) AS TRY_CAST(s AS DATE)',
+    'CREATE OR REPLACE MACRO try_date_parse(s, fmt) AS try_strptime(s, fmt)',
+]
+
+# Inside TRY(...), raising functions are swapped for these non-raising ones
+LENIENT_FUNCTIONS = {
+    'CAST': 'TRY_CAST',
+    'FROM_ISO8601_TIMESTAMP': 'try_from_iso8601_timestamp',
+    'FROM_ISO8601_DATE': 'try_from_iso8601_date',
+    'DATE_PARSE': 'try_date_parse',
+}
+
+# Words that can follow a table name without being its alias
+NON_ALIAS_WORDS = {
+    'ON', 'WHERE', 'GROUP', 'ORDER', 'LEFT', 'RIGHT', 'INNER', 'OUTER', 'FULL', 'CROSS',
+    'JOIN', 'UNION', 'EXCEPT', 'INTERSECT', 'LIMIT', 'HAVING', 'USING', 'WINDOW', 'AS',
+}
+
+# Identifiers that are never column references
+SQL_KEYWORDS = {
+    'SELECT', 'FROM', 'WHERE', 'AND', 'OR', 'NOT', 'IN', 'IS', 'NULL', 'TRUE', 'FALSE',
+    'CASE', 'WHEN', 'THEN', 'ELSE', 'END', 'AS', 'ON', 'JOIN', 'LEFT', 'RIGHT', 'INNER',
+    'OUTER', 'FULL', 'CROSS', 'GROUP', 'BY', 'ORDER', 'HAVING', 'LIMIT', 'DISTINCT', 'ALL',
+    'UNION', 'EXCEPT', 'INTERSECT', 'LIKE', 'BETWEEN', 'EXISTS', 'ASC', 'DESC', 'NULLS',
+    'FIRST', 'LAST', 'OVER', 'PARTITION', 'ROWS', 'RANGE', 'UNBOUNDED', 'PRECEDING',
+    'FOLLOWING', 'CURRENT', 'ROW', 'WITH', 'INTERVAL', 'YEAR', 'MONTH', 'DAY', 'HOUR',
+    'MINUTE', 'SECOND', 'WITHIN', 'FILTER', 'ESCAPE', 'USING', 'VALUES', 'DATE',
+    'TIMESTAMP', 'VARCHAR', 'CREATE', 'REPLACE', 'VIEW', 'CURRENT_DATE', 'CURRENT_TIMESTAMP',
+    'LOCALTIMESTAMP', 'CURRENT_TIME',
+}
+
+# DuckDB type names -> the names Athena reports in ColumnInfo
+ATHENA_TYPE_NAMES = {
+    'VARCHAR': 'varchar',
+    'BOOLEAN': 'boolean',
+    'TINYINT': 'tinyint',
+    'SMALLINT': 'smallint',
+    'INTEGER': 'integer',
+    'BIGINT': 'bigint',
+    'HUGEINT': 'bigint',
+    'FLOAT': 'real',
+    'DOUBLE': 'double',
+    'DATE': 'date',
+    'TIMESTAMP': 'timestamp',
+    'TIMESTAMP WITH TIME ZONE': 'timestamp with time zone',
+    'JSON': 'json',
+}
+
+def _convert_format(token: Token) -> str:
+    """Rewrite a Presto date format literal for strptime/strftime"""
+    fmt = unquote_string(token)
+    out = []
+    i = 0
+    while i < len(fmt):
+        spec = fmt[i:i + 2]
+        if spec in PRESTO_FORMAT_SPECIFIERS:
+            out.append(PRESTO_FORMAT_SPECIFIERS[spec])
+            i += 2
+        elif fmt[i] == '%' and i + 1 < len(fmt):
+            out.append(spec)
+            i += 2
+        else:
+            out.append(fmt[i])
+            i += 1
+    return "'" + ''.join(out).replace("'", "''") + "'"
+
+class _Transpiler:
+    """Token-range rewriter; text between tokens (whitespace, comments) is kept as-is"""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.tokens = tokenize(sql)
+        self.depths = bracket_depths(self.tokens)
+        self.lenient = 0
+
+    def gap(self, idx: int) -> str:
+        """Source text between tokens[idx] and the next token"""
+        token = self.tokens[idx]
+        end = self.tokens[idx + 1].pos if idx + 1 < len(self.tokens) else len(self.sql)
+        return self.sql[token.pos + len(token.value):end]
+
+    def emit(self, start: int, end: int) -> str:
+        """Transpiled text of tokens[start:end], without the gap after the last token"""
+        out = []
+        idx = start
+        while idx < end:
+            rewritten = self.rewrite(idx)
+            if rewritten is None:
+                text, last = self.tokens[idx].value, idx
+            else:
+                text, last = rewritten
+            out.append(text)
+            if last + 1 < end:
+                out.append(self.gap(last))
+            idx = last + 1
+        return ''.join(out)
+
+    def args(self, open_idx: int) -> Tuple[int, List[Tuple[int, int]]]:
+        close = matching_close(self.tokens, self.depths, open_idx)
+        return close, split_args(self.tokens, self.depths, open_idx, close)
+
+    def rewrite(self, idx: int) -> Optional[Tuple[str, int]]:
+        """(replacement, index of the last token replaced) for a construct starting at idx"""
+        tokens = self.tokens
+        token = tokens[idx]
+        word = token.word
+        if not word or idx + 1 >= len(tokens) or tokens[idx + 1].value != '(':
+            return None
+        if idx > 0 and tokens[idx - 1].value == '.':
+            return None
+
+        close, args = self.args(idx + 1)
+        is_type = idx > 0 and tokens[idx - 1].word == 'AS'
+
+        if word == 'ARRAY' and is_type and len(args) == 1:
+            return f'{self.emit(*args[0])}[]', close
+
+        if word == 'TRY' and len(args) == 1:
+            # DuckDB's TRY() cannot wrap aggregates or grouped columns, so the
+            # expression is rewritten with non-raising functions instead
+            self.lenient += 1
+            inner = self.emit(*args[0])
+            self.lenient -= 1
+            return f'({inner})', close
+
+        if self.lenient and word == 'DATE' and len(args) == 1:
+            return f'TRY_CAST({self.emit(*args[0])} AS DATE)', close
+
+        if word == 'LISTAGG' and args:
+            # LISTAGG(x, sep) WITHIN GROUP (ORDER BY y) -> string_agg(x, sep ORDER BY y)
+            order_by = ''
+            last = close
+            if (close + 3 < len(tokens) and tokens[close + 1].word == 'WITHIN'
+                    and tokens[close + 2].word == 'GROUP' and tokens[close + 3].value == '('):
+                group_close = matching_close(tokens, self.depths, close + 3)
+                order_by = ' ' + self.emit(close + 4, group_close)
+                last = group_close
+            rendered = ', '.join(self.emit(*arg) for arg in args)
+            return f'string_agg({rendered}{order_by})', last
+
+        if word == 'DATE_ADD' and len(args) == 3 and args[0][1] - args[0][0] == 1 \
+                and tokens[args[0][0]].kind == 'string':
+            unit = unquote_string(tokens[args[0][0]]).upper()
+            return f'({self.emit(*args[2])} + ({self.emit(*args[1])}) * INTERVAL 1 {unit})', close
+
+        if word == 'CONCAT' and len(args) > 1:
+            # Presto CONCAT returns NULL if any argument is NULL, like ||
+            return '(' + ' || '.join(self.emit(*arg) for arg in args) + ')', close
+
+        if word == 'REGEXP_REPLACE' and len(args) in (2, 3):
+            # Presto replaces every match and uses $1 for groups; DuckDB needs 'g' and \1
+            replacement = "''"
+            if len(args) == 3:
+                replacement = self.emit(*args[2])
+                if args[2][1] - args[2][0] == 1 and tokens[args[2][0]].kind == 'string':
+                    replacement = replacement.replace('$', '\\')
+            return (f'{token.value}({self.emit(*args[0])}, {self.emit(*args[1])}, '
+                    f"{replacement}, 'g')"), close
+
+        if word in ('DATE_PARSE', 'DATE_FORMAT') and len(args) == 2 \
+                and args[1][1] - args[1][0] == 1 and tokens[args[1][0]].kind == 'string':
+            name = LENIENT_FUNCTIONS[word] if self.lenient and word in LENIENT_FUNCTIONS else token.value
+            return f'{name}({self.emit(*args[0])}, {_convert_format(tokens[args[1][0]])})', close
+
+        if word in ('BERNOULLI', 'SYSTEM') and idx > 0 and tokens[idx - 1].word == 'TABLESAMPLE' \
+                and len(args) == 1:
+            # Presto samples a percentage; DuckDB reads a bare number as a row count
+            return f'{token.value} ({self.emit(*args[0])} PERCENT)', close
+
+        if self.lenient and word in LENIENT_FUNCTIONS:
+            return f'{LENIENT_FUNCTIONS[word]}({self.emit(idx + 2, close)})', close
+
+        return None
+
+def transpile(sql: str) -> str:
+    """Rewrite Presto/Athena SQL into DuckDB SQL"""
+    transpiler = _Transpiler(sql)
+    if not transpiler.tokens:
+        return sql
+    return transpiler.emit(0, len(transpiler.tokens)).rstrip().rstrip(';')
+
+def bind_parameters(sql: str, parameters: Iterable[str]) -> str:
+    """Substitute Athena ExecutionParameters (SQL literals) for ? placeholders, in order"""
+    parameters = list(parameters)
+    out = []
+    last = 0
+    for token in tokenize(sql):
+        if token.kind == 'op' and token.value == '?':
+            if not parameters:
+                raise ValueError('Not enough ExecutionParameters for the ? placeholders in the query')
+            out.append(sql[last:token.pos])
+            out.append(parameters.pop(0))
+            last = token.pos + 1
+    if parameters:
+        raise ValueError('More ExecutionParameters than ? placeholders in the query')
+    out.append(sql[last:])
+    return ''.join(out)
+
+def _source_table(tokens: List[Token], idx: int, database: str) -> Optional[Tuple[str, int]]:
+    """(table, index after the name) if a FROM/JOIN at idx reads database.table"""
+    j = idx + 1
+    while j < len(tokens) and tokens[j].value == '(':
+        j += 1
+    if j + 2 >= len(tokens) or tokens[j].value.lower() != database or tokens[j + 1].value != '.':
+        return None
+    return tokens[j + 2].value.lower(), j + 3
+
+def _unqualified_columns(tokens: List[Token], depths: List[int], select_idx: int,
+                         database: str) -> Tuple[Optional[str], Set[str]]:
+    """
+    (table, columns) for a SELECT block that reads exactly one database table.
+
+    Bare identifiers in such a block can only be that table's columns (or
+    aliases, which are filtered out as far as the tokens allow). Nested
+    subqueries are skipped; blocks with joins or other sources return None.
+    """
+    depth = depths[select_idx]
+    sources = []
+    names = set()
+
+    i = select_idx + 1
+    while i < len(tokens):
+        token = tokens[i]
+        if depths[i] < depth:
+            break
+        if depths[i] == depth and (token.word in ('SELECT', 'UNION', 'EXCEPT', 'INTERSECT') or token.value == ';'):
+            break
+
+        if token.value == '(' and i + 1 < len(tokens) and tokens[i + 1].word in ('SELECT', 'WITH'):
+            i = matching_close(tokens, depths, i) + 1
+            continue
+
+        if token.word in ('FROM', 'JOIN') and depths[i] == depth:
+            source = _source_table(tokens, i, database)
+            sources.append(source[0] if source else None)
+            if source:
+                i = source[1]
+                continue
+
+        if token.kind == 'ident' and token.word not in SQL_KEYWORDS:
+            prev, nxt = tokens[i - 1], tokens[i + 1] if i + 1 < len(tokens) else None
+            implicit_alias = prev.value in (')', ']') or prev.kind in ('string', 'number') \
+                or (prev.kind == 'ident' and prev.word not in SQL_KEYWORDS)
+            if not (prev.value == '.' or prev.word == 'AS' or implicit_alias
+                    or (nxt is not None and nxt.value in ('.', '('))):
+                names.add(token.value.lower())
+        i += 1
+
+    if len(sources) != 1 or sources[0] is None:
+        return None, set()
+    return sources[0], names
+
+def infer_source_columns(sql_texts: Iterable[str], database: str = DEFAULT_DATABASE) -> Dict[str, Set[str]]:
+    """
+    Map each database table read by the SQL to the columns referenced on it.
+
+    Columns are found as alias.column / table.column references, plus bare
+    identifiers in SELECT blocks that read a single table.
+    """
+    columns: Dict[str, Set[str]] = {}
+    database = database.lower()
+
+    for sql in sql_texts:
+        tokens = tokenize(sql)
+        depths = bracket_depths(tokens)
+        aliases: Dict[str, str] = {}
+
+        for i, token in enumerate(tokens):
+            if token.word == 'SELECT':
+                table, names = _unqualified_columns(tokens, depths, i, database)
+                if table:
+                    columns.setdefault(table, set()).update(names)
+                continue
+            if token.word not in ('FROM', 'JOIN'):
+                continue
+            source = _source_table(tokens, i, database)
+            if source is None:
+                continue
+
+            table, j = source
+            columns.setdefault(table, set())
+            aliases[table] = table
+            if j < len(tokens) and tokens[j].word == 'AS':
+                j += 1
+            if j < len(tokens) and tokens[j].kind == 'ident' and tokens[j].word not in NON_ALIAS_WORDS:
+                aliases[tokens[j].value.lower()] = table
+
+        for i in range(1, len(tokens) - 2):
+            if tokens[i + 1].value != '.' or tokens[i + 2].kind not in ('ident', 'quoted'):
+                continue
+            if tokens[i - 1].value == '.' or (i + 3 < len(tokens) and tokens[i + 3].value == '('):
+                continue
+            table = aliases.get(tokens[i].value.lower())
+            if table is not None:
+                columns[table].add(tokens[i + 2].value.strip('"').lower())
+
+    return columns
+
+def load_schema(fixtures_dir: Path) -> Dict[str, Dict[str, str]]:
+    """Return table -> {column: DuckDB type} from fixtures/schema.json (empty if missing)"""
+    schema_file = fixtures_dir / SCHEMA_FILE_NAME
+    if not schema_file.exists():
+        return {}
+    return json.loads(schema_file.read_text())
+
+def source_table_schema(view_files: Dict[str, Path], fixtures_dir: Path,
+                        database: str = DEFAULT_DATABASE) -> Dict[str, Dict[str, str]]:
+    """Merge schema.json with the columns the views reference; views themselves are excluded"""
+    schema = {table: dict(cols) for table, cols in load_schema(fixtures_dir).items()}
+    inferred = infer_source_columns((path.read_text() for path in view_files.values()), database)
+
+    for table, cols in inferred.items():
+        if table in view_files:
+            continue
+        table_schema = schema.setdefault(table, {})
+        for column in sorted(cols):
+            table_schema.setdefault(column, 'VARCHAR')
+
+    return schema
+
+def _fixture_file(fixtures_dir: Path, table: str) -> Optional[Path]:
+    """<table>/ (partitioned Parquet), <table>.parquet or <table>.csv, if present"""
+    for name in (table, f'{table}.parquet', f'{table}.csv'):
+        path = fixtures_dir / name
+        if path.exists():
+            return path
+    return None
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def _athena_type(duckdb_type: str) -> str:
+    if duckdb_type.endswith('[]'):
+        return 'array'
+    if duckdb_type.startswith('DECIMAL'):
+        return 'decimal'
+    if duckdb_type.startswith('MAP'):
+        return 'map'
+    if duckdb_type.startswith('STRUCT'):
+        return 'row'
+    return ATHENA_TYPE_NAMES.get(duckdb_type, duckdb_type.lower())
+
+class LocalAthenaClient:
+    """Athena client look-alike that runs every query synchronously in DuckDB"""
+
+    def __init__(self, database: str = DEFAULT_DATABASE, fixtures_dir: Path = FIXTURES_DIR,
+                 path: str = ':memory:'):
+        self.database = database
+        self.fixtures_dir = fixtures_dir
+        self.connection = duckdb.connect(path)
+        self.connection.execute("SET TimeZone = 'UTC'")
+        for macro in MACROS:
+            self.connection.execute(macro)
+
+        self._executions: Dict[str, Dict] = {}
+        self._results: Dict[str, Tuple[List[Tuple[str, str]], List[tuple]]] = {}
+        self._lock = threading.Lock()
+
+    def create_source_tables(self, schema: Dict[str, Dict[str, str]]) -> Dict[str, int]:
+        """Create the source tables and load their fixtures; returns table -> row count"""
+        counts = {}
+        with self._lock:
+            self.connection.execute(f'CREATE SCHEMA IF NOT EXISTS {_quote(self.database)}')
+
+            for table, cols in sorted(schema.items()):
+                qualified = f'{_quote(self.database)}.{_quote(table)}'
+                column_defs = ', '.join(f'{_quote(col)} {col_type}' for col, col_type in cols.items()) \
+                    or '"id" VARCHAR'
+                fixture = _fixture_file(self.fixtures_dir, table)
+
+                if fixture is not None and fixture.suffix != '.csv':
+                    # Parquet is queried in place so large synthetic datasets are not copied
+                    pattern = f'{fixture}/**/*.parquet' if fixture.is_dir() else str(fixture)
+                    reader = f"read_parquet('{pattern}', hive_partitioning = true, union_by_name = true)"
+                    present = {row[0] for row in self.connection.execute(f'DESCRIBE SELECT * FROM {reader}').fetchall()}
+                    select = ', '.join(
+                        f'CAST({_quote(col) if col in present else "NULL"} AS {col_type}) AS {_quote(col)}'
+                        for col, col_type in cols.items()
+                    ) or '*'
+                    self.connection.execute(f'CREATE OR REPLACE VIEW {qualified} AS SELECT {select} FROM {reader}')
+                else:
+                    self.connection.execute(f'CREATE OR REPLACE TABLE {qualified} ({column_defs})')
+                    if fixture is not None:
+                        self.connection.execute(
+                            f"INSERT INTO {qualified} BY NAME SELECT * FROM "
+                            f"read_csv('{fixture}', header = true, all_varchar = true, allow_quoted_nulls = false)"
+                        )
+
+                counts[table] = self.connection.execute(f'SELECT count(*) FROM {qualified}').fetchone()[0]
+
+        return counts
+
+    def start_query_execution(self, QueryString: str, QueryExecutionContext: Optional[Dict] = None,
+                              ResultConfiguration: Optional[Dict] = None,
+                              ExecutionParameters: Optional[List[str]] = None, **kwargs) -> Dict:
+        query_id = str(uuid.uuid4())
+        database = (QueryExecutionContext or {}).get('Database', self.database)
+        output_location = (ResultConfiguration or {}).get('OutputLocation', LOCAL_OUTPUT_LOCATION)
+
+        status = {'State': 'SUCCEEDED'}
+        started = time.perf_counter()
+        submitted = datetime.now()
+
+        try:
+            sql = transpile(bind_parameters(QueryString, ExecutionParameters or []))
+            with self._lock:
+                self.connection.execute(f"SET schema = '{database}'")
+                cursor = self.connection.execute(sql)
+                description = cursor.description
+                rows = cursor.fetchall() if description else []
+            columns = [(col[0], _athena_type(str(col[1]))) for col in description or []]
+            self._results[query_id] = (columns, rows)
+        except (duckdb.Error, ValueError) as e:
+            status = {'State': 'FAILED', 'StateChangeReason': str(e).splitlines()[0]}
+
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        status['SubmissionDateTime'] = submitted
+        status['CompletionDateTime'] = datetime.now()
+
+        self._executions[query_id] = {
+            'QueryExecutionId': query_id,
+            'Query': QueryString,
+            'QueryExecutionContext': {'Database': database},
+            'ResultConfiguration': {'OutputLocation': f'{output_location}{query_id}.csv'},
+            'Status': status,
+            'Statistics': {
+                'EngineExecutionTimeInMillis': elapsed_ms,
+                'QueryQueueTimeInMillis': 0,
+                'TotalExecutionTimeInMillis': elapsed_ms,
+                'DataScannedInBytes': 0,
+            },
+        }
+        return {'QueryExecutionId': query_id}
+
+    def get_query_execution(self, QueryExecutionId: str) -> Dict:
+        return {'QueryExecution': self._executions[QueryExecutionId]}
+
+    def batch_get_query_execution(self, QueryExecutionIds: List[str]) -> Dict:
+        return {
+            'QueryExecutions': [self._executions[qid] for qid in QueryExecutionIds if qid in self._executions],
+            'UnprocessedQueryExecutionIds': [
+                {'QueryExecutionId': qid, 'ErrorMessage': 'Unknown query'}
+                for qid in QueryExecutionIds if qid not in self._executions
+            ],
+        }
+
+    def get_query_results(self, QueryExecutionId: str, MaxResults: int = MAX_PAGE_SIZE,
+                          NextToken: Optional[str] = None) -> Dict:
+        columns, rows = self._results[QueryExecutionId]
+        offset = int(NextToken) if NextToken else 0
+
+        page = []
+        if offset == 0 and columns:
+            # Like Athena, the first page of a SELECT starts with the column labels
+            page.append({'Data': [{'VarCharValue': name} for name, _ in columns]})
+        limit = MaxResults - len(page)
+
+        for row in rows[offset:offset + limit]:
+            page.append({'Data': [
+                {} if value is None else {'VarCharValue': athena_text(value)} for value in row
+            ]})
+
+        response = {
+            'ResultSet': {
+                'Rows': page,
+                'ResultSetMetadata': {'ColumnInfo': [{'Name': name, 'Type': t} for name, t in columns]},
+            }
+        }
+        if offset + limit < len(rows):
+            response['NextToken'] = str(offset + limit)
+        return response
+
+def sample_patient_id(client: LocalAthenaClient) -> Optional[str]:
+    """The lowest patient id in the loaded fixtures, for patient lookups"""
+    try:
+        return client.connection.execute(f"SELECT min(id) FROM {client.database}.patient_access").fetchone()[0]
+    except duckdb.Error:
+        return None
+
+def deploy_local_views(client: LocalAthenaClient, view_files: Dict[str, Path],
+                       graph: Dict[str, Set[str]]) -> Dict[str, List]:
+    """
+    Create every view in dependency order.
+
+    Returns {'success': [...], 'failed': [(view, reason), ...], 'skipped': [...]}.
+    """
+    results = {'success': [], 'failed': [], 'skipped': []}
+    blocked: Set[str] = set()
+
+    for level in topological_levels(graph):
+        for view_name in level:
+            if view_name in blocked:
+                results['skipped'].append(view_name)
+                continue
+
+            query_id = client.start_query_execution(QueryString=view_files[view_name].read_text())['QueryExecutionId']
+            status = client.get_query_execution(query_id)['QueryExecution']['Status']
+            if status['State'] == 'SUCCEEDED':
+                results['success'].append(view_name)
+            else:
+                results['failed'].append((view_name, status['StateChangeReason']))
+                blocked |= downstream_views(graph, view_name)
+
+    return results
+
+def local_view_files(views_dir: Path = VIEWS_DIR) -> Dict[str, Path]:
+    """Every view defined in views_dir except the placeholders"""
+    return {name: path for name, path in discover_views(views_dir, None).items() if name not in PLACEHOLDER_VIEWS}
+
+def create_local_environment(fixtures_dir: Path = FIXTURES_DIR, views_dir: Path = VIEWS_DIR,
+                             database: str = DEFAULT_DATABASE, path: str = ':memory:',
+                             verbose: bool = True) -> LocalAthenaClient:
+    """Build a LocalAthenaClient with source tables loaded and every view created"""
+    view_files = local_view_files(views_dir)
+    graph = build_dependency_graph(view_files)
+
+    client = LocalAthenaClient(database, fixtures_dir, path)
+    counts = client.create_source_tables(source_table_schema(view_files, fixtures_dir, database))
+    results = deploy_local_views(client, view_files, graph)
+
+    if verbose:
+        loaded = {table: n for table, n in counts.items() if n}
+        print(f"📦 Local DuckDB: {len(counts)} source tables ({len(loaded)} with fixture rows), "
+              f"{len(results['success'])}/{len(view_files)} views created")
+        for view_name, reason in results['failed']:
+            print(f"   ❌ {view_name}: {reason}")
+        for view_name in results['skipped']:
+            print(f"   ⏭️  {view_name}: skipped (depends on a failed view)")
+
+    return client
+
+def write_schema(fixtures_dir: Path, views_dir: Path = VIEWS_DIR, database: str = DEFAULT_DATABASE) -> Path:
+    """Rewrite schema.json with every referenced column, keeping existing types"""
+    schema = source_table_schema(local_view_files(views_dir), fixtures_dir, database)
+    schema_file = fixtures_dir / SCHEMA_FILE_NAME
+    fixtures_dir.mkdir(parents=True, exist_ok=True)
+    schema_file.write_text(json.dumps(
+        {table: dict(sorted(cols.items())) for table, cols in sorted(schema.items())}, indent=2
+    ) + '\n')
+    return schema_file
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Run the views locally in DuckDB against fixture tables')
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR,
+                        help=f'Fixture directory with schema.json and <table>.csv/.parquet (default: {FIXTURES_DIR.name}/)')
+    parser.add_argument('--db', default=':memory:',
+                        help='DuckDB database file to build (default: in memory)')
+    parser.add_argument('--query', help='Run one query after building and print its rows')
+    parser.add_argument('--write-schema', action='store_true',
+                        help='Refresh schema.json from the columns the views reference and exit')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if args.write_schema:
+        schema_file = write_schema(args.fixtures)
+        print(f"📝 Wrote {schema_file}")
+        return
+
+    started = time.perf_counter()
+    client = create_local_environment(args.fixtures, path=args.db)
+    print(f"⏱️  Built in {time.perf_counter() - started:.2f}s")
+
+    if args.query:
+        query_id = client.start_query_execution(QueryString=args.query)['QueryExecutionId']
+        status = client.get_query_execution(query_id)['QueryExecution']['Status']
+        if status['State'] != 'SUCCEEDED':
+            print(f"❌ {status['StateChangeReason']}")
+            return
+
+        rows = list(iter_query_results(client, query_id))
+        if rows:
+            print(' | '.join(rows[0]))
+            print("-" * 80)
+        for row in rows:
+            print(' | '.join('NULL' if v is None else athena_text(v) for v in row.values()))
+        print(f"\n{len(rows)} row(s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Materialized (CTAS) mode for the heaviest views.
+
+v_unified_patient_timeline, v_chemo_treatment_episodes and
+v_radiation_treatments recompute long CTE chains on every read. With deploy_views.py --materialize each of them is
+deployed as three objects:
+
+    <view>_live          the view SQL unchanged, under a new name
+    <view>_mat_<build>   an Iceberg (Parquet) table built from <view>_live,
+                         partitioned by bucket(patient_fhir_id), so a
+                         single-patient read scans one small partition
+    <view>               SELECT * FROM <view>_mat_<build>, so readers do not
+                         change
+
+A full build writes a new <view>_mat_<build> table next to the current one,
+points <view> at it and only then drops the old table, so readers never see
+the view without a table behind it. The fingerprint table records which
+build is current. The fingerprint and scratch tables are Iceberg tables under
+the same location, so DROP TABLE deletes their data too instead of leaving it
+in the query-results prefix.
+
+Refreshes are incremental. The FHIR tables have no last-updated column, so
+changes are detected by fingerprint. Every source table the view reads (through
+its upstream views) is reduced to one checksum per patient and kept in
+<view>_mat_fingerprints. On refresh the fingerprints are recomputed, and only
+patients whose fingerprints differ are deleted from the current build and
+re-inserted from <view>_live. A refresh does a full rebuild when:
+
+- the table does not exist yet, or --full-refresh is given
+- the SQL of the view or any upstream view changed (definition hash)
+- a source table with no patient link (a lookup table such as medication) changed
+
+Fingerprint rows for lookup tables use patient '' so they take part in the same
+comparison.
+"""
+
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from athena_config import CONFIG
+from athena_query_runner import AthenaQueryRunner
+from athena_results import iter_query_results
+
+# view -> column the materialized table is bucketed on
+MATERIALIZED_VIEWS = {
+    'v_unified_patient_timeline': 'patient_fhir_id',
+    'v_chemo_treatment_episodes': 'patient_fhir_id',
+    'v_radiation_treatments': 'patient_fhir_id',
+}
+
+MATERIALIZED_LOCATION = CONFIG['materialized_location']
+BUCKET_COUNT = 64
+
+LIVE_SUFFIX = '_live'
+TABLE_SUFFIX = '_mat'
+FINGERPRINT_SUFFIX = '_mat_fingerprints'
+
+# Columns that link a source row to a patient, in order of preference
+PATIENT_KEY_COLUMNS = ('subject_reference', 'patient_reference', 'patient_fhir_id', 'patient_id',
+                       'participant_actor_reference')
+PATIENT_TABLES = {'patient', 'patient_access'}
+
+# 'Patient/abc' and 'abc' fingerprint to the same patient
+PATIENT_ID_EXPRESSION = "regexp_replace({column}, '^Patient/', '')"
+
+def _rows(runner: AthenaQueryRunner, sql: str, tag: str) -> List[Dict]:
+    execution = runner.run(sql, tag=tag)
+    return list(iter_query_results(runner.client, execution['QueryExecutionId']))
+
+def existing_tables(runner: AthenaQueryRunner, database: str, names: List[str], tag: str) -> set:
+    """The subset of names that exist as tables in database"""
+    in_list = ', '.join(f"'{name}'" for name in names)
+    rows = _rows(runner, f"""
+        SELECT table_name FROM information_schema.tables
+        WHERE table_schema = '{database}' AND table_name IN ({in_list})
+    """, tag)
+    return {row['table_name'] for row in rows}
+
+def table_columns(runner: AthenaQueryRunner, database: str, tables: List[str], tag: str) -> Dict[str, List[str]]:
+    """Column names of each table, in ordinal order"""
+    in_list = ', '.join(f"'{table}'" for table in tables)
+    rows = _rows(runner, f"""
+        SELECT table_name, column_name FROM information_schema.columns
+        WHERE table_schema = '{database}' AND table_name IN ({in_list})
+        ORDER BY table_name, ordinal_position
+    """, tag)
+    columns: Dict[str, List[str]] = {}
+    for row in rows:
+        columns.setdefault(row['table_name'], []).append(row['column_name'])
+    return columns
+
+def patient_link(table: str, columns: Dict[str, List[str]]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    How rows of table map to a patient: (patient column, joined table, join column).
+
+    A table either carries a patient column itself, or is linked by
+    <table>_id to a parent (condition_code_coding -> condition) or to a
+    child (appointment <- appointment_participant) that does. Returns
+    (None, None, None) for lookup tables.
+    """
+    cols = columns.get(table, [])
+    if table in PATIENT_TABLES:
+        return 'id', None, None
+    for column in PATIENT_KEY_COLUMNS:
+        if column in cols:
+            return column, None, None
+
+    for other, other_cols in columns.items():
+        if other == table:
+            continue
+        if table.startswith(other + '_') and f'{other}_id' in cols:
+            key = next((c for c in PATIENT_KEY_COLUMNS if c in other_cols), None)
+            if key:
+                return key, other, f'{other}_id'
+        if other.startswith(table + '_') and f'{table}_id' in other_cols:
+            key = next((c for c in PATIENT_KEY_COLUMNS if c in other_cols), None)
+            if key:
+                return key, other, f'{table}_id'
+
+    return None, None, None
+
+def fingerprint_sql(database: str, table: str, columns: Dict[str, List[str]]) -> str:
+    """SELECT producing (patient, source_table, fingerprint) for one source table"""
+    row = ', '.join(f't."{column}"' for column in columns[table])
+    key, joined, join_column = patient_link(table, columns)
+
+    if key is None:
+        return (f"SELECT '' AS patient, '{table}' AS source_table, checksum(ROW({row})) AS fingerprint "
+                f"FROM {database}.{table} t")
+
+    if joined is None:
+        patient = PATIENT_ID_EXPRESSION.format(column=f't."{key}"')
+        source = f"{database}.{table} t"
+    elif join_column == f'{joined}_id':
+        # table is the child: t.<parent>_id = p.id
+        patient = PATIENT_ID_EXPRESSION.format(column=f'p."{key}"')
+        source = f"{database}.{table} t JOIN {database}.{joined} p ON t.\"{join_column}\" = p.id"
+    else:
+        # table is the parent: p.<table>_id = t.id
+        patient = PATIENT_ID_EXPRESSION.format(column=f'p."{key}"')
+        source = f"{database}.{table} t JOIN {database}.{joined} p ON p.\"{join_column}\" = t.id"
+
+    # Rows that reach no patient cannot change a patient's view rows
+    return (f"SELECT {patient} AS patient, '{table}' AS source_table, checksum(ROW({row})) AS fingerprint "
+            f"FROM {source} WHERE {patient} IS NOT NULL GROUP BY 1")
+
+def iceberg_ctas(table: str, location: str, select: str, partitioning: Optional[str] = None) -> str:
+    """CTAS for an Iceberg table; unlike a plain CTAS table, DROP TABLE deletes its data as well"""
+    partition = f",\n            partitioning = ARRAY['{partitioning}']" if partitioning else ''
+    return f"""
+        CREATE TABLE {table}
+        WITH (
+            table_type = 'ICEBERG',
+            is_external = false,
+            format = 'PARQUET',
+            location = '{location}'{partition}
+        ) AS
+        {select}
+    """
+
+def materialize_view(runner: AthenaQueryRunner, view_name: str, plan: Dict,
+                     database: str = 'fhir_prd_db', location: str = MATERIALIZED_LOCATION,
+                     full_refresh: bool = False) -> Dict:
+    """
+    Deploy <view>_live, build or refresh <view>_mat_<build> and point <view> at it.
+
+    plan comes from deploy_views.materialization_plans: key_column,
+    source_tables, definition_hash and live_sql. Returns
+    {'mode': 'full' | 'incremental' | 'unchanged', 'patients': n}.
+    Query failures propagate as QueryFailedError / QueryTimeoutError.
+    """
+    live = f"{database}.{view_name}{LIVE_SUFFIX}"
+    fingerprints = f"{database}.{view_name}{FINGERPRINT_SUFFIX}"
+    staged = f"{fingerprints}_new"
+    changed = f"{view_name}{TABLE_SUFFIX}_changed"
+    key = plan['key_column']
+
+    # Every table gets a fresh prefix per build; one prefix per database, so a
+    # multi-database deploy never shares data files
+    build = datetime.now(timezone.utc).strftime('%Y%m%dt%H%M%Sz')
+
+    def prefix(name: str) -> str:
+        return f"{location}{database}/{name}/{build}/"
+
+    def run(sql: str):
+        return runner.run(sql, tag=view_name)
+
+    run(plan['live_sql'])
+
+    # Fingerprint the sources before reading them, so anything that lands
+    # during the refresh is picked up by the next one
+    sources = plan['source_tables']
+    columns = table_columns(runner, database, sources, view_name)
+    missing = [t for t in sources if t not in columns]
+    if missing:
+        raise ValueError(f"Source tables not found in {database}: {', '.join(missing)}")
+
+    run(f"DROP TABLE IF EXISTS {staged}")
+    run(iceberg_ctas(staged, prefix(f"{view_name}{FINGERPRINT_SUFFIX}_new"), f"""
+        SELECT patient, source_table, fingerprint, '{plan['definition_hash']}' AS definition_hash
+        FROM (
+            {' UNION ALL '.join(fingerprint_sql(database, t, columns) for t in sources)}
+        )
+    """))
+
+    # The build the view reads, recorded with the fingerprints; older layouts without it rebuild
+    current = None
+    fingerprint_table = f"{view_name}{FINGERPRINT_SUFFIX}"
+    if 'mat_table' in table_columns(runner, database, [fingerprint_table], view_name).get(fingerprint_table, []):
+        builds = _rows(runner, f"SELECT DISTINCT definition_hash, mat_table FROM {fingerprints}", view_name)
+        if len(builds) == 1 and builds[0]['definition_hash'] == plan['definition_hash']:
+            current = builds[0]['mat_table']
+            if not existing_tables(runner, database, [current], view_name):
+                current = None
+    mode = 'incremental' if current and not full_refresh else 'full'
+    table = f"{database}.{current}"
+
+    patients = 0
+    if mode == 'incremental':
+        run(f"DROP TABLE IF EXISTS {database}.{changed}")
+        run(iceberg_ctas(f"{database}.{changed}", prefix(changed), f"""
+            SELECT DISTINCT COALESCE(n.patient, o.patient) AS patient
+            FROM {staged} n
+            FULL OUTER JOIN {fingerprints} o
+                ON n.patient = o.patient AND n.source_table = o.source_table
+            WHERE n.fingerprint IS DISTINCT FROM o.fingerprint
+        """))
+        counts = _rows(runner, f"""
+            SELECT count(*) AS patients, count_if(patient = '') AS lookups FROM {database}.{changed}
+        """, view_name)[0]
+        patients = counts['patients']
+
+        if counts['lookups']:
+            mode = 'full'
+        elif patients:
+            run(f"DELETE FROM {table} WHERE {key} IN (SELECT patient FROM {database}.{changed})")
+            run(f"""
+                INSERT INTO {table}
+                SELECT * FROM {live} WHERE {key} IN (SELECT patient FROM {database}.{changed})
+            """)
+        else:
+            mode = 'unchanged'
+        run(f"DROP TABLE IF EXISTS {database}.{changed}")
+
+    if mode == 'full':
+        current = f"{view_name}{TABLE_SUFFIX}_{build}"
+        table = f"{database}.{current}"
+        run(iceberg_ctas(table, prefix(f"{view_name}{TABLE_SUFFIX}"), f"SELECT * FROM {live}",
+                         f"bucket({key}, {BUCKET_COUNT})"))
+
+    # Swap readers over before anything they could be reading is dropped
+    run(f"CREATE OR REPLACE VIEW {database}.{view_name} AS SELECT * FROM {table}")
+
+    if mode != 'unchanged':
+        run(f"DROP TABLE IF EXISTS {fingerprints}")
+        run(iceberg_ctas(fingerprints, prefix(f"{view_name}{FINGERPRINT_SUFFIX}"),
+                         f"SELECT *, '{current}' AS mat_table FROM {staged}"))
+    run(f"DROP TABLE IF EXISTS {staged}")
+
+    if mode == 'full':
+        # Earlier builds, including the fixed-name <view>_mat of the first layout
+        old_builds = _rows(runner, f"""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = '{database}'
+              AND (table_name = '{view_name}{TABLE_SUFFIX}'
+                   OR regexp_like(table_name, '^{view_name}{TABLE_SUFFIX}_[0-9]{{8}}t[0-9]{{6}}z$'))
+              AND table_name <> '{current}'
+        """, view_name)
+        for row in old_builds:
+            run(f"DROP TABLE IF EXISTS {database}.{row['table_name']}")
+
+    return {'mode': mode, 'patients': patients}
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Rewrite date parsing in views/*.sql to one canonical, single-parse form.
+
+FHIR date strings arrive either as ISO 8601 timestamps ('2024-01-02T03:04:05Z')
+or as plain dates ('2024-01-02'). The views handle this with
+
+    COALESCE(
+        TRY(date_parse(x, '%Y-%m-%dT%H:%i:%sZ')),
+        TRY(date_parse(x, '%Y-%m-%d'))
+    )
+
+which parses every date-only value twice and pays for a caught exception in
+the first branch. The canonical form parses once:
+
+    TRY(CAST(from_iso8601_timestamp(x) AS TIMESTAMP))
+
+from_iso8601_timestamp accepts both shapes (date-only values become midnight
+in the session time zone, which is UTC on Athena), and the CAST keeps the
+result a plain TIMESTAMP like date_parse returns.
+
+The canonical form is not equivalent to the two date_parse formats: it also
+accepts ISO 8601 shapes they rejected, so every rewrite widens what parses.
+Values that used to come back NULL and now get a timestamp include:
+- fractional seconds: '2024-01-02T03:04:05.123Z'
+- UTC offsets: '2024-01-02T03:04:05-05:00' (the CAST keeps the wall-clock
+  time in that offset, 03:04:05)
+- reduced precision: '2024-01-02T03:04Z', '2024-01'
+Values both date_parse formats accepted give the same timestamp as before.
+
+Every file is tokenized once (sql_analyzer) and all rewrites are applied in a
+single pass. Rewrites fall into three kinds:
+
+- merge:      COALESCE over both formats of the same source(s), grouped by
+              source; values either format parsed are unchanged, the other
+              ISO 8601 shapes above are widened
+- broadening: a standalone single-format TRY(date_parse(...)); values in the
+              other format now parse too (what the old fix scripts did), on top
+              of the widening above
+- reorder:    a COALESCE that interleaves sources, e.g. a-ISO, b-ISO, a-date;
+              after rewriting, a date-only value in an earlier source wins over
+              a full timestamp in a later one. Only applied with --allow-reorder
+
+Usage:
+    python3 normalize_date_parsing.py --dry-run     # show a unified diff
+    python3 normalize_date_parsing.py               # rewrite views/*.sql
+    python3 normalize_date_parsing.py --allow-reorder views/v_problem_list_diagnoses.sql
+"""
+
+import argparse
+import difflib
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from sql_analyzer import VIEWS_DIR, bracket_depths, matching_close, render, split_args, tokenize, unquote_string
+
+ISO_FORMAT = '%Y-%m-%dT%H:%i:%sZ'
+DATE_FORMAT = '%Y-%m-%d'
+CANONICAL_FORMATS = {ISO_FORMAT, DATE_FORMAT}
+
+CANONICAL_TEMPLATE = 'TRY(CAST(from_iso8601_timestamp({source}) AS TIMESTAMP))'
+
+DEFAULT_KINDS = {'merge', 'broadening'}
+
+def _try_date_parse(tokens, depths, idx: int) -> Optional[Dict]:
+    """Match TRY(date_parse(<source>, '<canonical format>')) starting at idx"""
+    if not (idx + 3 < len(tokens) and tokens[idx].word == 'TRY' and tokens[idx + 1].value == '('
+            and tokens[idx + 2].word == 'DATE_PARSE' and tokens[idx + 3].value == '('):
+        return None
+
+    try_close = matching_close(tokens, depths, idx + 1)
+    parse_close = matching_close(tokens, depths, idx + 3)
+    if parse_close + 1 != try_close:
+        return None
+
+    args = split_args(tokens, depths, idx + 3, parse_close)
+    if len(args) != 2 or args[1][1] - args[1][0] != 1 or tokens[args[1][0]].kind != 'string':
+        return None
+
+    fmt = unquote_string(tokens[args[1][0]])
+    if fmt not in CANONICAL_FORMATS:
+        return None
+
+    return {
+        'start': idx,
+        'end': try_close + 1,
+        'source': args[0],
+        'key': render(tokens, *args[0]),
+        'format': fmt,
+    }
+
+def _source_text(sql: str, tokens, token_range: Tuple[int, int]) -> str:
+    start, end = token_range
+    last = tokens[end - 1]
+    return sql[tokens[start].pos:last.pos + len(last.value)]
+
+def _line_indent(sql: str, pos: int) -> str:
+    line_start = sql.rfind('\n', 0, pos) + 1
+    line = sql[line_start:pos]
+    return line[:len(line) - len(line.lstrip())]
+
+def _inside_coalesce(tokens, depths, idx: int) -> bool:
+    """True if tokens[idx] is nested (at any level) inside a COALESCE(...) call"""
+    depth = depths[idx]
+    for i in range(idx - 1, 0, -1):
+        if depths[i] < depth:
+            # tokens[i] is an enclosing open bracket
+            if tokens[i - 1].word == 'COALESCE':
+                return True
+            depth = depths[i]
+    return False
+
+def find_rewrites(sql: str) -> List[Dict]:
+    """
+    Locate every rewritable date-parsing expression.
+
+    Returns dicts with character offsets (start, end), the replacement text,
+    the rewrite kind and the line number, in source order.
+    """
+    tokens = tokenize(sql)
+    depths = bracket_depths(tokens)
+
+    units = {}
+    for idx in range(len(tokens)):
+        unit = _try_date_parse(tokens, depths, idx)
+        if unit:
+            units[idx] = unit
+
+    rewrites = []
+    claimed: Set[int] = set()
+
+    # COALESCE(...) whose arguments are all canonical-format TRY(date_parse(...))
+    for idx, token in enumerate(tokens):
+        if token.word != 'COALESCE' or idx + 1 >= len(tokens) or tokens[idx + 1].value != '(':
+            continue
+        close = matching_close(tokens, depths, idx + 1)
+        args = split_args(tokens, depths, idx + 1, close)
+        arg_units = [units.get(start) for start, _ in args]
+        if not arg_units or any(u is None or u['end'] != end for u, (_, end) in zip(arg_units, args)):
+            continue
+
+        claimed.update(u['start'] for u in arg_units)
+
+        # Sources in first-appearance order, with the formats each covers
+        sources: Dict[str, Dict] = {}
+        for unit in arg_units:
+            entry = sources.setdefault(unit['key'], {'unit': unit, 'formats': set()})
+            entry['formats'].add(unit['format'])
+
+        keys_in_order = [u['key'] for u in arg_units]
+        contiguous = all(
+            keys_in_order[i] == keys_in_order[i + 1] or keys_in_order[i] not in keys_in_order[i + 1:]
+            for i in range(len(keys_in_order) - 1)
+        )
+        complete = all(entry['formats'] == CANONICAL_FORMATS for entry in sources.values())
+
+        if contiguous and complete:
+            kind = 'merge'
+        elif len(sources) == 1:
+            kind = 'broadening'
+        else:
+            kind = 'reorder'
+
+        parsed = [
+            CANONICAL_TEMPLATE.format(source=_source_text(sql, tokens, entry['unit']['source']))
+            for entry in sources.values()
+        ]
+        if len(parsed) == 1:
+            replacement = parsed[0]
+        else:
+            indent = _line_indent(sql, token.pos)
+            inner = f',\n{indent}    '.join(parsed)
+            replacement = f'COALESCE(\n{indent}    {inner}\n{indent})'
+
+        end_token = tokens[close]
+        rewrites.append({
+            'start': token.pos,
+            'end': end_token.pos + 1,
+            'replacement': replacement,
+            'kind': kind,
+            'line': token.line,
+        })
+
+    # Standalone TRY(date_parse(...)) not already handled as part of a COALESCE
+    for idx, unit in units.items():
+        if idx in claimed:
+            continue
+        # Anything nested in a COALESCE is left alone: widening one branch can
+        # change which branch wins
+        if _inside_coalesce(tokens, depths, idx):
+            continue
+
+        rewrites.append({
+            'start': tokens[idx].pos,
+            'end': tokens[unit['end'] - 1].pos + 1,
+            'replacement': CANONICAL_TEMPLATE.format(source=_source_text(sql, tokens, unit['source'])),
+            'kind': 'broadening',
+            'line': tokens[idx].line,
+        })
+
+    return sorted(rewrites, key=lambda r: r['start'])
+
+def rewrite_sql(sql: str, kinds: Set[str] = DEFAULT_KINDS) -> Tuple[str, List[Dict]]:
+    """Apply every rewrite of the given kinds; returns (new_sql, applied rewrites)"""
+    applied = [r for r in find_rewrites(sql) if r['kind'] in kinds]
+
+    parts = []
+    last = 0
+    for rewrite in applied:
+        parts.append(sql[last:rewrite['start']])
+        parts.append(rewrite['replacement'])
+        last = rewrite['end']
+    parts.append(sql[last:])
+
+    return ''.join(parts), applied
+
+def main():
+    parser = argparse.ArgumentParser(description='Normalize date parsing in view SQL to a single-parse form')
+    parser.add_argument('files', nargs='*', type=Path,
+                        help='SQL files to rewrite (default: views/*.sql)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print a unified diff instead of writing files')
+    parser.add_argument('--allow-reorder', action='store_true',
+                        help='Also collapse COALESCEs that interleave sources (may change precedence)')
+    args = parser.parse_args()
+
+    kinds = DEFAULT_KINDS | ({'reorder'} if args.allow_reorder else set())
+    files = args.files or sorted(VIEWS_DIR.glob('*.sql'))
+
+    print("=" * 100)
+    print(f"NORMALIZING DATE PARSING{' (DRY RUN)' if args.dry_run else ''}")
+    print("=" * 100)
+
+    totals = {'merge': 0, 'broadening': 0, 'reorder': 0}
+    changed_files = 0
+    skipped_reorders = 0
+
+    for path in files:
+        sql = path.read_text()
+        new_sql, applied = rewrite_sql(sql, kinds)
+
+        if not args.allow_reorder:
+            skipped_reorders += sum(1 for r in find_rewrites(sql) if r['kind'] == 'reorder')
+
+        if not applied:
+            continue
+
+        changed_files += 1
+        for rewrite in applied:
+            totals[rewrite['kind']] += 1
+
+        summary = ', '.join(f"{n} {kind}" for kind, n in sorted(
+            {k: sum(1 for r in applied if r['kind'] == k) for k in kinds}.items()) if n)
+        print(f"\n📝 {path.name}: {summary}")
+
+        if args.dry_run:
+            sys.stdout.writelines(difflib.unified_diff(
+                sql.splitlines(keepends=True), new_sql.splitlines(keepends=True),
+                fromfile=f'a/{path.name}', tofile=f'b/{path.name}'
+            ))
+        else:
+            path.write_text(new_sql)
+
+    print(f"\n{'=' * 100}")
+    print(f"SUMMARY: {changed_files} file(s), "
+          f"{totals['merge']} merge, {totals['broadening']} broadening, {totals['reorder']} reorder rewrite(s)")
+    if skipped_reorders:
+        print(f"⚠️  {skipped_reorders} interleaved COALESCE(s) left as-is (use --allow-reorder)")
+    print("=" * 100)
+
+if __name__ == '__main__':
+    main()
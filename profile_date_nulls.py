@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Profile the NULL rate of every date column of every view in one scan per view.
+
+The old data probes fetched up to 10 rows WHERE <first date column> IS NOT
+NULL and counted NULLs in Python: ten rows say nothing about a rate, the
+filter hides exactly the rows that matter, and only the first ten date
+columns were looked at. Here each view gets a single aggregate query over all
+of its rows:
+
+    SELECT count(*) AS row_count,
+           count_if("event_date" IS NULL) AS nulls_0,
+           CAST(min("event_date") AS varchar) AS min_0,
+           CAST(max("event_date") AS varchar) AS max_0,
+           ...
+    FROM fhir_prd_db.v_imaging
+
+with one nulls/min/max triple per date column in the view's output: each
+column sql_analyzer finds a date expression for, plus date-named source
+columns passed through unchanged. Only the aggregate row comes back. Min and
+max show implausible dates (1900-01-01, 2099-12-31) that a NULL rate alone
+would miss.
+
+--sample PERCENT adds TABLESAMPLE BERNOULLI (PERCENT) for quick approximate
+rates on huge views. Sampling a view still evaluates the view's joins and CTEs,
+so the saving is in the rows aggregated and returned, not in the bytes scanned.
+
+Every run is recorded in the validation history (validation_store.py).
+--incremental only profiles views whose SQL, or the SQL of a view upstream of
+them, changed since their last successful profile on the same backend, and
+carries the earlier result forward for the rest.
+
+Usage:
+    python3 profile_date_nulls.py                        # every view
+    python3 profile_date_nulls.py v_imaging v_medications
+    python3 profile_date_nulls.py --sample 1             # ~1% Bernoulli sample
+    python3 profile_date_nulls.py --max-null-rate 0.2    # flag columns over 20% NULL
+    python3 profile_date_nulls.py --incremental          # only views whose SQL changed
+    python3 profile_date_nulls.py --local --fixtures synthetic
+"""
+
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from athena_client import create_athena_client
+from athena_query_runner import DEFAULT_DATABASE, AthenaQueryRunner, QueryFailedError, QueryTimeoutError
+from athena_results import iter_query_results
+from deploy_views import VIEWS_DIR, discover_views
+from query_metrics import QueryMetricsLog
+from sql_analyzer import analyze_files, is_date_column_name
+
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_MAX_NULL_RATE = 0.5
+
+def view_date_columns(analysis: Dict) -> List[str]:
+    """
+    Output columns of a view that hold dates, in output order.
+
+    A column counts if sql_analyzer found a date expression for it, or if it
+    passes a date-named source column through unchanged: v_problem_list_diagnoses
+    parses no dates itself but returns onset_date_time as pld_onset_datetime.
+    """
+    parsed = {expr['alias'] for expr in analysis['date_expressions']}
+    sources = analysis.get('column_sources', {})
+    return list(dict.fromkeys(
+        column for column in analysis['output_columns']
+        if column in parsed or (column in sources and is_date_column_name(sources[column]))
+    ))
+
+def profile_query(view: str, date_columns: List[str], sample_percent: Optional[float] = None,
+                  database: str = DEFAULT_DATABASE) -> str:
+    """One aggregate SELECT: row count plus NULL count, min and max of every date column"""
+    select = ['count(*) AS row_count']
+    for i, column in enumerate(date_columns):
+        select.append(f'count_if("{column}" IS NULL) AS nulls_{i}')
+        select.append(f'CAST(min("{column}") AS varchar) AS min_{i}')
+        select.append(f'CAST(max("{column}") AS varchar) AS max_{i}')
+    sample = f' TABLESAMPLE BERNOULLI ({sample_percent:g})' if sample_percent else ''
+    return f"SELECT {', '.join(select)}\nFROM {database}.{view}{sample}"
+
+def profile_view(runner: AthenaQueryRunner, view: str, date_columns: List[str],
+                 sample_percent: Optional[float] = None, cache=None) -> Dict:
+    """
+    Run the profile query for one view.
+
+    Returns {'status', 'rows', 'columns', 'query_id'} where columns maps each
+    date column to {'nulls', 'null_rate', 'min', 'max'}; status is 'success',
+    'no_data', 'failed', 'timeout' or 'error' (with 'message').
+    cache is an optional result_cache.ResultCache.
+    """
+    if not date_columns:
+        return {'status': 'no_date_columns', 'message': 'No date columns found'}
+
+    query = profile_query(view, date_columns, sample_percent, runner.database)
+    try:
+        if cache is not None:
+            fetched = cache.fetch(runner, query, tag=view)
+            query_id, rows = fetched['query_id'], fetched['rows']
+        else:
+            execution = runner.run(query, tag=view)
+            query_id = execution['QueryExecutionId']
+            rows = list(iter_query_results(runner.client, query_id))
+    except QueryFailedError as e:
+        return {'status': 'failed', 'message': e.reason}
+    except QueryTimeoutError:
+        return {'status': 'timeout', 'message': 'Query timed out'}
+    except Exception as e:
+        return {'status': 'error', 'message': str(e)}
+
+    row = rows[0]
+    total = row['row_count'] or 0
+    if not total:
+        return {'status': 'no_data', 'message': 'No rows' + (' in sample' if sample_percent else ''),
+                'rows': 0, 'query_id': query_id}
+
+    return {
+        'status': 'success',
+        'rows': total,
+        'query_id': query_id,
+        'columns': {
+            column: {
+                'nulls': row[f'nulls_{i}'],
+                'null_rate': row[f'nulls_{i}'] / total,
+                'min': row[f'min_{i}'],
+                'max': row[f'max_{i}'],
+            }
+            for i, column in enumerate(date_columns)
+        },
+    }
+
+def profile_views(runner: AthenaQueryRunner, date_columns: Dict[str, List[str]],
+                  sample_percent: Optional[float] = None, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                  cache=None) -> Iterator[Tuple[str, Dict]]:
+    """Profile every view in date_columns concurrently; yields (view, profile) in completion order"""
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+        futures = {
+            executor.submit(profile_view, runner, view, columns, sample_percent, cache): view
+            for view, columns in date_columns.items()
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Profile NULL rates of every view date column in one scan per view')
+    parser.add_argument('views', nargs='*', help='Views to profile, by view or file name (default: all)')
+    parser.add_argument('--sample', type=float, metavar='PERCENT',
+                        help='Profile a TABLESAMPLE BERNOULLI sample of PERCENT%% of the rows')
+    parser.add_argument('--max-null-rate', type=float, default=DEFAULT_MAX_NULL_RATE,
+                        help=f'Flag columns with a higher NULL rate (default: {DEFAULT_MAX_NULL_RATE})')
+    parser.add_argument('--max-concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY,
+                        help=f'Views profiled at once (default: {DEFAULT_MAX_CONCURRENCY})')
+    parser.add_argument('--timeout', type=float, default=600.0,
+                        help='Per-query timeout in seconds (default: 600)')
+    parser.add_argument('--local', action='store_true',
+                        help='Profile a local DuckDB built from fixtures/ instead of Athena')
+    parser.add_argument('--fixtures', type=Path,
+                        help='Fixture directory for --local, e.g. generate_synthetic_fhir.py output')
+    parser.add_argument('--cache', action='store_true',
+                        help='Serve unchanged profiles from the local result cache (see result_cache.py)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only profile views whose SQL or upstream SQL changed since their last profile')
+    parser.add_argument('--no-history', action='store_true',
+                        help='Do not record this run in the validation history (validation_store.py)')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.sample is not None and not 0 < args.sample <= 100:
+        print("❌ --sample must be a percentage in (0, 100]")
+        sys.exit(2)
+    if args.incremental and args.no_history:
+        print("❌ --incremental needs the validation history; drop --no-history")
+        sys.exit(2)
+
+    view_files = discover_views(VIEWS_DIR, None)
+    analyses = analyze_files(sorted(view_files.values()))
+    date_columns = {
+        analysis['view'].split('.')[-1]: view_date_columns(analysis)
+        for analysis in analyses.values() if analysis['view']
+    }
+
+    if args.views:
+        by_file = {path.name: name for name, path in view_files.items()}
+        selected = {}
+        for view in args.views:
+            name = by_file.get(Path(view).name, view)
+            if name not in date_columns:
+                print(f"❌ Unknown view: {view}")
+                sys.exit(1)
+            selected[name] = date_columns[name]
+        date_columns = selected
+
+    skipped = sorted(view for view, columns in date_columns.items() if not columns)
+    date_columns = {view: columns for view, columns in date_columns.items() if columns}
+
+    if args.local:
+        from local_engine import FIXTURES_DIR, LOCAL_POLL_INTERVAL, create_local_environment
+        fixtures_dir = args.fixtures or FIXTURES_DIR
+        backend = f"local:{fixtures_dir.resolve().name}"
+        client = create_local_environment(fixtures_dir)
+        runner = AthenaQueryRunner(client, timeout=args.timeout, initial_interval=LOCAL_POLL_INTERVAL)
+    else:
+        backend = 'athena'
+        client = create_athena_client()
+        runner = AthenaQueryRunner(client, timeout=args.timeout, metrics=QueryMetricsLog())
+
+    cache = None
+    if args.cache:
+        from result_cache import ResultCache
+        cache = ResultCache(backend=backend)
+
+    store = run_id = None
+    unchanged = {}
+    to_profile = date_columns
+    if not args.no_history:
+        from validation_store import ValidationStore, closure_hashes, split_unchanged
+        hashes = closure_hashes()
+        store = ValidationStore()
+        if args.incremental:
+            to_profile, unchanged = split_unchanged(store, date_columns, hashes, backend, args.sample)
+        run_id = store.start_run('profile_date_nulls', backend, args.sample)
+
+    print("=" * 100)
+    print(f"DATE COLUMN NULL PROFILE: {sum(map(len, date_columns.values()))} column(s) in "
+          f"{len(date_columns)} view(s), one query per view"
+          f"{f' (TABLESAMPLE BERNOULLI {args.sample:g}%)' if args.sample else ''}")
+    if unchanged:
+        print(f"⏭️  {len(unchanged)} view(s) unchanged since their last profile, "
+              f"{len(to_profile)} to profile")
+    print("=" * 100)
+
+    failed = []
+    flagged = []
+    reused = ((view, latest['profile']) for view, latest in sorted(unchanged.items()))
+    with runner:
+        for view, profile in chain(reused, profile_views(runner, to_profile, args.sample,
+                                                         args.max_concurrency, cache)):
+            if store is not None:
+                measured_in = unchanged[view]['run_id'] if view in unchanged else None
+                store.record_view(run_id, view, hashes[view], profile, reused_from=measured_in)
+            since = f" (unchanged since run {unchanged[view]['run_id']})" if view in unchanged else ''
+
+            if profile['status'] == 'no_data':
+                print(f"\n⚠️  {view}: {profile['message']}{since}")
+                continue
+            if profile['status'] != 'success':
+                print(f"\n❌ {view}: {profile['status'].upper()} - {profile['message']}")
+                failed.append(view)
+                continue
+
+            print(f"\n📝 {view}: {profile['rows']:,} row(s){' sampled' if args.sample else ''}{since}")
+            print(f"   {'Column':<40} {'NULL %':>7} {'NULLs':>12}  {'Min':<26} {'Max'}")
+            for column, stats in profile['columns'].items():
+                if stats['null_rate'] >= 1:
+                    marker = '❌ '
+                elif stats['null_rate'] > args.max_null_rate:
+                    marker = '⚠️  '
+                else:
+                    marker = '   '
+                if marker.strip():
+                    flagged.append((view, column, stats['null_rate']))
+                print(f"{marker}{column:<40} {stats['null_rate']:>7.1%} {stats['nulls']:>12,}  "
+                      f"{str(stats['min'])[:26]:<26} {str(stats['max'])[:26]}")
+
+    print(f"\n{'=' * 100}")
+    print("SUMMARY")
+    print("=" * 100)
+    print(f"Views profiled: {len(date_columns)} ({len(to_profile)} queries)")
+    if unchanged:
+        print(f"⏭️  Unchanged, earlier result reused: {len(unchanged)} view(s)")
+    if skipped:
+        print(f"⏭️  No date columns, not profiled: {len(skipped)} view(s): {', '.join(skipped)}")
+    if cache is not None:
+        print(f"📦 Result cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+    if store is not None:
+        store.finish_run(run_id)
+        store.close()
+        print(f"📝 Recorded as run {run_id} in {store.path.name}")
+
+    all_null = [(view, column) for view, column, rate in flagged if rate >= 1]
+    if flagged:
+        print(f"\n⚠️  Columns over {args.max_null_rate:.0%} NULL:")
+        for view, column, rate in sorted(flagged, key=lambda item: -item[2]):
+            print(f"   - {view}.{column}: {rate:.1%}")
+    if failed:
+        print(f"\n❌ Failed views: {', '.join(sorted(failed))}")
+
+    if failed or all_null:
+        sys.exit(1)
+    print("\n✅ No date column is entirely NULL")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Audit whether a patient filter on each view reaches the base tables.
+
+Consumer queries almost always look up one patient:
+
+    SELECT ... FROM fhir_prd_db.v_visits_unified WHERE patient_fhir_id = '...'
+
+If the predicate is pushed down through the view's CTEs, UNION ALL branches,
+joins and aggregations into the table scans, Athena prunes Parquet row groups
+on the patient column and the lookup reads kilobytes. If something in between
+stops it, every lookup scans the whole table. For each view with a
+patient_fhir_id / patient_id column, this audit:
+
+1. Traces the patient column through column_lineage.py's lineage, down every
+   UNION branch to the base table columns it comes from. It stops at the
+   first operator on each path that a filter cannot cross:
+   - computed key:  the column is an expression (REPLACE(subject_reference,
+                    'Patient/', ''), COALESCE over FULL JOIN sides, MAX(...));
+                    a predicate on an expression gives the scan no column range.
+                    CAST(column AS VARCHAR) is not one when the base column is
+                    VARCHAR in fixtures/schema.json: the cast is the identity
+                    and the planner drops it
+   - window:        a window function in the same SELECT not partitioned by the
+                    patient column; rows can only be filtered after it ran
+   - LIMIT:         a LIMIT in the CTE or subquery
+2. Unless --static is given, runs EXPLAIN for the templated lookup with a
+   probe patient id, against Athena (EXPLAIN (TYPE IO, FORMAT JSON): the
+   column constraints each table scan receives) or the local DuckDB
+   (--local: the filters in each parquet scan). A scan counts as filtered
+   when it receives the probe id as a plain column comparison. Locally each
+   view is probed with a patient id it returns, since DuckDB drops scans whose
+   Parquet statistics rule out an unknown id instead of showing the filter.
+
+A view is 'pushdown' when every base table its patient column comes from gets
+the filter, 'partial' when only some UNION branches do, and 'blocked' when
+none do. With a plan, its scans decide the status and the static trace says
+where the filter stops.
+
+The status of every view is compared with pushdown_baseline.json for the
+same backend ('static' for --static, 'local:<fixtures dir name>' for
+--local). A view that gets worse, or whose EXPLAIN fails, exits 1, so a CI
+job can run
+
+    python3 pushdown_audit.py --static                   # no AWS access needed
+    python3 generate_synthetic_fhir.py --output synthetic
+    python3 pushdown_audit.py --local --fixtures synthetic
+
+and fail on pushdown regressions. --fail-on-blocked also fails on views that
+were already blocked.
+
+Usage:
+    python3 pushdown_audit.py                            # EXPLAIN against Athena
+    python3 pushdown_audit.py v_visits_unified v_unified_patient_timeline
+    python3 pushdown_audit.py --static --update-baseline # record the baseline
+    python3 pushdown_audit.py --json > pushdown.json
+"""
+
+import argparse
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from athena_client import create_athena_client
+from athena_query_runner import AthenaQueryRunner, QueryFailedError, QueryTimeoutError
+from athena_results import iter_query_results
+from benchmark_views import patient_column
+from column_lineage import build_lineage, consumer_files, expand_ref, scope_label
+from deploy_views import VIEWS_DIR, discover_views
+from query_metrics import QueryMetricsLog, git_revision
+
+BASELINE_FILE = Path(__file__).parent / 'pushdown_baseline.json'
+SCHEMA_FILE = Path(__file__).parent / 'fixtures' / 'schema.json'
+
+STATIC_BACKEND = 'static'
+
+PROBE_PATIENT_ID = 'pushdown-audit-probe'
+
+QUERY_TEMPLATE = "SELECT count(*) FROM {database}.{view} WHERE {patient_column} = '{patient_id}'"
+
+# Worse statuses rank higher; a view whose rank grows has regressed
+STATUS_RANK = {'pushdown': 0, 'partial': 1, 'blocked': 2}
+
+# CAST(<column> AS VARCHAR): the identity on a VARCHAR column
+IDENTITY_CAST_PATTERN = re.compile(r'^CAST\(\s*[\w."]+\s+AS\s+VARCHAR\s*\)$', re.IGNORECASE)
+
+# A DuckDB scan filter comparing a bare column with a literal; a function call
+# around the column ends in ')' and does not match
+SCAN_FILTER_PATTERN = re.compile(r"""(?<![\w.])"?(\w+)"?\s*(?:=|IN\s*\()\s*'([^']*)'""", re.IGNORECASE)
+
+def key_blocker(scope: Dict, info: Dict) -> Optional[Dict]:
+    """The operator in scope that stops a filter on the column info describes, if any"""
+    if scope['limit']:
+        return {'operator': 'LIMIT', 'detail': 'the filter cannot move below a LIMIT'}
+    for window in scope['windows']:
+        if not window['partition'] & info['refs']:
+            return {'operator': 'window', 'line': window['line'],
+                    'detail': f"{window['text'][:80]} is not partitioned by the patient column"}
+    if info['kind'] == 'computed' and not is_identity_cast(info):
+        return {'operator': 'computed key', 'detail': info['expression'][:100]}
+    return None
+
+def is_identity_cast(info: Dict) -> bool:
+    """Whether a computed column is CAST(<one column> AS VARCHAR)"""
+    return len(info['refs']) == 1 and bool(IDENTITY_CAST_PATTERN.match(info['expression'].strip()))
+
+def trace_patient_filter(scopes: Dict[str, Dict], view: str, column: str,
+                         column_types: Optional[Dict[str, Dict[str, str]]] = None) -> Dict:
+    """
+    Follow view.column down to base table columns.
+
+    Returns {'status', 'keys', 'sources', 'blockers'}: the base table columns
+    the filter reaches, every base table the column comes from (also behind a
+    blocker), and per blocked path the scope, line, operator and detail.
+    column_types (table -> {column: type}) confirms that a CAST(... AS
+    VARCHAR) on the path is the identity; a cast of a column of another type
+    blocks the path.
+    """
+    column_types = column_types or {}
+    keys = set()
+    sources = set()
+    blockers = []
+    # (scope, column, blocked, the identity cast passed on the way down as (scope, column))
+    stack = [(f"view:{view}", column, False, None)]
+    seen = set()
+
+    def block(scope_id: str, info: Dict, blocker: Dict):
+        scope = scopes[scope_id]
+        label = scope_label(scope_id)
+        where = label[len(scope['file']) + 1:] if label.startswith(scope['file']) else label
+        blockers.append(dict({'scope': where or 'query', 'file': scope['file'], 'line': info['line']}, **blocker))
+
+    while stack:
+        node = stack.pop()
+        if node in seen:
+            continue
+        seen.add(node)
+        scope_id, name, blocked, cast = node
+        scope = scopes[scope_id]
+        info = scope['columns'][name]
+
+        blocker = None if blocked else key_blocker(scope, info)
+        if blocker:
+            block(scope_id, info, blocker)
+            blocked = True
+        elif not blocked and info['kind'] == 'computed':
+            cast = (scope_id, name)
+        for ref in info['refs']:
+            nodes = expand_ref(scopes, ref)
+            if nodes:
+                stack.extend(ref_node + (blocked, cast) for ref_node in nodes)
+                continue
+            source = scope_label(ref[0])
+            sources.add(source)
+            if blocked:
+                continue
+            source_type = column_types.get(source.split('.')[-1], {}).get(ref[1], 'VARCHAR')
+            if cast and source_type.upper() != 'VARCHAR':
+                cast_info = scopes[cast[0]]['columns'][cast[1]]
+                block(cast[0], cast_info, {'operator': 'computed key',
+                                           'detail': f"{cast_info['expression'][:80]} casts a {source_type} column"})
+            else:
+                keys.add(f"{source}.{ref[1]}")
+
+    if keys and not blockers:
+        status = 'pushdown'
+    elif keys:
+        status = 'partial'
+    else:
+        status = 'blocked'
+    blockers.sort(key=lambda b: (b['file'], b['line']))
+    return {'status': status, 'keys': sorted(keys), 'sources': sorted(sources), 'blockers': blockers}
+
+def athena_scans(plan: Dict, patient_id: str) -> List[Dict]:
+    """Table scans of EXPLAIN (TYPE IO, FORMAT JSON): {'tables', 'filtered', 'columns'}"""
+    scans = []
+    for info in plan.get('inputTableColumnInfos', []):
+        table = info['table']['schemaTable']
+        columns = [constraint['columnName'] for constraint in info.get('columnConstraints', [])
+                   if patient_id in json.dumps(constraint)]
+        scans.append({'tables': [table['table']], 'filtered': bool(columns), 'columns': columns})
+    return scans
+
+def local_scans(plan: List[Dict], patient_id: str, schema: Dict[str, Dict[str, str]]) -> List[Dict]:
+    """
+    Parquet scans of a DuckDB EXPLAIN (FORMAT JSON) plan.
+
+    The plan does not name the file a scan reads, so 'tables' lists every
+    fixture table that has all the columns the scan projects and filters on.
+    """
+    scans = []
+    stack = list(plan)
+    while stack:
+        node = stack.pop()
+        stack.extend(node.get('children', []))
+        extra = node.get('extra_info', {})
+        if node.get('name') not in ('READ_PARQUET', 'SEQ_SCAN', 'TABLE_SCAN'):
+            continue
+
+        projections = extra.get('Projections', [])
+        filters = extra.get('Filters', [])
+        filters = '\n'.join(filters) if isinstance(filters, list) else filters
+        columns = sorted({match.group(1) for match in SCAN_FILTER_PATTERN.finditer(filters)
+                          if match.group(2) == patient_id})
+
+        used = set(projections if isinstance(projections, list) else projections.split('\n')) - {''}
+        used |= set(re.findall(r'"?(\w+)"?\s*(?:=|<|>|IS\b|IN\b)', filters))
+        if extra.get('Table'):
+            tables = [extra['Table']]
+        else:
+            tables = sorted(name for name, table_columns in schema.items() if used <= set(table_columns))
+        scans.append({'tables': tables, 'filtered': bool(columns), 'columns': columns})
+    return scans
+
+def plan_status(trace: Dict, scans: List[Dict]) -> str:
+    """Status from the scans: does every table the patient column comes from get the filter?"""
+    tables = {source.split('.')[-1] for source in trace['sources']}
+    filtered = {table for scan in scans if scan['filtered'] for table in scan['tables']}
+    if tables:
+        reached = tables & filtered
+        if reached == tables:
+            return 'pushdown'
+        return 'partial' if reached else 'blocked'
+    return 'pushdown' if filtered else 'blocked'
+
+def sample_patient_ids(runner: AthenaQueryRunner, targets: Dict[str, str]) -> Dict[str, str]:
+    """A patient id each view actually returns, so its lookup is not pruned away by Parquet statistics"""
+    submitted = {
+        view: runner.submit(f"SELECT {column} FROM {runner.database}.{view} WHERE {column} IS NOT NULL LIMIT 1",
+                            runner.database, tag=f'pushdown-sample:{view}')
+        for view, column in targets.items()
+    }
+    patient_ids = {}
+    for view, future in submitted.items():
+        try:
+            execution = future.result()
+        except (QueryFailedError, QueryTimeoutError):
+            continue
+        for row in iter_query_results(runner.client, execution['QueryExecutionId']):
+            patient_ids[view] = row[targets[view]]
+    return patient_ids
+
+def explain_views(runner: AthenaQueryRunner, targets: Dict[str, str], patient_ids: Dict[str, str],
+                  schema: Optional[Dict[str, Dict[str, str]]] = None) -> Dict[str, Dict]:
+    """
+    EXPLAIN the patient lookup on every view concurrently.
+
+    schema is the local fixture schema (local_engine.load_schema) when the
+    runner is backed by the local DuckDB. Returns view -> {'scans'} or {'error'}.
+    """
+    prefix = 'EXPLAIN (FORMAT JSON)' if schema is not None else 'EXPLAIN (TYPE IO, FORMAT JSON)'
+    submitted = {
+        view: runner.submit(
+            f"{prefix} {QUERY_TEMPLATE.format(database=runner.database, view=view, patient_column=column, patient_id=patient_ids[view])}",
+            runner.database, tag=f'pushdown:{view}'
+        )
+        for view, column in targets.items()
+    }
+
+    results = {}
+    for view, future in submitted.items():
+        try:
+            execution = future.result()
+            rows = list(iter_query_results(runner.client, execution['QueryExecutionId']))
+            if schema is not None:
+                plan = json.loads(rows[0]['explain_value'])
+                results[view] = {'scans': local_scans(plan, patient_ids[view], schema)}
+            else:
+                plan = json.loads(''.join(str(next(iter(row.values()))) for row in rows))
+                results[view] = {'scans': athena_scans(plan, patient_ids[view])}
+        except QueryFailedError as e:
+            results[view] = {'error': e.reason}
+        except QueryTimeoutError:
+            results[view] = {'error': 'EXPLAIN timed out'}
+        except (ValueError, KeyError, IndexError) as e:
+            results[view] = {'error': f'unreadable plan ({e})'}
+    return results
+
+def load_column_types(fixtures_dir: Optional[Path]) -> Dict[str, Dict[str, str]]:
+    """table -> {column: type} from the fixture schema.json, empty if there is none"""
+    schema_file = fixtures_dir / SCHEMA_FILE.name if fixtures_dir else SCHEMA_FILE
+    if not schema_file.exists():
+        return {}
+    return json.loads(schema_file.read_text())
+
+def load_baseline(path: Path, backend: str) -> Dict[str, str]:
+    """view -> status recorded for one backend"""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text()).get(backend, {}).get('views', {})
+
+def save_baseline(path: Path, backend: str, results: Dict[str, Dict]):
+    """Merge the statuses of views audited without error into the baseline for one backend"""
+    baselines = json.loads(path.read_text()) if path.exists() else {}
+    entry = baselines.setdefault(backend, {'views': {}})
+    entry['revision'] = git_revision()
+    entry['views'].update({view: result['status'] for view, result in results.items() if 'error' not in result})
+    entry['views'] = dict(sorted(entry['views'].items()))
+    path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + '\n')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Check that patient filters are pushed down through every view')
+    parser.add_argument('views', nargs='*', help='Views to audit, by view or file name (default: all)')
+    parser.add_argument('--static', action='store_true',
+                        help='Only trace the SQL; do not run EXPLAIN (no AWS access needed)')
+    parser.add_argument('--local', action='store_true',
+                        help='EXPLAIN in a local DuckDB built from fixtures/ instead of Athena')
+    parser.add_argument('--fixtures', type=Path,
+                        help='Fixture directory for --local, e.g. generate_synthetic_fhir.py output')
+    parser.add_argument('--patient-id',
+                        help=f'Patient id in the templated lookup (default: {PROBE_PATIENT_ID}, '
+                             'with --local one the view returns)')
+    parser.add_argument('--timeout', type=float, default=300.0,
+                        help='Per-EXPLAIN timeout in seconds (default: 300)')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE,
+                        help=f'Baseline file (default: {BASELINE_FILE.name})')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Record these statuses as the new baseline instead of gating on it')
+    parser.add_argument('--fail-on-blocked', action='store_true',
+                        help='Exit 1 if any view is not fully pushed down, not only on regressions')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results instead of the report')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    view_files = discover_views(VIEWS_DIR, None)
+    scopes, _ = build_lineage(view_files, consumer_files())
+    targets = {}
+    for view in sorted(view_files):
+        column = patient_column(list(scopes[f"view:{view}"]['columns']))
+        if column:
+            targets[view] = column
+
+    if args.views:
+        by_file = {path.name: name for name, path in view_files.items()}
+        selected = {}
+        for view in args.views:
+            name = by_file.get(Path(view).name, view)
+            if name not in view_files:
+                print(f"❌ Unknown view: {view}")
+                sys.exit(1)
+            if name not in targets:
+                print(f"❌ {name} has no patient_fhir_id / patient_id column")
+                sys.exit(1)
+            selected[name] = targets[name]
+        targets = selected
+
+    skipped = sorted(set(view_files) - set(targets)) if not args.views else []
+    column_types = load_column_types(args.fixtures)
+    results = {view: dict(trace_patient_filter(scopes, view, column, column_types), column=column)
+               for view, column in targets.items()}
+
+    if args.static:
+        backend = STATIC_BACKEND
+    else:
+        schema = None
+        if args.local:
+            from local_engine import FIXTURES_DIR, LOCAL_POLL_INTERVAL, create_local_environment, load_schema
+            fixtures_dir = args.fixtures or FIXTURES_DIR
+            backend = f"local:{fixtures_dir.resolve().name}"
+            client = create_local_environment(fixtures_dir)
+            schema = load_schema(fixtures_dir)
+            runner = AthenaQueryRunner(client, timeout=args.timeout, initial_interval=LOCAL_POLL_INTERVAL)
+        else:
+            backend = 'athena'
+            client = create_athena_client()
+            runner = AthenaQueryRunner(client, timeout=args.timeout, metrics=QueryMetricsLog())
+        with runner:
+            samples = sample_patient_ids(runner, targets) if args.local and not args.patient_id else {}
+            patient_ids = {view: samples.get(view, args.patient_id or PROBE_PATIENT_ID) for view in targets}
+            plans = explain_views(runner, targets, patient_ids, schema)
+        for view, plan in plans.items():
+            result = results[view]
+            result['static_status'] = result['status']
+            if 'error' in plan:
+                result['error'] = plan['error']
+            else:
+                result['patient_id'] = patient_ids[view]
+                result['scans'] = plan['scans']
+                result['status'] = plan_status(result, plan['scans'])
+
+    baseline = {} if args.update_baseline else load_baseline(args.baseline, backend)
+    regressed = [view for view, result in results.items() if view in baseline and (
+        'error' in result or STATUS_RANK[result['status']] > STATUS_RANK[baseline[view]])]
+    not_pushed = [view for view, result in results.items() if 'error' not in result and result['status'] != 'pushdown']
+    # A view that could not be EXPLAINed was not audited, baseline or not
+    errors = [view for view, result in results.items() if 'error' in result]
+
+    if args.json:
+        json.dump({'backend': backend, 'views': results, 'regressions': regressed, 'skipped': skipped},
+                  sys.stdout, indent=2, default=sorted)
+        print()
+    else:
+        print("=" * 100)
+        print(f"PATIENT FILTER PUSHDOWN AUDIT ({backend}, {len(results)} view(s))")
+        print("=" * 100)
+        if not args.update_baseline and not baseline:
+            print(f"⚠️  No {backend} baseline in {args.baseline.name} - reporting only (use --update-baseline)")
+
+        for view, result in results.items():
+            if 'error' in result:
+                print(f"\n❌ {view}: EXPLAIN failed - {result['error'][:120]}")
+                continue
+            marker = {'pushdown': '✅', 'partial': '⚠️ ', 'blocked': '❌'}[result['status']]
+            was = f" (baseline: {baseline[view]})" if view in baseline and baseline[view] != result['status'] else ''
+            regression = '  REGRESSION' if view in regressed else ''
+            print(f"\n{marker} {view}.{result['column']}: {result['status'].upper()}{was}{regression}")
+            if result['keys']:
+                print(f"   reaches: {', '.join(result['keys'][:6])}{' ...' if len(result['keys']) > 6 else ''}")
+            for blocker in result['blockers']:
+                print(f"   ⛔ {blocker['file']}:{blocker['line']} {blocker['scope']}: "
+                      f"{blocker['operator']} - {blocker['detail']}")
+            if 'scans' in result:
+                filtered = [scan for scan in result['scans'] if scan['filtered']]
+                static = f" (static trace: {result['static_status']})" if result['static_status'] != result['status'] else ''
+                print(f"   plan: {len(filtered)}/{len(result['scans'])} scan(s) filtered on the patient id{static}")
+
+        print(f"\n{'=' * 100}")
+        print("SUMMARY")
+        print("=" * 100)
+        for status in STATUS_RANK:
+            views = [view for view, result in results.items() if result.get('status') == status and 'error' not in result]
+            print(f"   {status:<10} {len(views):>4} view(s)")
+        if errors:
+            print(f"   {'error':<10} {len(errors):>4} view(s)")
+        if skipped:
+            print(f"⏭️  No patient column: {', '.join(skipped)}")
+
+    if args.update_baseline:
+        save_baseline(args.baseline, backend, results)
+        if not args.json:
+            print(f"📝 Baseline for {backend} written to {args.baseline}")
+        return
+
+    if not args.json:
+        if regressed:
+            print(f"\n❌ Pushdown regressions: {', '.join(regressed)}")
+        elif errors:
+            print(f"\n❌ EXPLAIN failed: {', '.join(errors)}")
+        elif args.fail_on_blocked and not_pushed:
+            print(f"\n❌ Not pushed down: {', '.join(not_pushed)}")
+        else:
+            print("\n✅ No pushdown regressions")
+    if regressed or errors or (args.fail_on_blocked and not_pushed):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Per-query cost and latency metrics captured from Athena execution statistics.
+
+Every query the runner resolves already comes back with a Statistics block
+(DataScannedInBytes, EngineExecutionTimeInMillis, QueryQueueTimeInMillis,
+TotalExecutionTimeInMillis). An AthenaQueryRunner created with
+metrics=QueryMetricsLog() appends one JSON line per finished query to
+.query_metrics.jsonl, tagged with the view it ran for, the script that ran it
+and the git revision of the tree, so a view rewrite can be compared against
+the revision before it.
+
+Athena bills $5 per TB scanned with a 10 MB minimum per query (DDL and failed
+queries are free); the estimated cost of each query is recorded alongside the
+raw statistics.
+
+Usage:
+    python3 query_metrics.py                          # rank views by bytes scanned
+    python3 query_metrics.py --sort latency --top 10  # slowest views
+    python3 query_metrics.py --revision 3652968       # one revision only
+    python3 query_metrics.py --tool deploy_views      # one script only
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+REPO_DIR = Path(__file__).parent
+METRICS_FILE = REPO_DIR / '.query_metrics.jsonl'
+
+PRICE_PER_TB_USD = 5.0
+MIN_BILLED_BYTES = 10 * 1024 ** 2
+
+STATISTICS_FIELDS = {
+    'DataScannedInBytes': 'bytes_scanned',
+    'EngineExecutionTimeInMillis': 'engine_ms',
+    'QueryQueueTimeInMillis': 'queue_ms',
+    'TotalExecutionTimeInMillis': 'total_ms',
+}
+
+SORT_KEYS = {
+    'bytes': 'total_bytes',
+    'cost': 'total_cost_usd',
+    'latency': 'p95_total_ms',
+    'queries': 'queries',
+}
+
+_revision: Optional[str] = None
+
+def git_revision() -> str:
+    """Short hash of HEAD, with -dirty if views/ has uncommitted changes"""
+    global _revision
+    if _revision is None:
+        try:
+            revision = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=REPO_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+            dirty = subprocess.run(
+                ['git', 'status', '--porcelain', '--', 'views'],
+                cwd=REPO_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+            _revision = f"{revision}-dirty" if dirty else revision
+        except (OSError, subprocess.CalledProcessError):
+            _revision = 'unknown'
+    return _revision
+
+def estimated_cost(bytes_scanned: Optional[int], state: Optional[str]) -> Optional[float]:
+    """Athena on-demand price for one query"""
+    if bytes_scanned is None:
+        return None
+    if state != 'SUCCEEDED' or bytes_scanned == 0:
+        return 0.0
+    return max(bytes_scanned, MIN_BILLED_BYTES) / 1024 ** 4 * PRICE_PER_TB_USD
+
+def metrics_record(execution: Dict, view: Optional[str] = None, tool: Optional[str] = None,
+                   state: Optional[str] = None) -> Dict:
+    """
+    Flatten a QueryExecution dict into one metrics record.
+
+    state overrides the reported state, e.g. 'TIMEOUT' for a query the runner
+    gave up on while Athena still had it RUNNING.
+    """
+    status = execution.get('Status', {})
+    statistics = execution.get('Statistics', {})
+
+    record = {
+        'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'revision': git_revision(),
+        'tool': tool or Path(sys.argv[0]).stem,
+        'view': view,
+        'query_id': execution.get('QueryExecutionId'),
+        'database': execution.get('QueryExecutionContext', {}).get('Database'),
+        'workgroup': execution.get('WorkGroup'),
+        'state': state or status.get('State'),
+        'state_change_reason': status.get('StateChangeReason'),
+    }
+    for field, key in STATISTICS_FIELDS.items():
+        record[key] = statistics.get(field)
+    record['estimated_cost_usd'] = estimated_cost(record['bytes_scanned'], record['state'])
+
+    return record
+
+class QueryMetricsLog:
+    """Thread-safe JSONL appender for metrics records"""
+
+    def __init__(self, path: Path = METRICS_FILE, tool: Optional[str] = None):
+        self.path = Path(path)
+        self.tool = tool
+        self._lock = threading.Lock()
+
+    def record(self, execution: Dict, view: Optional[str] = None, state: Optional[str] = None) -> Dict:
+        """Append the metrics for one finished query and return the record"""
+        record = metrics_record(execution, view, self.tool, state)
+        line = json.dumps(record, default=str) + '\n'
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
+        return record
+
+def load_metrics(path: Path = METRICS_FILE) -> Iterator[Dict]:
+    """Yield every record in a metrics file, skipping lines that do not parse"""
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+def percentile(values: List[int], fraction: float) -> Optional[int]:
+    """Percentile of values at the nearest index; None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+def summarize(records: List[Dict]) -> List[Dict]:
+    """Aggregate records per view (untagged queries are grouped by tool)"""
+    groups: Dict[str, List[Dict]] = {}
+    for record in records:
+        key = record.get('view') or f"({record.get('tool') or 'unknown'})"
+        groups.setdefault(key, []).append(record)
+
+    summary = []
+    for key, group in groups.items():
+        total_ms = [r['total_ms'] for r in group if r.get('total_ms') is not None]
+        scanned = [r['bytes_scanned'] for r in group if r.get('bytes_scanned') is not None]
+        summary.append({
+            'view': key,
+            'queries': len(group),
+            'failed': sum(1 for r in group if r.get('state') != 'SUCCEEDED'),
+            'total_bytes': sum(scanned),
+            'avg_bytes': sum(scanned) / len(scanned) if scanned else 0,
+            'total_cost_usd': sum(r.get('estimated_cost_usd') or 0 for r in group),
+            'p50_total_ms': percentile(total_ms, 0.5),
+            'p95_total_ms': percentile(total_ms, 0.95),
+            'max_queue_ms': max((r['queue_ms'] for r in group if r.get('queue_ms') is not None), default=None),
+            'revisions': sorted({r.get('revision') for r in group if r.get('revision')}),
+        })
+    return summary
+
+def format_bytes(n: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if n < 1024 or unit == 'TB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+
+def _ms(value: Optional[int]) -> str:
+    return '-' if value is None else f"{value / 1000:.1f}s"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Rank views by Athena bytes scanned and latency')
+    parser.add_argument('--file', type=Path, default=METRICS_FILE,
+                        help=f'Metrics file (default: {METRICS_FILE.name})')
+    parser.add_argument('--sort', choices=sorted(SORT_KEYS), default='bytes',
+                        help='Ranking: total bytes, total cost, p95 latency or query count (default: bytes)')
+    parser.add_argument('--top', type=int, default=20,
+                        help='Number of views to show (default: 20)')
+    parser.add_argument('--revision', help='Only include queries recorded at this git revision')
+    parser.add_argument('--tool', help='Only include queries run by this script, e.g. deploy_views')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    records = [
+        r for r in load_metrics(args.file)
+        if (not args.revision or r.get('revision', '').startswith(args.revision))
+        and (not args.tool or r.get('tool') == args.tool)
+    ]
+    if not records:
+        print(f"⚠️  No query metrics recorded in {args.file}")
+        sys.exit(0)
+
+    summary = summarize(records)
+    sort_key = SORT_KEYS[args.sort]
+    summary.sort(key=lambda s: s[sort_key] or 0, reverse=True)
+
+    print("=" * 100)
+    print(f"QUERY METRICS BY VIEW (sorted by {args.sort})")
+    print("=" * 100)
+    print(f"Queries: {len(records)}   Views: {len(summary)}   "
+          f"Scanned: {format_bytes(sum(s['total_bytes'] for s in summary))}   "
+          f"Est. cost: ${sum(s['total_cost_usd'] for s in summary):.4f}")
+    print()
+    print(f"{'View':<40} {'Runs':>5} {'Fail':>5} {'Scanned':>10} {'Avg':>10} "
+          f"{'Cost':>9} {'p50':>7} {'p95':>7} {'Queue':>7}")
+    print("-" * 100)
+
+    for s in summary[:args.top]:
+        print(f"{s['view'][:40]:<40} {s['queries']:>5} {s['failed']:>5} "
+              f"{format_bytes(s['total_bytes']):>10} {format_bytes(s['avg_bytes']):>10} "
+              f"${s['total_cost_usd']:>8.4f} {_ms(s['p50_total_ms']):>7} {_ms(s['p95_total_ms']):>7} "
+              f"{_ms(s['max_queue_ms']):>7}")
+
+    if len(summary) > args.top:
+        print(f"... {len(summary) - args.top} more view(s) (use --top)")
+
+if __name__ == '__main__':
+    main()
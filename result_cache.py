@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of query results for repeated validation and probe queries.
+
+Date-fix iterations re-run the same probes (test_date_columns_with_data.py,
+validate_all_date_columns.py) against views that mostly did not change. A
+ResultCache returns the rows of an identical earlier query straight from disk.
+The cache key covers everything that can change the result:
+
+- the SQL, normalized like deploy_views does (comments and whitespace)
+- the database the query runs in and the backend (Athena or a local fixture set)
+- the body hash of every view the query reads, through its upstream views
+
+so editing any view file in the dependency closure invalidates every entry
+that reads it. Source tables change without a file change, which the TTL
+covers. Results are stored as one Parquet file per query under .query_cache/,
+evicted least recently used once the cache grows past its size limit. Every
+column is stored as the text Athena returned, with its Athena type in the
+field metadata, and converted back on read. A column that mixes typed values
+with strings convert_value could not parse is stored like any other.
+
+On a miss the query runs with Athena's server-side result reuse enabled
+(ResultReuseByAgeConfiguration), so a probe that was run by anyone in the
+workgroup recently is not re-scanned either.
+
+Requires: pip install pyarrow
+
+Usage:
+    python3 test_date_columns_with_data.py --cache
+    python3 validate_all_date_columns.py --cache
+    python3 result_cache.py                  # entries, size, stale entries
+    python3 result_cache.py --prune          # drop expired and stale entries
+    python3 result_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from athena_query_runner import AthenaQueryRunner
+from athena_results import athena_text, convert_value, get_column_info, iter_query_results
+from deploy_views import (VIEWS_DIR, build_dependency_graph, discover_views, extract_view_references,
+                          normalize_sql, upstream_views, view_body_hash)
+from query_metrics import format_bytes
+
+CACHE_DIR = Path(__file__).parent / '.query_cache'
+INDEX_FILE_NAME = 'index.json'
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_MAX_BYTES = 256 * 1024 ** 2
+DEFAULT_REUSE_MINUTES = 60
+
+class ResultCache:
+    """Parquet-backed LRU cache of query results, keyed on SQL and the views it reads"""
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, backend: str = 'athena',
+                 ttl: float = DEFAULT_TTL_SECONDS, max_bytes: int = DEFAULT_MAX_BYTES,
+                 reuse_minutes: Optional[int] = DEFAULT_REUSE_MINUTES, views_dir: Path = VIEWS_DIR):
+        self.cache_dir = Path(cache_dir)
+        self.backend = backend
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.reuse_minutes = reuse_minutes
+        self.hits = 0
+        self.misses = 0
+
+        view_files = discover_views(views_dir, None)
+        self._graph = build_dependency_graph(view_files)
+        self._view_hashes = {name: view_body_hash(path.read_text()) for name, path in view_files.items()}
+
+        self._lock = threading.Lock()
+        self._index_path = self.cache_dir / INDEX_FILE_NAME
+        self._index = self._load_index()
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            return json.loads(self._index_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        self.cache_dir.mkdir(exist_ok=True)
+        tmp = self._index_path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self._index, indent=1, sort_keys=True))
+        os.replace(tmp, self._index_path)
+
+    def view_closure(self, sql: str) -> Dict[str, str]:
+        """Body hash of every view sql reads, directly or through upstream views"""
+        views = set()
+        for view in extract_view_references(sql):
+            views.add(view)
+            views |= upstream_views(self._graph, view)
+        # Views without a file here are assumed deployed and unchanged
+        return {view: self._view_hashes.get(view, 'external') for view in sorted(views)}
+
+    def key(self, sql: str, database: str, parameters: Optional[List[str]] = None) -> str:
+        content = json.dumps([self.backend, database, normalize_sql(sql), parameters or [],
+                              self.view_closure(sql)])
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """Cached rows for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            path = self.cache_dir / entry['file']
+            if time.time() - entry['created_at'] > self.ttl or not path.exists():
+                self._remove(key)
+                self._save_index()
+                return None
+            entry['last_used_at'] = time.time()
+            self._save_index()
+        table = pq.read_table(path)
+        types = {field.name: (field.metadata or {}).get(b'athena_type') for field in table.schema}
+        # Entries written before types were recorded hold typed columns already
+        return [{name: convert_value(value, types[name].decode()) if types[name] else value
+                 for name, value in row.items()}
+                for row in table.to_pylist()]
+
+    def put(self, key: str, rows: List[Dict], columns: List[Dict], sql: str, database: str,
+            query_id: Optional[str] = None):
+        """
+        Store rows under key and evict least recently used entries past max_bytes.
+
+        columns is the query's ResultSetMetadata.ColumnInfo (Name, Type).
+        """
+        self.cache_dir.mkdir(exist_ok=True)
+        path = self.cache_dir / f'{key}.parquet'
+        tmp = path.with_suffix('.tmp')
+        types = {column['Name']: column['Type'] for column in columns}
+        schema = pa.schema([pa.field(name, pa.string(), metadata={'athena_type': athena_type})
+                            for name, athena_type in types.items()])
+        table = pa.Table.from_pylist([{name: athena_text(row.get(name)) for name in types} for row in rows],
+                                     schema=schema)
+        pq.write_table(table, tmp)
+        os.replace(tmp, path)
+
+        now = time.time()
+        with self._lock:
+            self._index[key] = {
+                'file': path.name,
+                'bytes': path.stat().st_size,
+                'rows': len(rows),
+                'created_at': now,
+                'last_used_at': now,
+                'backend': self.backend,
+                'database': database,
+                'query_id': query_id,
+                'sql': normalize_sql(sql),
+                'views': self.view_closure(sql),
+            }
+            self._evict()
+            self._save_index()
+
+    def _remove(self, key: str):
+        entry = self._index.pop(key, None)
+        if entry:
+            try:
+                (self.cache_dir / entry['file']).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        total = sum(entry['bytes'] for entry in self._index.values())
+        for key in sorted(self._index, key=lambda k: self._index[k]['last_used_at']):
+            if total <= self.max_bytes:
+                break
+            total -= self._index[key]['bytes']
+            self._remove(key)
+
+    def fetch(self, runner: AthenaQueryRunner, sql: str, database: Optional[str] = None,
+              tag: Optional[str] = None, parameters: Optional[List[str]] = None) -> Dict:
+        """
+        Rows of sql, from the cache or by running it.
+
+        parameters are Athena ExecutionParameters for the ? placeholders in sql.
+
+        Returns {'rows', 'query_id', 'cached'}. Query failures propagate from
+        runner.run as QueryFailedError / QueryTimeoutError and are not cached.
+        """
+        database = database or runner.database
+        key = self.key(sql, database, parameters)
+
+        rows = self.get(key)
+        if rows is not None:
+            self.hits += 1
+            return {'rows': rows, 'query_id': self._index.get(key, {}).get('query_id'), 'cached': True}
+
+        self.misses += 1
+        start_kwargs = {'ExecutionParameters': parameters} if parameters else {}
+        if self.reuse_minutes:
+            start_kwargs['ResultReuseConfiguration'] = {
+                'ResultReuseByAgeConfiguration': {'Enabled': True, 'MaxAgeInMinutes': self.reuse_minutes}
+            }
+        execution = runner.run(sql, database, tag, **start_kwargs)
+        query_id = execution['QueryExecutionId']
+        rows = list(iter_query_results(runner.client, query_id))
+        self.put(key, rows, get_column_info(runner.client, query_id), sql, database, query_id)
+        return {'rows': rows, 'query_id': query_id, 'cached': False}
+
+    def stale_keys(self) -> List[str]:
+        """Entries that are expired or read a view whose file has since changed"""
+        now = time.time()
+        return [
+            key for key, entry in self._index.items()
+            if now - entry['created_at'] > self.ttl
+            or any(self._view_hashes.get(view, 'external') != digest for view, digest in entry['views'].items())
+        ]
+
+    def prune(self) -> int:
+        """Drop stale entries and Parquet files the index no longer knows; returns entries dropped"""
+        with self._lock:
+            stale = self.stale_keys()
+            for key in stale:
+                self._remove(key)
+            known = {entry['file'] for entry in self._index.values()}
+            for path in self.cache_dir.glob('*.parquet'):
+                if path.name not in known:
+                    path.unlink()
+            self._save_index()
+        return len(stale)
+
+    def entries(self) -> Dict[str, Dict]:
+        with self._lock:
+            return dict(self._index)
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._index):
+                self._remove(key)
+            self._save_index()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Inspect and maintain the local query result cache')
+    parser.add_argument('--dir', type=Path, default=CACHE_DIR,
+                        help=f'Cache directory (default: {CACHE_DIR.name})')
+    parser.add_argument('--prune', action='store_true',
+                        help='Drop expired entries and entries whose views changed')
+    parser.add_argument('--clear', action='store_true',
+                        help='Drop every entry')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    cache = ResultCache(args.dir)
+
+    print("=" * 80)
+    print(f"QUERY RESULT CACHE ({args.dir})")
+    print("=" * 80)
+
+    if args.clear:
+        count = len(cache.entries())
+        cache.clear()
+        print(f"✅ Cleared {count} entr{'y' if count == 1 else 'ies'}")
+        return
+
+    if args.prune:
+        print(f"✅ Pruned {cache.prune()} expired or stale entries")
+
+    entries = cache.entries()
+    stale = set(cache.stale_keys())
+    total = sum(entry['bytes'] for entry in entries.values())
+    print(f"Entries: {len(entries)}   Size: {format_bytes(total)} / {format_bytes(cache.max_bytes)}   "
+          f"Stale: {len(stale)}")
+
+    if entries:
+        print(f"\n{'Last used':<20} {'Rows':>7} {'Size':>10}  {'Views / SQL'}")
+        print("-" * 80)
+        for key, entry in sorted(entries.items(), key=lambda item: -item[1]['last_used_at']):
+            last_used = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['last_used_at']))
+            label = ', '.join(entry['views']) or entry['sql'][:40]
+            marker = '⚠️  ' if key in stale else ''
+            print(f"{last_used:<20} {entry['rows']:>7} {format_bytes(entry['bytes']):>10}  {marker}{label[:40]}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Token-based analyzer for the Presto/Athena SQL in views/.
+
+Line-by-line regex scanning misses multi-line expressions such as
+
+    COALESCE(
+        TRY(date_parse(e.period_start, '%Y-%m-%dT%H:%i:%sZ')),
+        TRY(date_parse(e.period_start, '%Y-%m-%d'))
+    ) as encounter_start,
+
+and cannot see a CREATE OR REPLACE VIEW that follows a comment header. This
+module tokenizes the SQL (comments, string literals and quoted identifiers
+handled properly), splits every SELECT list into items and reports for each
+file:
+
+- view: the fully qualified view created by the file
+- tables: every table/view read via FROM/JOIN (CTE names excluded)
+- ctes: CTE names in definition order
+- output_columns: the aliases of the outermost SELECT list
+- column_sources: output columns that pass one column through unchanged
+  (c.onset_date_time AS pld_onset_datetime), mapped to that column's name
+- date_expressions: each date-parsing expression (date_parse, parse_datetime,
+  from_iso8601_*, CAST/TRY_CAST AS TIMESTAMP/DATE, DATE()) with its output
+  alias, enclosing CTE, source expressions and the formats it covers
+
+Results are cached in .sql_analysis_cache.json, one entry per file keyed by
+its path relative to the repo and reused while the content hash matches;
+entries for files that no longer exist are pruned on save. Cache misses are
+parsed in parallel worker processes.
+
+Usage:
+    python3 sql_analyzer.py                 # summarize every views/*.sql
+    python3 sql_analyzer.py views/v_medications.sql --json
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+REPO_DIR = Path(__file__).resolve().parent
+VIEWS_DIR = Path(__file__).parent / 'views'
+CACHE_FILE = Path(__file__).parent / '.sql_analysis_cache.json'
+
+# Bump when the analysis output or cache layout changes so stale cache entries are ignored
+ANALYZER_VERSION = 3
+
+# Parsing a handful of files inline is faster than starting worker processes
+MIN_PARALLEL_FILES = 8
+
+ISO8601 = 'ISO8601'
+
+class Token(NamedTuple):
+    kind: str   # ident, quoted, string, number, op
+    value: str
+    line: int
+    word: str   # upper-cased value for identifiers/keywords, '' otherwise
+    pos: int    # character offset in the source text
+
+TOKEN_PATTERN = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<line_comment>--[^\n]*)
+  | (?P<block_comment>/\*.*?(?:\*/|\Z))
+  | (?P<string>'(?:[^']|'')*(?:'|\Z))
+  | (?P<quoted>"(?:[^"]|"")*(?:"|\Z))
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<op><=|>=|<>|!=|\|\||->|=>|.)
+""", re.VERBOSE | re.DOTALL)
+
+OPEN_BRACKETS = ('(', '[')
+CLOSE_BRACKETS = (')', ']')
+
+SET_OPERATORS = {'UNION', 'EXCEPT', 'INTERSECT'}
+
+# Words that can end a select item without being an implicit alias
+NON_ALIAS_WORDS = {
+    'END', 'NULL', 'TRUE', 'FALSE', 'AND', 'OR', 'NOT', 'IS', 'IN', 'LIKE',
+    'THEN', 'ELSE', 'WHEN', 'CASE', 'AS', 'DISTINCT', 'ALL', 'SELECT',
+}
+
+DATE_PARSE_FUNCTIONS = {'DATE_PARSE', 'PARSE_DATETIME'}
+ISO8601_FUNCTIONS = {'FROM_ISO8601_TIMESTAMP', 'FROM_ISO8601_DATE', 'FROM_ISO8601_TIMESTAMP_NANOS'}
+CAST_FUNCTIONS = {'CAST', 'TRY_CAST'}
+CAST_DATE_TYPES = {'TIMESTAMP', 'DATE'}
+DATE_FUNCTIONS = DATE_PARSE_FUNCTIONS | ISO8601_FUNCTIONS | CAST_FUNCTIONS | {'DATE'}
+
+# Column names that hold FHIR date/dateTime strings
+DATE_SUFFIXES = ('_date', '_datetime', '_date_time', '_start', '_end', '_stop', '_instant')
+DATE_COLUMNS = {'date', 'start', 'end', 'created', 'issued', 'authored_on', 'recorded_date', 'birth_date',
+                'occurrence_date_time', 'onset_date_time', 'abatement_date_time'}
+
+def tokenize(sql: str) -> List[Token]:
+    """Split SQL into tokens, dropping whitespace and comments"""
+    tokens = []
+    line = 1
+
+    for match in TOKEN_PATTERN.finditer(sql):
+        kind = match.lastgroup
+        value = match.group()
+
+        if kind not in ('ws', 'line_comment', 'block_comment'):
+            tokens.append(Token(kind, value, line, value.upper() if kind == 'ident' else '', match.start()))
+
+        line += value.count('\n')
+
+    return tokens
+
+def identifier_name(token: Token) -> str:
+    """Identifier text without quotes, lowercased (Athena names are case-insensitive)"""
+    if token.kind == 'quoted':
+        return token.value[1:-1].replace('""', '"').lower()
+    return token.value.lower()
+
+def unquote_string(token: Token) -> str:
+    return token.value[1:-1].replace("''", "'")
+
+def bracket_depths(tokens: List[Token]) -> List[int]:
+    """Depth of each token; brackets carry the depth of their contents' parent"""
+    depths = []
+    depth = 0
+    for token in tokens:
+        if token.kind == 'op' and token.value in CLOSE_BRACKETS:
+            depth -= 1
+        depths.append(depth)
+        if token.kind == 'op' and token.value in OPEN_BRACKETS:
+            depth += 1
+    return depths
+
+def matching_close(tokens: List[Token], depths: List[int], open_idx: int) -> int:
+    """Index of the bracket closing tokens[open_idx] (or len(tokens) if unbalanced)"""
+    depth = depths[open_idx]
+    for i in range(open_idx + 1, len(tokens)):
+        if depths[i] == depth and tokens[i].kind == 'op' and tokens[i].value in CLOSE_BRACKETS:
+            return i
+    return len(tokens)
+
+def split_args(tokens: List[Token], depths: List[int], open_idx: int, close_idx: int) -> List[Tuple[int, int]]:
+    """(start, end) token ranges of the comma-separated arguments in a call"""
+    inner = depths[open_idx] + 1
+    args = []
+    start = open_idx + 1
+    for i in range(open_idx + 1, close_idx):
+        if depths[i] == inner and tokens[i].kind == 'op' and tokens[i].value == ',':
+            args.append((start, i))
+            start = i + 1
+    if start < close_idx:
+        args.append((start, close_idx))
+    return args
+
+def render(tokens: List[Token], start: int, end: int) -> str:
+    """Compact text of a token range, e.g. NULLIF(a.start, '')"""
+    out = []
+    prev = None
+    for token in tokens[start:end]:
+        if prev is not None and not (
+            token.value in ('.', ')', ']', ',') or prev.value in ('.', '(', '[')
+            or (token.value in OPEN_BRACKETS and prev.kind in ('ident', 'quoted'))
+        ):
+            out.append(' ')
+        out.append(token.value)
+        prev = token
+    return ''.join(out)
+
+def parse_ctes(tokens: List[Token], depths: List[int]) -> List[Tuple[str, int, int]]:
+    """(name, body_open_idx, body_close_idx) for every CTE in WITH clauses"""
+    ctes = []
+
+    for i, token in enumerate(tokens):
+        if token.word != 'WITH':
+            continue
+
+        j = i + 1
+        if j < len(tokens) and tokens[j].word == 'RECURSIVE':
+            j += 1
+
+        while j < len(tokens) and tokens[j].kind in ('ident', 'quoted'):
+            name = identifier_name(tokens[j])
+            j += 1
+            if j < len(tokens) and tokens[j].value == '(':
+                j = matching_close(tokens, depths, j) + 1  # column list
+            if j >= len(tokens) or tokens[j].word != 'AS':
+                break
+            j += 1
+            if j >= len(tokens) or tokens[j].value != '(':
+                break
+            close = matching_close(tokens, depths, j)
+            ctes.append((name, j, close))
+            j = close + 1
+            if j < len(tokens) and tokens[j].value == ',':
+                j += 1
+            else:
+                break
+
+    return ctes
+
+def select_items(tokens: List[Token], depths: List[int]) -> List[Tuple[int, int, int]]:
+    """(select_idx, start, end) token ranges for every item of every SELECT list"""
+    items = []
+
+    for i, token in enumerate(tokens):
+        if token.word != 'SELECT':
+            continue
+
+        depth = depths[i]
+        j = i + 1
+        while j < len(tokens) and tokens[j].word in ('DISTINCT', 'ALL'):
+            j += 1
+
+        start = j
+        while j < len(tokens):
+            tok = tokens[j]
+            if depths[j] < depth:
+                break
+            if depths[j] == depth:
+                word = tok.word
+                if word == 'FROM' or word in SET_OPERATORS or tok.value == ';':
+                    break
+                if tok.kind == 'op' and tok.value == ',':
+                    items.append((i, start, j))
+                    start = j + 1
+            j += 1
+        if start < j:
+            items.append((i, start, j))
+
+    return items
+
+def item_alias(tokens: List[Token], start: int, end: int) -> Optional[str]:
+    """Output name of a select item: explicit/implicit alias or bare column name"""
+    if end - start >= 2 and tokens[end - 2].word == 'AS':
+        return identifier_name(tokens[end - 1])
+
+    last = tokens[end - 1]
+    if last.kind in ('ident', 'quoted') and last.word not in NON_ALIAS_WORDS:
+        if end - start == 1:
+            return identifier_name(last)
+        prev = tokens[end - 2]
+        if prev.value == '.':
+            # Bare qualified column (a.b) keeps its column name
+            return identifier_name(last) if end - start == 3 else None
+        if prev.value in CLOSE_BRACKETS or prev.kind in ('ident', 'quoted', 'string', 'number'):
+            return identifier_name(last)
+
+    if last.value == '*':
+        return '*'
+    return None
+
+def item_source_column(tokens: List[Token], start: int, end: int) -> Optional[str]:
+    """Column name of a select item that is a bare column reference (a.b, a.b AS c, b c), or None"""
+    if end - start >= 2 and tokens[end - 2].word == 'AS':
+        end -= 2
+    elif end - start in (2, 4) and tokens[end - 2].value != '.':
+        end -= 1  # implicit alias
+
+    parts = tokens[start:end]
+    if len(parts) == 3 and parts[1].value == '.':
+        parts = parts[2:]
+    if len(parts) == 1 and parts[0].kind in ('ident', 'quoted') and parts[0].word not in NON_ALIAS_WORDS:
+        return identifier_name(parts[0])
+    return None
+
+def is_date_column_name(column: str) -> bool:
+    """Whether a column name looks like a date/dateTime column (onset_date_time, period_start, ...)"""
+    if column.endswith(('_text', '_display', '_unit', '_code', '_system')):
+        return False
+    return column in DATE_COLUMNS or column.endswith(DATE_SUFFIXES) or 'date_time' in column
+
+def _referenced_tables(tokens: List[Token], cte_names: Iterable[str]) -> List[str]:
+    """Qualified names read via FROM/JOIN, excluding CTEs"""
+    cte_names = set(cte_names)
+    tables = set()
+
+    for i, token in enumerate(tokens):
+        if token.word not in ('FROM', 'JOIN'):
+            continue
+
+        j = i + 1
+        # Parenthesized joins: FROM (a LEFT JOIN b ...); subqueries are skipped
+        while j < len(tokens) and tokens[j].value == '(':
+            j += 1
+        if j >= len(tokens) or tokens[j].kind not in ('ident', 'quoted'):
+            continue
+        if tokens[j].word in ('SELECT', 'WITH', 'VALUES', 'UNNEST', 'LATERAL'):
+            continue
+
+        parts = [identifier_name(tokens[j])]
+        j += 1
+        while j + 1 < len(tokens) and tokens[j].value == '.' and tokens[j + 1].kind in ('ident', 'quoted'):
+            parts.append(identifier_name(tokens[j + 1]))
+            j += 2
+
+        name = '.'.join(parts)
+        if name not in cte_names:
+            tables.add(name)
+
+    return sorted(tables)
+
+def _date_call(tokens: List[Token], depths: List[int], idx: int) -> Optional[Dict]:
+    """Describe the date-parsing call starting at tokens[idx], or None"""
+    word = tokens[idx].word
+    if word not in DATE_FUNCTIONS:
+        return None
+    if idx + 1 >= len(tokens) or tokens[idx + 1].value != '(':
+        return None
+    if idx > 0 and tokens[idx - 1].value == '.':
+        return None
+
+    open_idx = idx + 1
+    close_idx = matching_close(tokens, depths, open_idx)
+    args = split_args(tokens, depths, open_idx, close_idx)
+    if not args:
+        return None
+    source = render(tokens, *args[0])
+
+    if word in DATE_PARSE_FUNCTIONS:
+        fmt = None
+        if len(args) > 1 and args[1][1] - args[1][0] == 1 and tokens[args[1][0]].kind == 'string':
+            fmt = unquote_string(tokens[args[1][0]])
+        return {'function': word.lower(), 'format': fmt, 'source': source}
+
+    if word in ISO8601_FUNCTIONS:
+        return {'function': word.lower(), 'format': ISO8601, 'source': source}
+
+    if word == 'DATE':
+        return {'function': 'date', 'format': 'DATE', 'source': source}
+
+    if word in CAST_FUNCTIONS:
+        inner = depths[open_idx] + 1
+        for k in range(close_idx - 1, open_idx, -1):
+            if depths[k] == inner and tokens[k].word == 'AS':
+                target = tokens[k + 1].word if k + 1 < close_idx else ''
+                if target in CAST_DATE_TYPES:
+                    return {
+                        'function': word.lower(),
+                        'format': f'CAST AS {target}',
+                        'source': render(tokens, open_idx + 1, k),
+                    }
+                return None
+
+    return None
+
+def analyze_sql(sql: str) -> Dict:
+    """Analyze one SQL file's text; see the module docstring for the result keys"""
+    tokens = tokenize(sql)
+    depths = bracket_depths(tokens)
+
+    # View name
+    view = None
+    for i in range(len(tokens) - 3):
+        if (tokens[i].word == 'CREATE' and tokens[i + 1].word == 'OR'
+                and tokens[i + 2].word == 'REPLACE' and tokens[i + 3].word == 'VIEW'):
+            parts = []
+            j = i + 4
+            while j < len(tokens) and tokens[j].kind in ('ident', 'quoted'):
+                parts.append(identifier_name(tokens[j]))
+                if j + 1 < len(tokens) and tokens[j + 1].value == '.':
+                    j += 2
+                else:
+                    break
+            view = '.'.join(parts) or None
+            break
+
+    ctes = parse_ctes(tokens, depths)
+    cte_names = [name for name, _, _ in ctes]
+    tables = [t for t in _referenced_tables(tokens, cte_names) if t != view]
+
+    def scope_of(idx: int) -> Optional[str]:
+        # Innermost CTE whose body contains idx
+        best = None
+        for name, open_idx, close_idx in ctes:
+            if open_idx < idx < close_idx and (best is None or open_idx > best[1]):
+                best = (name, open_idx)
+        return best[0] if best else None
+
+    items = select_items(tokens, depths)
+
+    # Outermost SELECT that is not inside a CTE body: the view's output columns
+    output_columns = []
+    column_sources = {}
+    main_select = None
+    for select_idx, _, _ in items:
+        if scope_of(select_idx) is None and (main_select is None or depths[select_idx] < depths[main_select]):
+            main_select = select_idx
+    for select_idx, start, end in items:
+        if select_idx == main_select:
+            alias = item_alias(tokens, start, end)
+            output_columns.append(alias)
+            source = item_source_column(tokens, start, end)
+            if alias and source:
+                column_sources[alias] = source
+
+    # Date-parsing calls grouped by the innermost select item containing them;
+    # calls outside select lists (WHERE, ON, ...) are grouped by outermost call
+    grouped: Dict[Tuple[int, int], List[Tuple[int, Dict]]] = {}
+    outer_call = None
+    for idx, token in enumerate(tokens):
+        if token.kind != 'ident':
+            continue
+        call = _date_call(tokens, depths, idx)
+        if call is None:
+            continue
+
+        owner = None
+        for _, start, end in items:
+            if start <= idx < end and (owner is None or start > owner[0]):
+                owner = (start, end)
+        if owner is None:
+            if outer_call is None or idx >= outer_call[1]:
+                outer_call = (idx, matching_close(tokens, depths, idx + 1) + 1)
+            owner = outer_call
+        grouped.setdefault(owner, []).append((idx, call))
+
+    date_expressions = []
+    for (start, end), calls in sorted(grouped.items()):
+        in_select = any(start == s and end == e for _, s, e in items)
+        formats = list(dict.fromkeys(c['format'] for _, c in calls if c['format']))
+        date_expressions.append({
+            'line': tokens[calls[0][0]].line,
+            'alias': item_alias(tokens, start, end) if in_select else None,
+            'scope': scope_of(start),
+            'functions': [c['function'] for _, c in calls],
+            'formats': formats,
+            'sources': list(dict.fromkeys(c['source'] for _, c in calls)),
+        })
+
+    return {
+        'view': view,
+        'tables': tables,
+        'ctes': cte_names,
+        'output_columns': output_columns,
+        'column_sources': column_sources,
+        'date_expressions': date_expressions,
+    }
+
+def file_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def _load_cache(cache_file: Optional[Path]) -> Dict[str, Dict]:
+    if cache_file is None or not cache_file.exists():
+        return {}
+    try:
+        cache = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != ANALYZER_VERSION:
+        return {}
+    return cache.get('entries', {})
+
+def _cache_key(path: Path) -> str:
+    """Path relative to the repo (absolute for files outside it), so same-named files never collide"""
+    resolved = path.resolve()
+    try:
+        return resolved.relative_to(REPO_DIR).as_posix()
+    except ValueError:
+        return resolved.as_posix()
+
+def _save_cache(cache_file: Optional[Path], entries: Dict[str, Dict]):
+    """Write the cache, dropping entries whose file has been deleted"""
+    if cache_file is None:
+        return
+    entries = {key: entry for key, entry in entries.items() if (REPO_DIR / key).exists()}
+    cache_file.write_text(json.dumps({'version': ANALYZER_VERSION, 'entries': entries}))
+
+def analyze_files(paths: Iterable[Path], cache_file: Optional[Path] = CACHE_FILE,
+                  max_workers: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    Analyze many SQL files, keyed by file name.
+
+    Files whose cache entry matches their content hash are served from the
+    cache; the rest are parsed in worker processes. Each result also carries
+    'file' and 'hash'.
+    """
+    paths = list(paths)
+    texts = {path: path.read_text() for path in paths}
+    hashes = {path: file_hash(text) for path, text in texts.items()}
+    keys = {path: _cache_key(path) for path in paths}
+
+    cached = _load_cache(cache_file)
+    misses = [path for path in paths if cached.get(keys[path], {}).get('hash') != hashes[path]]
+    stale = any(not (REPO_DIR / key).exists() for key in cached)
+
+    if misses:
+        miss_texts = [texts[path] for path in misses]
+        if len(misses) >= MIN_PARALLEL_FILES:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                analyses = list(executor.map(analyze_sql, miss_texts))
+        else:
+            analyses = [analyze_sql(text) for text in miss_texts]
+
+        for path, analysis in zip(misses, analyses):
+            cached[keys[path]] = {'hash': hashes[path], 'analysis': analysis}
+
+    if misses or stale:
+        _save_cache(cache_file, cached)
+
+    return {
+        path.name: dict(cached[keys[path]]['analysis'], file=path.name, hash=hashes[path])
+        for path in paths
+    }
+
+def analyze_file(path: Path, cache_file: Optional[Path] = CACHE_FILE) -> Dict:
+    """Analyze a single SQL file (cached)"""
+    return analyze_files([path], cache_file)[path.name]
+
+def main():
+    parser = argparse.ArgumentParser(description='Static analysis of Athena view SQL')
+    parser.add_argument('files', nargs='*', type=Path,
+                        help='SQL files to analyze (default: views/*.sql)')
+    parser.add_argument('--json', action='store_true', help='Print the full analysis as JSON')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not write the cache')
+    args = parser.parse_args()
+
+    files = args.files or sorted(VIEWS_DIR.glob('*.sql'))
+
+    started = time.perf_counter()
+    results = analyze_files(files, cache_file=None if args.no_cache else CACHE_FILE)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    print(f"{'File':<45} {'View':<45} {'Tables':>6} {'Dates':>6}")
+    print("-" * 106)
+    for name, analysis in results.items():
+        print(f"{name:<45} {analysis['view'] or '-':<45} "
+              f"{len(analysis['tables']):>6} {len(analysis['date_expressions']):>6}")
+    print(f"\nAnalyzed {len(results)} file(s) in {elapsed * 1000:.0f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Two-way sync between Athena named queries and the local saved-query files.
+
+The saved queries live as top-level <name>.sql files with an export header,
+listed in manifest.csv and concatenated into athena_saved_queries_all.sql.
+This script keeps all three in step with Athena:
+
+- remote queries are read with paginated list_named_queries plus
+  batch_get_named_query (50 per call), so a full sync of a few hundred
+  queries is a handful of API calls
+- every query is compared by content hash (name, description and SQL) on
+  both sides against the hash recorded in manifest.csv at the last sync:
+  changed only remotely -> pulled into the local file, changed only locally
+  -> pushed with update_named_query, changed on both sides -> conflict
+  (resolved only with --prefer). Before the first sync manifest.csv has no
+  hashes, so every query that differs is a conflict
+- a local file with an export header and an empty ID is created remotely
+- only the sections of athena_saved_queries_all.sql whose file changed are
+  rewritten
+
+Queries deleted in Athena are reported; --prune removes their local file and
+manifest row.
+
+Usage:
+    python3 sync_named_queries.py --dry-run                  # show the plan
+    python3 sync_named_queries.py                            # pull and push
+    python3 sync_named_queries.py --direction pull           # never write to Athena
+    python3 sync_named_queries.py --database fhir_v2_prd_db --prefer remote
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import re
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from athena_client import create_athena_client, get_session
+from athena_config import CONFIG
+
+REPO_DIR = Path(__file__).parent
+MANIFEST_FILE = REPO_DIR / 'manifest.csv'
+EXPORT_FILE = REPO_DIR / 'athena_saved_queries_all.sql'
+
+MANIFEST_FIELDS = ['file', 'name', 'id', 'database', 'workgroup', 'arn', 'description', 'content_sha256']
+HEADER_FIELDS = [('Exported', 'exported'), ('Name', 'name'), ('ID', 'id'), ('Database', 'database'),
+                 ('Workgroup', 'workgroup'), ('ARN', 'arn'), ('Description', 'description')]
+
+EXPORT_SEPARATOR = '-- ============================== --'
+ARN_TEMPLATE = 'arn:aws:athena:{region}:{account}:namedquery/{id}'
+
+# list_named_queries and batch_get_named_query both cap at 50
+LIST_PAGE_SIZE = 50
+BATCH_SIZE = 50
+
+DEFAULT_WORKGROUP = CONFIG['workgroup']
+
+HEADER_PATTERN = re.compile(r'\A/\*\n((?:  \w+:.*\n)+)\*/\n')
+HEADER_LINE_PATTERN = re.compile(r'  (\w+): ?(.*)')
+
+def query_hash(query: Dict) -> str:
+    """Hash of what a sync can change: name, description and SQL (trailing whitespace ignored)"""
+    content = json.dumps([
+        query['name'],
+        query.get('description') or '',
+        query['query_string'].replace('\r\n', '\n').rstrip(),
+    ])
+    return hashlib.sha256(content.encode()).hexdigest()
+
+def parse_query_file(text: str) -> Optional[Dict]:
+    """Split a saved-query file into its header fields and query_string; None without a header"""
+    match = HEADER_PATTERN.match(text)
+    if not match:
+        return None
+    labels = {label: key for label, key in HEADER_FIELDS}
+    query = {key: '' for _, key in HEADER_FIELDS}
+    for line in match.group(1).splitlines():
+        field = HEADER_LINE_PATTERN.match(line)
+        if field and field.group(1) in labels:
+            query[labels[field.group(1)]] = field.group(2).strip()
+    query['query_string'] = text[match.end():]
+    return query
+
+def render_query_file(query: Dict) -> str:
+    """The local file for a query, header included"""
+    header = ''.join(f"  {label}: {query.get(key) or ''}\n" for label, key in HEADER_FIELDS)
+    return f"/*\n{header}*/\n{query['query_string'].rstrip()}\n"
+
+def file_name(name: str) -> str:
+    return re.sub(r'[^\w.-]+', '-', name).strip('-') + '.sql'
+
+def caller_account(calls: Dict[str, int]) -> str:
+    """The AWS account of the current credentials, for named query ARNs"""
+    sts = get_session().client('sts', region_name=CONFIG['region'])
+    calls['get_caller_identity'] = calls.get('get_caller_identity', 0) + 1
+    return sts.get_caller_identity()['Account']
+
+def named_query_arn(account: str, query_id: str) -> str:
+    return ARN_TEMPLATE.format(region=CONFIG['region'], account=account, id=query_id)
+
+def from_named_query(named_query: Dict, account: str) -> Dict:
+    """Convert a batch_get_named_query entry to the local query dict"""
+    return {
+        'name': named_query['Name'],
+        'id': named_query['NamedQueryId'],
+        'database': named_query.get('Database', ''),
+        'workgroup': named_query.get('WorkGroup', DEFAULT_WORKGROUP),
+        'arn': named_query_arn(account, named_query['NamedQueryId']),
+        'description': named_query.get('Description', ''),
+        'query_string': named_query['QueryString'],
+    }
+
+def _chunks(items: List[str], size: int) -> Iterator[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def list_named_query_ids(client, workgroup: str, calls: Dict[str, int]) -> List[str]:
+    """Every named query ID in a workgroup, following NextToken"""
+    ids = []
+    kwargs = {'WorkGroup': workgroup, 'MaxResults': LIST_PAGE_SIZE}
+    while True:
+        response = client.list_named_queries(**kwargs)
+        calls['list_named_queries'] = calls.get('list_named_queries', 0) + 1
+        ids.extend(response.get('NamedQueryIds', []))
+        next_token = response.get('NextToken')
+        if not next_token:
+            return ids
+        kwargs['NextToken'] = next_token
+
+def get_named_queries(client, ids: List[str], calls: Dict[str, int],
+                      account: str) -> Tuple[Dict[str, Dict], List[Dict]]:
+    """Fetch queries BATCH_SIZE at a time; returns ({id: query}, unprocessed entries)"""
+    queries = {}
+    unprocessed = []
+    for chunk in _chunks(ids, BATCH_SIZE):
+        response = client.batch_get_named_query(NamedQueryIds=chunk)
+        calls['batch_get_named_query'] = calls.get('batch_get_named_query', 0) + 1
+        for named_query in response.get('NamedQueries', []):
+            queries[named_query['NamedQueryId']] = from_named_query(named_query, account)
+        unprocessed.extend(response.get('UnprocessedNamedQueryIds', []))
+    return queries, unprocessed
+
+def load_manifest(path: Path = MANIFEST_FILE) -> List[Dict]:
+    if not path.exists():
+        return []
+    with open(path, newline='') as f:
+        return [dict(row) for row in csv.DictReader(f)]
+
+def save_manifest(rows: List[Dict], path: Path = MANIFEST_FILE):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS, extrasaction='ignore', lineterminator='\n')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({field: row.get(field, '') for field in MANIFEST_FIELDS})
+
+def load_local(manifest: List[Dict], repo_dir: Path = REPO_DIR) -> Tuple[Dict[str, Dict], List[Dict]]:
+    """
+    Local saved queries: ({id: query}, [queries with no ID yet]).
+
+    Reads the manifest's files plus any other top-level .sql file that
+    carries an export header.
+    """
+    paths = [repo_dir / row['file'] for row in manifest]
+    listed = set(paths)
+    paths += [p for p in sorted(repo_dir.glob('*.sql')) if p not in listed and p != EXPORT_FILE]
+
+    by_id = {}
+    new = []
+    for path in paths:
+        if not path.exists():
+            continue
+        query = parse_query_file(path.read_text())
+        if query is None:
+            continue
+        query['file'] = path.name
+        if query['id']:
+            by_id[query['id']] = query
+        elif query['name'] and query['database']:
+            new.append(query)
+    return by_id, new
+
+def plan_sync(local: Dict[str, Dict], remote: Dict[str, Dict], base: Dict[str, str],
+              prefer: Optional[str] = None) -> List[Dict]:
+    """
+    Decide one action per query ID.
+
+    base maps ID to the hash recorded at the last sync. Actions: unchanged,
+    pull, push, conflict, deleted (in Athena, still local).
+    """
+    actions = []
+    for query_id in sorted(set(local) | set(remote)):
+        ours, theirs = local.get(query_id), remote.get(query_id)
+        if ours is None:
+            actions.append({'action': 'pull', 'id': query_id, 'new': True})
+            continue
+        if theirs is None:
+            actions.append({'action': 'deleted', 'id': query_id})
+            continue
+
+        local_hash, remote_hash = query_hash(ours), query_hash(theirs)
+        if local_hash == remote_hash:
+            action = 'unchanged'
+        elif base.get(query_id) == remote_hash:
+            action = 'push'
+        elif base.get(query_id) == local_hash:
+            action = 'pull'
+        else:
+            action = {'local': 'push', 'remote': 'pull'}.get(prefer, 'conflict')
+
+        if action == 'push' and ours['database'] and ours['database'] != theirs['database']:
+            # update_named_query cannot move a query to another database
+            action = 'conflict'
+        actions.append({'action': action, 'id': query_id, 'new': False})
+    return actions
+
+def export_sections(text: str) -> Dict[str, str]:
+    """Sections of the concatenated export, keyed by query ID"""
+    sections = {}
+    for section in text.split(f"\n{EXPORT_SEPARATOR}\n\n"):
+        query = parse_query_file(section)
+        if query and query['id']:
+            sections[query['id']] = section
+    return sections
+
+def update_export(manifest: List[Dict], repo_dir: Path = REPO_DIR, path: Path = EXPORT_FILE) -> int:
+    """
+    Bring the concatenated export in line with the manifest's files.
+
+    Sections whose file is unchanged are kept as they are; returns the number
+    of sections added or rewritten (0 leaves the file untouched).
+    """
+    current = path.read_text() if path.exists() else ''
+    existing = export_sections(current)
+    sections = []
+    rewritten = 0
+    for row in manifest:
+        text = (repo_dir / row['file']).read_text()
+        if existing.get(row['id']) != text:
+            rewritten += 1
+        sections.append(text)
+
+    export = ''.join(f"{text}\n{EXPORT_SEPARATOR}\n\n" for text in sections)
+    if export != current:
+        path.write_text(export)
+    return rewritten
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Sync Athena named queries with the local saved-query files')
+    parser.add_argument('--workgroup', action='append',
+                        help='Workgroup to sync; repeat for several (default: those in manifest.csv)')
+    parser.add_argument('--database', action='append',
+                        help='Only sync queries for this database; repeat for several (default: all)')
+    parser.add_argument('--direction', choices=['both', 'pull', 'push'], default='both',
+                        help='pull: only update local files; push: only update Athena (default: both)')
+    parser.add_argument('--prefer', choices=['local', 'remote'],
+                        help='Resolve queries changed on both sides in favour of this side')
+    parser.add_argument('--prune', action='store_true',
+                        help='Remove local files and manifest rows for queries deleted in Athena')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Print the plan without writing files or calling update/create')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    manifest = load_manifest()
+    workgroups = args.workgroup or sorted({row['workgroup'] for row in manifest} or {DEFAULT_WORKGROUP})
+    client = create_athena_client()
+    calls: Dict[str, int] = {}
+    account = caller_account(calls)
+
+    print("=" * 100)
+    print(f"SYNCING NAMED QUERIES ({', '.join(workgroups)}){' (DRY RUN)' if args.dry_run else ''}")
+    print("=" * 100)
+
+    remote = {}
+    unprocessed = []
+    for workgroup in workgroups:
+        ids = list_named_query_ids(client, workgroup, calls)
+        queries, failed = get_named_queries(client, ids, calls, account)
+        remote.update(queries)
+        unprocessed.extend(failed)
+
+    local, new_local = load_local(manifest)
+    local = {k: q for k, q in local.items() if (q['workgroup'] or DEFAULT_WORKGROUP) in workgroups}
+    if args.database:
+        remote = {k: q for k, q in remote.items() if q['database'] in args.database}
+        local = {k: q for k, q in local.items() if q['database'] in args.database}
+        new_local = [q for q in new_local if q['database'] in args.database]
+    # Queries Athena could not return this time are neither pulled nor treated as deleted
+    for entry in unprocessed:
+        local.pop(entry.get('NamedQueryId'), None)
+
+    base = {row['id']: row.get('content_sha256', '') for row in manifest}
+    actions = plan_sync(local, remote, base, args.prefer)
+    rows = {row['id']: row for row in manifest}
+    order = [row['id'] for row in manifest]
+    exported = _now()
+    counts: Dict[str, int] = {}
+
+    for action in actions:
+        kind, query_id = action['action'], action['id']
+        if (kind == 'pull' and args.direction == 'push') or (kind == 'push' and args.direction == 'pull'):
+            kind = 'skipped'
+        counts[kind] = counts.get(kind, 0) + 1
+
+        if kind == 'pull':
+            query = dict(remote[query_id], exported=exported)
+            query['file'] = local[query_id]['file'] if query_id in local else file_name(query['name'])
+            print(f"{'🆕' if action['new'] else '📝'} pull {query['name']} -> {query['file']}")
+            if not args.dry_run:
+                (REPO_DIR / query['file']).write_text(render_query_file(query))
+            rows[query_id] = dict(query, content_sha256=query_hash(query))
+            if query_id not in order:
+                order.append(query_id)
+        elif kind == 'push':
+            query = local[query_id]
+            print(f"🚀 push {query['file']} -> {query['name']} ({query_id})")
+            if not args.dry_run:
+                client.update_named_query(NamedQueryId=query_id, Name=query['name'],
+                                          Description=query['description'], QueryString=query['query_string'])
+                calls['update_named_query'] = calls.get('update_named_query', 0) + 1
+            rows[query_id] = dict(rows.get(query_id, {}), file=query['file'], name=query['name'],
+                                  description=query['description'], content_sha256=query_hash(query))
+        elif kind == 'unchanged':
+            rows[query_id] = dict(rows.get(query_id, {}), file=local[query_id]['file'],
+                                  content_sha256=query_hash(local[query_id]))
+            for key in ('name', 'database', 'workgroup', 'arn', 'description'):
+                rows[query_id][key] = remote[query_id][key]
+            if query_id not in order:
+                order.append(query_id)
+        elif kind == 'conflict':
+            query = local[query_id]
+            reason = ('database differs from Athena' if query['database'] != remote[query_id]['database']
+                      else 'changed locally and in Athena (use --prefer)')
+            print(f"⚠️  conflict {query['file']}: {reason}")
+        elif kind == 'deleted':
+            query = local[query_id]
+            if args.prune:
+                print(f"❌ prune {query['file']} (deleted in Athena)")
+                if not args.dry_run:
+                    (REPO_DIR / query['file']).unlink()
+                rows.pop(query_id, None)
+            else:
+                print(f"⚠️  {query['file']} was deleted in Athena (use --prune to remove)")
+
+    if args.direction != 'pull':
+        for query in new_local:
+            print(f"🆕 create {query['file']} -> {query['name']} ({query['database']})")
+            counts['create'] = counts.get('create', 0) + 1
+            if args.dry_run:
+                continue
+            response = client.create_named_query(
+                Name=query['name'], Database=query['database'], QueryString=query['query_string'],
+                Description=query['description'], WorkGroup=query['workgroup'] or DEFAULT_WORKGROUP
+            )
+            calls['create_named_query'] = calls.get('create_named_query', 0) + 1
+            query.update(id=response['NamedQueryId'], arn=named_query_arn(account, response['NamedQueryId']),
+                         workgroup=query['workgroup'] or DEFAULT_WORKGROUP, exported=exported)
+            (REPO_DIR / query['file']).write_text(render_query_file(query))
+            rows[query['id']] = dict(query, content_sha256=query_hash(query))
+            order.append(query['id'])
+
+    for entry in unprocessed:
+        print(f"⚠️  {entry.get('NamedQueryId')}: not returned by Athena "
+              f"({entry.get('ErrorCode')}: {entry.get('ErrorMessage')})")
+
+    rewritten = 0
+    if not args.dry_run:
+        new_manifest = [rows[query_id] for query_id in order if query_id in rows]
+        for row in new_manifest:
+            if not (REPO_DIR / row['file']).exists():
+                print(f"⚠️  {row['file']} no longer exists locally - dropped from {MANIFEST_FILE.name}")
+        new_manifest = [row for row in new_manifest if (REPO_DIR / row['file']).exists()]
+        save_manifest(new_manifest)
+        rewritten = update_export(new_manifest)
+
+    print(f"\n{'=' * 100}")
+    print("SUMMARY: " + ', '.join(f"{n} {kind}" for kind, n in sorted(counts.items())))
+    print(f"API calls: {sum(calls.values())} ({', '.join(f'{n} {name}' for name, n in sorted(calls.items()))})")
+    if not args.dry_run:
+        print(f"📦 {EXPORT_FILE.name}: {rewritten} section(s) rewritten")
+    print("=" * 100)
+
+    if counts.get('conflict'):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -4,75 +4,113 @@ Test date columns by querying actual data from Athena views.
 
 This validates that date parsing is working correctly by checking if
 date columns return non-NULL values for actual patient data.
+
+Usage:
+    python3 test_date_columns_with_data.py           # patient: test_patient_id (athena_config.py)
+    python3 test_date_columns_with_data.py --patient-id <patient FHIR id>
+    python3 test_date_columns_with_data.py --local   # run against fixtures in DuckDB
+    python3 test_date_columns_with_data.py --cache   # reuse results of unchanged probes
 """
 
-import boto3
-import time
+import argparse
+import sys
+
+from athena_client import create_athena_client
+from athena_config import CONFIG
+from athena_query_runner import AthenaQueryRunner, QueryFailedError, QueryTimeoutError
+from athena_results import iter_query_results
+from cohort_extract import parameter_literal
+from query_metrics import QueryMetricsLog
 
-def test_view_dates(client, view_name, date_columns, test_query):
-    """Test if date columns are populated in actual data"""
+def test_view_dates(runner, view_name, date_columns, test_query, parameters, cache=None):
+    """Test if date columns are populated in actual data; parameters fill the ? placeholders"""
     print(f"\n{'='*80}")
     print(f"Testing: {view_name}")
     print(f"{'='*80}")
     print(f"Query: {test_query}")
 
     try:
-        response = client.start_query_execution(
-            QueryString=test_query,
-            QueryExecutionContext={'Database': 'fhir_prd_db'},
-            ResultConfiguration={'OutputLocation': 's3://aws-athena-query-results-343218191717-us-east-1/'}
-        )
+        if cache is not None:
+            fetched = cache.fetch(runner, test_query, tag=view_name, parameters=parameters)
+        else:
+            execution = runner.run(test_query, tag=view_name, ExecutionParameters=parameters)
+    except QueryFailedError as e:
+        print(f"❌ FAILED: {e.reason}")
+        return False
+    except QueryTimeoutError:
+        print("⏱️  TIMEOUT")
+        return False
+    except Exception as e:
+        print(f"❌ ERROR: {str(e)}")
+        return False
 
-        query_id = response['QueryExecutionId']
+    if cache is not None:
+        print(f"Query ID: {fetched['query_id']}{' (cached)' if fetched['cached'] else ''}")
+        rows = iter(fetched['rows'])
+    else:
+        query_id = execution['QueryExecutionId']
         print(f"Query ID: {query_id}")
+        rows = iter_query_results(runner.client, query_id)
 
-        for i in range(60):
-            status = client.get_query_execution(QueryExecutionId=query_id)
-            state = status['QueryExecution']['Status']['State']
-
-            if state == 'SUCCEEDED':
-                results = client.get_query_results(QueryExecutionId=query_id)
-
-                if len(results['ResultSet']['Rows']) > 1:
-                    headers = [col['Name'] for col in results['ResultSet']['ResultSetMetadata']['ColumnInfo']]
-                    print(f"\n✅ SUCCESS - Got {len(results['ResultSet']['Rows'])-1} rows")
-                    print(f"Headers: {', '.join(headers)}")
-
-                    # Show first row
-                    first_row = results['ResultSet']['Rows'][1]
-                    values = [col.get('VarCharValue', 'NULL') for col in first_row['Data']]
-                    print(f"Sample row: {dict(zip(headers, values))}")
-
-                    # Check for NULL dates
-                    null_count = sum(1 for v in values if v == 'NULL')
-                    if null_count > 0:
-                        print(f"⚠️  WARNING: {null_count}/{len(values)} columns are NULL in sample")
-                    else:
-                        print("✅ All date columns populated!")
-                else:
-                    print("⚠️  No data returned")
+    try:
+        first_row = next(rows, None)
+        row_count = (1 + sum(1 for _ in rows)) if first_row is not None else 0
+    except Exception as e:
+        print(f"❌ ERROR: {str(e)}")
+        return False
 
-                return True
+    if first_row is not None:
+        print(f"\n✅ SUCCESS - Got {row_count} rows")
+        print(f"Headers: {', '.join(first_row)}")
 
-            elif state in ['FAILED', 'CANCELLED']:
-                reason = status['QueryExecution']['Status'].get('StateChangeReason', 'Unknown')
-                print(f"❌ FAILED: {reason}")
-                return False
+        # Show first row
+        print(f"Sample row: {first_row}")
 
-            time.sleep(2)
+        # Check for NULL dates
+        null_count = sum(1 for v in first_row.values() if v is None)
+        if null_count > 0:
+            print(f"⚠️  WARNING: {null_count}/{len(first_row)} columns are NULL in sample")
+        else:
+            print("✅ All date columns populated!")
+    else:
+        print("⚠️  No data returned")
 
-        print("⏱️  TIMEOUT")
-        return False
+    return True
 
-    except Exception as e:
-        print(f"❌ ERROR: {str(e)}")
-        return False
+def parse_args():
+    parser = argparse.ArgumentParser(description='Test date columns in views with actual data')
+    parser.add_argument('--local', action='store_true',
+                        help='Query a local DuckDB built from fixtures/ instead of Athena')
+    parser.add_argument('--patient-id',
+                        help='Patient to probe (default: test_patient_id from the config; '
+                             'with --local the fixture patient)')
+    parser.add_argument('--cache', action='store_true',
+                        help='Serve unchanged probes from the local result cache (see result_cache.py)')
+    return parser.parse_args()
 
 def main():
-    client = boto3.client('athena', region_name='us-east-1')
-
-    # Test patient ID
-    patient_id = 'eQSB0y3q.OmvN40Yhg9.eCBk5-9c-Qp-FT3pBWoSGuL83'
+    args = parse_args()
+
+    if args.local:
+        from local_engine import FIXTURE_PATIENT_ID, FIXTURES_DIR, LOCAL_POLL_INTERVAL, create_local_environment
+        patient_id = args.patient_id or FIXTURE_PATIENT_ID
+        backend = f"local:{FIXTURES_DIR.name}"
+        client = create_local_environment()
+        runner = AthenaQueryRunner(client, initial_interval=LOCAL_POLL_INTERVAL)
+    else:
+        patient_id = args.patient_id or CONFIG['test_patient_id']
+        if not patient_id:
+            print("❌ No test patient: pass --patient-id or set test_patient_id "
+                  "(athena_config.json or $ATHENA_TEST_PATIENT_ID)")
+            sys.exit(1)
+        backend = 'athena'
+        client = create_athena_client()
+        runner = AthenaQueryRunner(client, metrics=QueryMetricsLog())
+
+    cache = None
+    if args.cache:
+        from result_cache import ResultCache
+        cache = ResultCache(backend=backend)
 
     print("="*80)
     print("TESTING DATE COLUMNS WITH ACTUAL DATA")
@@ -81,58 +119,61 @@ def main():
     tests = [
         {
             'view': 'v_procedures_tumor',
-            'query': f"""
+            'query': """
                 SELECT proc_performed_date_time, proc_code_text
                 FROM fhir_prd_db.v_procedures_tumor
-                WHERE patient_fhir_id = '{patient_id}'
+                WHERE patient_fhir_id = ?
                     AND is_tumor_surgery = true
                 LIMIT 3
             """
         },
         {
             'view': 'v_patient_demographics',
-            'query': f"""
+            'query': """
                 SELECT pd_birth_date, pd_gender
                 FROM fhir_prd_db.v_patient_demographics
-                WHERE patient_fhir_id = '{patient_id}'
+                WHERE patient_fhir_id = ?
             """
         },
         {
             'view': 'v2_appointments',
-            'query': f"""
+            'query': """
                 SELECT appointment_date, appointment_status
                 FROM fhir_prd_db.v_appointments
-                WHERE patient_fhir_id = '{patient_id}'
+                WHERE patient_fhir_id = ?
                     AND appointment_date IS NOT NULL
                 LIMIT 5
             """
         },
         {
             'view': 'v2_imaging',
-            'query': f"""
+            'query': """
                 SELECT report_issued, report_effective_period_start, imaging_modality
                 FROM fhir_prd_db.v_imaging
-                WHERE patient_fhir_id = '{patient_id}'
+                WHERE patient_fhir_id = ?
                     AND report_issued IS NOT NULL
                 LIMIT 5
             """
         },
         {
             'view': 'v_medications',
-            'query': f"""
+            'query': """
                 SELECT medication_start_date, medication_stop_date, medication_name
                 FROM fhir_prd_db.v_medications
-                WHERE patient_fhir_id = '{patient_id}'
+                WHERE patient_fhir_id = ?
                     AND medication_start_date IS NOT NULL
                 LIMIT 5
             """
         },
     ]
 
+    parameters = [parameter_literal(patient_id)]
+
     results = []
-    for test in tests:
-        success = test_view_dates(client, test['view'], [], test['query'])
-        results.append({'view': test['view'], 'success': success})
+    with runner:
+        for test in tests:
+            success = test_view_dates(runner, test['view'], [], test['query'], parameters, cache)
+            results.append({'view': test['view'], 'success': success})
 
     print(f"\n\n{'='*80}")
     print("FINAL SUMMARY")
@@ -142,6 +183,8 @@ def main():
     total = len(results)
 
     print(f"\nTests passed: {passed}/{total}")
+    if cache is not None:
+        print(f"📦 Result cache: {cache.hits} hit(s), {cache.misses} miss(es)")
 
     for r in results:
         status = "✅ PASS" if r['success'] else "❌ FAIL"
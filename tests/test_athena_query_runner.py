@@ -0,0 +1,116 @@
+"""
+Tests for athena_query_runner.py against a stubbed Athena client.
+
+Run with: python3 -m pytest tests
+"""
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from botocore.stub import ANY, Stubber
+
+from athena_query_runner import AthenaQueryRunner, QueryFailedError, QueryTimeoutError
+
+REGION = 'us-east-1'
+
+@pytest.fixture
+def athena():
+    client = boto3.client('athena', region_name=REGION, aws_access_key_id='test', aws_secret_access_key='test')
+    with Stubber(client) as stubber:
+        yield client, stubber
+        stubber.assert_no_pending_responses()
+
+def expect_start(stubber, query_id, sql='SELECT 1'):
+    stubber.add_response('start_query_execution', {'QueryExecutionId': query_id},
+                         {'QueryString': sql, 'QueryExecutionContext': ANY, 'ResultConfiguration': ANY,
+                          'WorkGroup': ANY})
+
+def expect_poll(stubber, states):
+    """One batch_get_query_execution call; states maps query id -> state or (state, reason)"""
+    executions = []
+    for query_id, state in states.items():
+        state, reason = state if isinstance(state, tuple) else (state, None)
+        status = {'State': state}
+        if reason:
+            status['StateChangeReason'] = reason
+        executions.append({'QueryExecutionId': query_id, 'Status': status})
+    stubber.add_response('batch_get_query_execution', {'QueryExecutions': executions},
+                         {'QueryExecutionIds': list(states)})
+
+def test_polls_all_in_flight_queries_in_one_batch(athena):
+    client, stubber = athena
+    for query_id in ('q1', 'q2', 'q3'):
+        expect_start(stubber, query_id)
+    expect_poll(stubber, {'q1': 'SUCCEEDED', 'q2': 'RUNNING', 'q3': 'QUEUED'})
+    expect_poll(stubber, {'q2': 'SUCCEEDED', 'q3': 'SUCCEEDED'})
+
+    # A long first interval lets all three submissions land before the first poll
+    with AthenaQueryRunner(client, initial_interval=0.2, backoff=1.0) as runner:
+        futures = [runner.submit('SELECT 1') for _ in range(3)]
+        results = [future.result(timeout=5) for future in futures]
+
+    assert [future.query_id for future in futures] == ['q1', 'q2', 'q3']
+    assert [result['Status']['State'] for result in results] == ['SUCCEEDED'] * 3
+
+def test_failed_and_cancelled_queries_raise(athena):
+    client, stubber = athena
+    expect_start(stubber, 'failed')
+    expect_start(stubber, 'cancelled')
+    expect_poll(stubber, {'failed': ('FAILED', 'SYNTAX_ERROR: line 1:8'), 'cancelled': 'CANCELLED'})
+
+    with AthenaQueryRunner(client, initial_interval=0.2) as runner:
+        failed = runner.submit('SELECT 1')
+        cancelled = runner.submit('SELECT 1')
+
+        with pytest.raises(QueryFailedError) as failure:
+            failed.result(timeout=5)
+        with pytest.raises(QueryFailedError) as cancellation:
+            cancelled.result(timeout=5)
+
+    assert (failure.value.query_id, failure.value.state) == ('failed', 'FAILED')
+    assert failure.value.reason == 'SYNTAX_ERROR: line 1:8'
+    assert (cancellation.value.state, cancellation.value.reason) == ('CANCELLED', 'Unknown')
+
+def test_query_past_its_deadline_times_out(athena):
+    client, stubber = athena
+    expect_start(stubber, 'slow')
+    expect_poll(stubber, {'slow': 'RUNNING'})
+
+    with AthenaQueryRunner(client, timeout=0, initial_interval=0.01) as runner:
+        future = runner.submit('SELECT 1')
+        with pytest.raises(QueryTimeoutError) as timeout:
+            future.result(timeout=5)
+
+    assert timeout.value.query_id == 'slow'
+
+def test_transient_poll_error_is_retried(athena):
+    client, stubber = athena
+    expect_start(stubber, 'q1')
+    stubber.add_client_error('batch_get_query_execution', 'ThrottlingException')
+    expect_poll(stubber, {'q1': 'SUCCEEDED'})
+
+    with AthenaQueryRunner(client, initial_interval=0.01) as runner:
+        assert runner.run('SELECT 1')['QueryExecutionId'] == 'q1'
+
+def test_failed_submission_is_reported_through_the_future(athena):
+    client, stubber = athena
+    stubber.add_client_error('start_query_execution', 'InvalidRequestException')
+
+    with AthenaQueryRunner(client) as runner:
+        future = runner.submit('SELECT 1')
+
+    assert future.query_id is None
+    with pytest.raises(ClientError):
+        future.result(timeout=5)
+
+def test_exit_fails_queries_still_in_flight(athena):
+    client, stubber = athena
+    expect_start(stubber, 'q1')
+
+    # The first poll is not due before the runner closes
+    with AthenaQueryRunner(client, initial_interval=60) as runner:
+        future = runner.submit('SELECT 1')
+
+    with pytest.raises(RuntimeError, match='closed while q1 was in flight'):
+        future.result(timeout=5)
+    assert not runner._poller.is_alive()
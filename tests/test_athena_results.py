@@ -0,0 +1,95 @@
+"""
+Tests for athena_results.py against a stubbed Athena client and moto S3.
+
+Run with: python3 -m pytest tests
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from athena_results import convert_value, iter_query_results, iter_s3_results
+
+moto = pytest.importorskip('moto')
+
+REGION = 'us-east-1'
+QUERY_ID = 'test-query'
+BUCKET = 'athena-results'
+
+COLUMNS = [
+    {'Name': 'patient_fhir_id', 'Type': 'varchar'},
+    {'Name': 'dose', 'Type': 'decimal'},
+    {'Name': 'fractions', 'Type': 'bigint'},
+    {'Name': 'start_date', 'Type': 'date'},
+]
+
+def result_page(rows, next_token=None):
+    """A get_query_results response holding rows of string-or-None values"""
+    response = {
+        'ResultSet': {
+            'Rows': [{'Data': [{} if value is None else {'VarCharValue': value} for value in row]} for row in rows],
+            'ResultSetMetadata': {'ColumnInfo': COLUMNS},
+        },
+    }
+    if next_token:
+        response['NextToken'] = next_token
+    return response
+
+@pytest.fixture
+def athena():
+    client = boto3.client('athena', region_name=REGION, aws_access_key_id='test', aws_secret_access_key='test')
+    with Stubber(client) as stubber:
+        yield client, stubber
+        stubber.assert_no_pending_responses()
+
+def test_convert_value_types():
+    assert convert_value('42', 'bigint') == 42
+    assert convert_value('1.50', 'decimal') == Decimal('1.50')
+    assert convert_value('true', 'boolean') is True
+    assert convert_value('2024-03-01', 'date') == date(2024, 3, 1)
+    assert convert_value('2024-03-01 10:15:00.000', 'timestamp') == datetime(2024, 3, 1, 10, 15)
+    assert convert_value(None, 'bigint') is None
+    assert convert_value('x', 'varchar') == 'x'
+
+def test_convert_value_keeps_unparseable_values():
+    assert convert_value('bad', 'decimal') == 'bad'
+    assert convert_value('n/a', 'bigint') == 'n/a'
+    assert convert_value('2024-13-45', 'date') == '2024-13-45'
+
+def test_iter_query_results_follows_next_token(athena):
+    client, stubber = athena
+    header = [column['Name'] for column in COLUMNS]
+    stubber.add_response('get_query_results', result_page([header, ['p1', '1.8', '30', '2024-03-01']], 'page-2'),
+                         {'QueryExecutionId': QUERY_ID, 'MaxResults': 1000})
+    stubber.add_response('get_query_results', result_page([['p2', 'bad', None, None]]),
+                         {'QueryExecutionId': QUERY_ID, 'MaxResults': 1000, 'NextToken': 'page-2'})
+
+    rows = list(iter_query_results(client, QUERY_ID))
+
+    assert rows == [
+        {'patient_fhir_id': 'p1', 'dose': Decimal('1.8'), 'fractions': 30, 'start_date': date(2024, 3, 1)},
+        {'patient_fhir_id': 'p2', 'dose': 'bad', 'fractions': None, 'start_date': None},
+    ]
+
+def test_iter_s3_results_streams_csv_in_chunks(athena):
+    client, stubber = athena
+    stubber.add_response('get_query_results', result_page([]), {'QueryExecutionId': QUERY_ID, 'MaxResults': 1})
+    body = ('"patient_fhir_id","dose","fractions","start_date"\n'
+            '"pätient-1","1.8","30","2024-03-01"\n'
+            '"multi\nline","","",\n')
+
+    with moto.mock_aws():
+        s3 = boto3.client('s3', region_name=REGION)
+        s3.create_bucket(Bucket=BUCKET)
+        s3.put_object(Bucket=BUCKET, Key=f'results/{QUERY_ID}.csv', Body=body.encode('utf-8'))
+
+        # A 5-byte chunk splits lines, quoted fields and the two-byte 'ä'
+        rows = list(iter_s3_results(client, s3, QUERY_ID, f's3://{BUCKET}/results/{QUERY_ID}.csv', chunk_size=5))
+
+    assert rows == [
+        {'patient_fhir_id': 'pätient-1', 'dose': Decimal('1.8'), 'fractions': 30, 'start_date': date(2024, 3, 1)},
+        {'patient_fhir_id': 'multi\nline', 'dose': None, 'fractions': None, 'start_date': None},
+    ]
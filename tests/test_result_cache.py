@@ -0,0 +1,80 @@
+"""
+Tests for result_cache.py against a stubbed Athena client.
+
+Run with: python3 -m pytest tests
+"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import boto3
+import pytest
+from botocore.stub import ANY, Stubber
+
+from athena_query_runner import AthenaQueryRunner
+
+pytest.importorskip('pyarrow')
+
+from result_cache import ResultCache  # noqa: E402
+
+REGION = 'us-east-1'
+QUERY_ID = 'cache-query'
+
+COLUMNS = [
+    {'Name': 'patient_fhir_id', 'Type': 'varchar'},
+    {'Name': 'dose', 'Type': 'decimal'},
+    {'Name': 'given_at', 'Type': 'timestamp'},
+]
+
+# dose and given_at mix values that parse with ones convert_value keeps as strings
+RAW_ROWS = [
+    ['p1', '1.8', '2024-03-01 10:15:00.000'],
+    ['p2', 'n/a', '2024-03-01T10:15:00+02:00 (local)'],
+    ['p3', None, None],
+]
+EXPECTED_ROWS = [
+    {'patient_fhir_id': 'p1', 'dose': Decimal('1.8'), 'given_at': datetime(2024, 3, 1, 10, 15)},
+    {'patient_fhir_id': 'p2', 'dose': 'n/a', 'given_at': '2024-03-01T10:15:00+02:00 (local)'},
+    {'patient_fhir_id': 'p3', 'dose': None, 'given_at': None},
+]
+
+def result_page(rows):
+    return {
+        'ResultSet': {
+            'Rows': [{'Data': [{} if value is None else {'VarCharValue': value} for value in row]} for row in rows],
+            'ResultSetMetadata': {'ColumnInfo': COLUMNS},
+        },
+    }
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(tmp_path / 'cache', reuse_minutes=None)
+
+def test_put_and_get_mixed_type_columns(cache):
+    cache.put('key', EXPECTED_ROWS, COLUMNS, 'SELECT 1', 'fhir_prd_db')
+
+    assert cache.get('key') == EXPECTED_ROWS
+
+def test_fetch_caches_mixed_type_result(cache):
+    client = boto3.client('athena', region_name=REGION, aws_access_key_id='test', aws_secret_access_key='test')
+    header = [column['Name'] for column in COLUMNS]
+    sql = 'SELECT patient_fhir_id, dose, given_at FROM fhir_prd_db.v_medications'
+
+    with Stubber(client) as stubber:
+        stubber.add_response('start_query_execution', {'QueryExecutionId': QUERY_ID},
+                             {'QueryString': sql, 'QueryExecutionContext': ANY, 'ResultConfiguration': ANY,
+                              'WorkGroup': ANY})
+        stubber.add_response('batch_get_query_execution', {'QueryExecutions': [
+            {'QueryExecutionId': QUERY_ID, 'Status': {'State': 'SUCCEEDED'}}]}, {'QueryExecutionIds': [QUERY_ID]})
+        stubber.add_response('get_query_results', result_page([header] + RAW_ROWS),
+                             {'QueryExecutionId': QUERY_ID, 'MaxResults': 1000})
+        stubber.add_response('get_query_results', result_page([header]),
+                             {'QueryExecutionId': QUERY_ID, 'MaxResults': 1})
+
+        with AthenaQueryRunner(client, initial_interval=0.01) as runner:
+            first = cache.fetch(runner, sql)
+            second = cache.fetch(runner, sql)
+        stubber.assert_no_pending_responses()
+
+    assert first == {'rows': EXPECTED_ROWS, 'query_id': QUERY_ID, 'cached': False}
+    assert second == {'rows': EXPECTED_ROWS, 'query_id': QUERY_ID, 'cached': True}
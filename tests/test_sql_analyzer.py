@@ -0,0 +1,49 @@
+"""
+Tests for the sql_analyzer.py analysis cache.
+
+Run with: python3 -m pytest tests
+"""
+
+import json
+
+import sql_analyzer
+from sql_analyzer import analyze_files
+
+VIEW_SQL = "CREATE OR REPLACE VIEW fhir_prd_db.{name} AS\nSELECT e.period_start AS encounter_start FROM fhir_prd_db.encounter e"
+
+def write_view(directory, name):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f'{name}.sql'
+    path.write_text(VIEW_SQL.format(name=name))
+    return path
+
+def cache_entries(cache_file):
+    return json.loads(cache_file.read_text())['entries']
+
+def test_same_named_files_get_separate_entries(tmp_path):
+    cache_file = tmp_path / 'cache.json'
+    current = write_view(tmp_path / 'views', 'v_encounters')
+    deprecated = tmp_path / 'views' / 'deprecated' / 'v_encounters.sql'
+    deprecated.parent.mkdir()
+    deprecated.write_text(VIEW_SQL.format(name='v_encounters_old'))
+
+    analyze_files([current, deprecated], cache_file)
+    entries = cache_entries(cache_file)
+
+    assert sorted(entries) == sorted([current.resolve().as_posix(), deprecated.resolve().as_posix()])
+    assert analyze_files([deprecated], cache_file)['v_encounters.sql']['view'] == 'fhir_prd_db.v_encounters_old'
+    assert entries[sql_analyzer._cache_key(current)]['analysis']['column_sources'] == {
+        'encounter_start': 'period_start'}
+
+def test_edited_file_replaces_its_entry_and_deleted_file_is_pruned(tmp_path):
+    cache_file = tmp_path / 'cache.json'
+    kept = write_view(tmp_path, 'v_encounters')
+    deleted = write_view(tmp_path, 'v_imaging')
+    analyze_files([kept, deleted], cache_file)
+
+    deleted.unlink()
+    kept.write_text(VIEW_SQL.format(name='v_encounters_v2'))
+    analysis = analyze_files([kept], cache_file)['v_encounters.sql']
+
+    assert analysis['view'] == 'fhir_prd_db.v_encounters_v2'
+    assert list(cache_entries(cache_file)) == [sql_analyzer._cache_key(kept)]
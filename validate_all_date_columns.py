@@ -3,172 +3,121 @@
 Comprehensive Date Column Validation Script
 
 This script validates ALL date parsing across all deployed Athena views by:
-1. Scanning all deployed view SQL files for date_parse and CAST...TIMESTAMP calls
+1. Parsing all deployed view SQL files (sql_analyzer) for date_parse,
+   from_iso8601_*, CAST...TIMESTAMP and DATE() expressions
 2. Testing each view with sample data to verify date columns are populated
 3. Identifying views with NULL date issues
 4. Providing recommendations for fixes
 
+Each view's data probe is one aggregate query over all of its rows: NULL
+count, min and max for every date column, from profile_date_nulls.py. The
+probes for all views are submitted together (bounded by --max-concurrency)
+and reported as they finish. A full run therefore takes about as long as the
+slowest view, not the sum of all of them.
+
+Probe results and the static classification of every date column are recorded
+in the validation history (validation_store.py). --incremental only probes
+views whose SQL or upstream SQL changed since their last successful probe.
+
 Usage:
     export AWS_PROFILE=radiant-prod
     python3 validate_all_date_columns.py
+    python3 validate_all_date_columns.py --static-only   # skip Athena probes
+    python3 validate_all_date_columns.py --local         # probe a local DuckDB (local_engine)
+    python3 validate_all_date_columns.py --cache         # reuse probe results of unchanged views
+    python3 validate_all_date_columns.py --sample 5      # probe a 5% Bernoulli sample per view
+    python3 validate_all_date_columns.py --incremental   # only probe views whose SQL changed
 """
 
-import boto3
-import time
-import re
+import argparse
+import sys
+from itertools import chain
 from pathlib import Path
 from typing import Dict, List, Tuple
 
-# Deployment list from deploy_views.py
-DEPLOYED_VIEWS = [
-    'v_oid_reference.sql',
-    'v_patient_demographics.sql',
-    'v_encounters.sql',
-    'v_diagnoses.sql',
-    'v_problem_list_diagnoses.sql',
-    'v_binary_files.sql',
-    'v2_procedure_specimen_link.sql',
-    'v2_procedures_tumor.sql',
-    'v2_document_reference_enriched.sql',
-    'v2_imaging.sql',
-    'v_medications.sql',
-    'v_chemo_medications.sql',
-    'v_chemo_treatment_episodes.sql',
-    'v_radiation_documents.sql',
-    'v_radiation_care_plan_hierarchy.sql',
-    'v2_radiation_treatment_episodes.sql',
-    'v2_radiation_episode_enrichment.sql',
-    'v_molecular_tests.sql',
-    'v_pathology_diagnostics.sql',
-    'v2_appointments.sql',
-    'v_visits_unified.sql',
-]
-
-def extract_view_name(sql_file: Path) -> str:
-    """Extract the actual view name from CREATE OR REPLACE VIEW statement"""
-    with open(sql_file, 'r') as f:
-        first_line = f.readline()
-        match = re.search(r'CREATE OR REPLACE VIEW\s+([^\s]+)\s+AS', first_line, re.IGNORECASE)
-        if match:
-            return match.group(1)
-    return None
-
-def find_date_columns(sql_file: Path) -> List[Tuple[int, str, str]]:
-    """Find all date parsing operations in SQL file"""
-    date_ops = []
-
-    with open(sql_file, 'r') as f:
-        for line_num, line in enumerate(f, 1):
-            # Find date_parse calls
-            if 'date_parse' in line.lower():
-                # Extract the column alias
-                alias_match = re.search(r'as\s+(\w+)', line, re.IGNORECASE)
-                alias = alias_match.group(1) if alias_match else 'unknown'
-
-                # Check if using COALESCE for multiple formats
-                if 'COALESCE' in line:
-                    date_ops.append((line_num, alias, 'date_parse with COALESCE (GOOD)'))
-                elif "'%Y-%m-%d'" in line and "'%Y-%m-%dT%H:%i:%sZ'" not in line:
-                    date_ops.append((line_num, alias, 'date_parse single format %Y-%m-%d (RISKY)'))
-                elif "'%Y-%m-%dT%H:%i:%sZ'" in line and "'%Y-%m-%d'" not in line:
-                    date_ops.append((line_num, alias, 'date_parse single format ISO8601 (RISKY)'))
-                else:
-                    date_ops.append((line_num, alias, 'date_parse (check manually)'))
-
-            # Find CAST...AS TIMESTAMP calls
-            if re.search(r'CAST.*AS\s+TIMESTAMP', line, re.IGNORECASE):
-                alias_match = re.search(r'as\s+(\w+)', line, re.IGNORECASE)
-                alias = alias_match.group(1) if alias_match else 'unknown'
-                date_ops.append((line_num, alias, 'CAST AS TIMESTAMP'))
-
-    return date_ops
-
-def test_view_dates(client, view_name: str, date_columns: List[str], limit: int = 10) -> Dict:
-    """Test a view to see if date columns are populated"""
-    if not date_columns:
-        return {'status': 'no_date_columns', 'message': 'No date columns found'}
-
-    # Build SELECT for just the date columns
-    select_cols = ', '.join(date_columns[:10])  # Limit to first 10 date columns
-
-    query = f"""
-    SELECT {select_cols}
-    FROM {view_name}
-    WHERE {date_columns[0]} IS NOT NULL
-    LIMIT {limit}
-    """
-
-    try:
-        response = client.start_query_execution(
-            QueryString=query,
-            QueryExecutionContext={'Database': 'fhir_prd_db'},
-            ResultConfiguration={'OutputLocation': 's3://aws-athena-query-results-343218191717-us-east-1/'}
-        )
-
-        query_id = response['QueryExecutionId']
-
-        # Wait for query to complete
-        for _ in range(60):
-            status = client.get_query_execution(QueryExecutionId=query_id)
-            state = status['QueryExecution']['Status']['State']
-
-            if state == 'SUCCEEDED':
-                results = client.get_query_results(QueryExecutionId=query_id)
-
-                # Count non-NULL values
-                null_counts = {col: 0 for col in date_columns[:10]}
-                total_rows = len(results['ResultSet']['Rows']) - 1  # Exclude header
-
-                if total_rows > 0:
-                    for row in results['ResultSet']['Rows'][1:]:
-                        for idx, data in enumerate(row['Data']):
-                            col_name = date_columns[idx] if idx < len(date_columns) else f'col_{idx}'
-                            if not data.get('VarCharValue'):
-                                null_counts[col_name] = null_counts.get(col_name, 0) + 1
-
-                    return {
-                        'status': 'success',
-                        'total_rows': total_rows,
-                        'null_counts': null_counts,
-                        'query_id': query_id
-                    }
-                else:
-                    return {'status': 'no_data', 'message': 'No rows returned'}
-
-            elif state in ['FAILED', 'CANCELLED']:
-                reason = status['QueryExecution']['Status'].get('StateChangeReason', 'Unknown')
-                return {'status': 'failed', 'message': reason}
-
-            time.sleep(2)
-
-        return {'status': 'timeout', 'message': 'Query timed out'}
-
-    except Exception as e:
-        return {'status': 'error', 'message': str(e)}
+from athena_client import create_athena_client
+from athena_query_runner import AthenaQueryRunner
+from deploy_views import VIEWS_DIR, discover_views
+from profile_date_nulls import profile_views, view_date_columns
+from query_metrics import QueryMetricsLog
+from sql_analyzer import analyze_files
+
+DEFAULT_PROBE_CONCURRENCY = 8
+
+def classify_date_expression(expr: Dict) -> str:
+    """Describe how robust a date expression is to the date formats in the source data"""
+    functions = set(expr['functions'])
+    formats = expr['formats']
+
+    if functions & {'date_parse', 'parse_datetime'}:
+        has_iso = any('T' in fmt for fmt in formats if fmt and fmt.startswith('%'))
+        has_date_only = '%Y-%m-%d' in formats
+        if has_iso and has_date_only:
+            return 'date_parse ISO8601 + %Y-%m-%d (GOOD)'
+        elif has_date_only:
+            return 'date_parse single format %Y-%m-%d (RISKY)'
+        elif has_iso:
+            return 'date_parse single format ISO8601 (RISKY)'
+        return 'date_parse (check manually)'
+
+    if any(f.startswith('from_iso8601') for f in functions):
+        return 'from_iso8601 (GOOD)'
+
+    for fmt in formats:
+        if fmt.startswith('CAST AS'):
+            return fmt
+
+    return 'DATE()'
+
+def find_date_columns(analysis: Dict) -> List[Tuple[int, str, str]]:
+    """List (line, alias, classification) for every date expression sql_analyzer found"""
+    return [
+        (expr['line'], expr['alias'] or '(expression)', classify_date_expression(expr))
+        for expr in analysis['date_expressions']
+    ]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Validate date parsing in deployed Athena views')
+    parser.add_argument('--max-concurrency', type=int, default=DEFAULT_PROBE_CONCURRENCY,
+                        help=f'Maximum data probes in flight (default: {DEFAULT_PROBE_CONCURRENCY})')
+    parser.add_argument('--static-only', action='store_true',
+                        help='Only scan the SQL files; do not probe view data in Athena')
+    parser.add_argument('--local', action='store_true',
+                        help='Probe views in a local DuckDB built from fixtures/ instead of Athena')
+    parser.add_argument('--fixtures', type=Path,
+                        help='Fixture directory for --local, e.g. generate_synthetic_fhir.py output')
+    parser.add_argument('--cache', action='store_true',
+                        help='Serve unchanged probes from the local result cache (see result_cache.py)')
+    parser.add_argument('--sample', type=float, metavar='PERCENT',
+                        help='Probe a TABLESAMPLE BERNOULLI sample of PERCENT%% of each view')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only probe views whose SQL or upstream SQL changed since their last probe')
+    parser.add_argument('--no-history', action='store_true',
+                        help='Do not record the probes in the validation history (validation_store.py)')
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    if args.incremental and (args.no_history or args.static_only):
+        print("❌ --incremental needs data probes and the validation history")
+        sys.exit(2)
+
     print("=" * 100)
     print("COMPREHENSIVE DATE COLUMN VALIDATION FOR DEPLOYED ATHENA VIEWS")
     print("=" * 100)
 
-    views_dir = Path('views')
-    client = boto3.client('athena', region_name='us-east-1')
+    deployed_views = sorted(discover_views(VIEWS_DIR).values())
+    analyses = analyze_files(deployed_views)
 
     all_results = []
 
-    for view_file_name in DEPLOYED_VIEWS:
-        view_file = views_dir / view_file_name
-
-        if not view_file.exists():
-            print(f"\n⚠️  MISSING: {view_file_name}")
-            continue
-
+    for view_file_name, analysis in analyses.items():
         print(f"\n{'='*100}")
         print(f"VIEW: {view_file_name}")
         print(f"{'='*100}")
 
         # Extract actual view name
-        view_name = extract_view_name(view_file)
+        view_name = analysis['view']
         if not view_name:
             print(f"❌ Could not extract view name from {view_file_name}")
             continue
@@ -176,7 +125,7 @@ def main():
         print(f"Athena view name: {view_name}")
 
         # Find date columns
-        date_ops = find_date_columns(view_file)
+        date_ops = find_date_columns(analysis)
 
         if not date_ops:
             print("✅ No date parsing operations found")
@@ -193,11 +142,9 @@ def main():
         print("-" * 100)
 
         issues = []
-        date_columns = []
 
         for line_num, alias, op_type in date_ops:
             print(f"{line_num:<6} {alias:<40} {op_type:<50}")
-            date_columns.append(alias)
 
             if 'RISKY' in op_type:
                 issues.append(f"Line {line_num}: {alias} uses {op_type}")
@@ -213,9 +160,81 @@ def main():
             'view': view_name,
             'status': 'has_dates',
             'date_ops': date_ops,
+            # Only columns the view actually outputs can be probed
+            'date_columns': view_date_columns(analysis),
             'issues': issues
         })
 
+    # Data probes
+    if not args.static_only:
+        print(f"\n\n{'='*100}")
+        print(f"DATA PROBES (max {args.max_concurrency} concurrent)")
+        print(f"{'='*100}")
+
+        if args.local:
+            from local_engine import FIXTURES_DIR, LOCAL_POLL_INTERVAL, create_local_environment
+            fixtures_dir = args.fixtures or FIXTURES_DIR
+            backend = f"local:{fixtures_dir.resolve().name}"
+            client = create_local_environment(fixtures_dir)
+            runner = AthenaQueryRunner(client, initial_interval=LOCAL_POLL_INTERVAL)
+        else:
+            backend = 'athena'
+            client = create_athena_client()
+            runner = AthenaQueryRunner(client, metrics=QueryMetricsLog())
+
+        cache = None
+        if args.cache:
+            from result_cache import ResultCache
+            cache = ResultCache(backend=backend)
+
+        by_view = {result['view'].split('.')[-1]: result for result in all_results
+                   if result['status'] == 'has_dates'}
+        date_columns = {view: result['date_columns'] for view, result in by_view.items()}
+
+        store = run_id = None
+        unchanged = {}
+        if not args.no_history:
+            from validation_store import ValidationStore, closure_hashes, split_unchanged
+            hashes = closure_hashes()
+            store = ValidationStore()
+            if args.incremental:
+                date_columns, unchanged = split_unchanged(store, date_columns, hashes, backend, args.sample)
+                print(f"⏭️  {len(unchanged)} view(s) unchanged since their last probe, {len(date_columns)} to probe")
+            run_id = store.start_run('validate_all_date_columns', backend, args.sample)
+
+        reused = ((view, latest['profile']) for view, latest in sorted(unchanged.items()))
+        with runner:
+            for view, probe in chain(reused, profile_views(runner, date_columns, args.sample,
+                                                           args.max_concurrency, cache)):
+                result = by_view[view]
+                result['probe'] = probe
+                if store is not None:
+                    store.record_view(run_id, view, hashes[view], probe,
+                                      classifications={alias: op_type for _, alias, op_type in result['date_ops']},
+                                      reused_from=unchanged[view]['run_id'] if view in unchanged else None)
+                since = f" (unchanged since run {unchanged[view]['run_id']})" if view in unchanged else ''
+
+                if probe['status'] == 'success':
+                    nulls = {col: f"{stats['null_rate']:.0%}" for col, stats in probe['columns'].items()
+                             if stats['nulls']}
+                    if nulls:
+                        print(f"⚠️  {result['view']}: {probe['rows']} rows, NULL rates {nulls}{since}")
+                    else:
+                        print(f"✅ {result['view']}: {probe['rows']} rows, all date columns populated{since}")
+                elif probe['status'] == 'no_data':
+                    print(f"⚠️  {result['view']}: {probe['message']}{since}")
+                elif probe['status'] == 'no_date_columns':
+                    print(f"⏭️  {result['view']}: no date column aliases resolved, not probed")
+                else:
+                    print(f"❌ {result['view']}: {probe['status'].upper()} - {probe['message']}{since}")
+
+        if cache is not None:
+            print(f"\n📦 Result cache: {cache.hits} hit(s), {cache.misses} miss(es)")
+        if store is not None:
+            store.finish_run(run_id)
+            store.close()
+            print(f"📝 Recorded as run {run_id} in {store.path.name}")
+
     # Summary
     print(f"\n\n{'='*100}")
     print("SUMMARY")
@@ -228,6 +247,14 @@ def main():
     print(f"Views with date operations: {len(views_with_dates)}")
     print(f"Views with potential issues: {len(views_with_issues)}")
 
+    probed = [r for r in all_results if 'probe' in r]
+    if probed:
+        probe_failures = [r for r in probed if r['probe']['status'] not in ('success', 'no_data', 'no_date_columns')]
+        print(f"Views probed: {len(probed)}")
+        print(f"Probe failures: {len(probe_failures)}")
+        for result in probe_failures:
+            print(f"   - {result['view']}: {result['probe']['message']}")
+
     if views_with_issues:
         print(f"\n⚠️  VIEWS REQUIRING FIXES:")
         for result in views_with_issues:
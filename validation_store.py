@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Indexed history of date validation and NULL-profile runs.
+
+validate_all_date_columns.py and profile_date_nulls.py used to leave plain
+text behind (date_validation_report.txt, date_validation_results_final.txt)
+that could not be queried, and every run re-probed every view. Both now
+record each run in a local SQLite database, .validation_history.sqlite:
+
+    runs            one row per run: tool, backend, sample %, git revision, times
+    view_results    one row per view per run: closure hash, status, row count
+    column_results  one row per date column per view per run: NULL count and
+                    rate, min, max, and the static classification of its parse
+
+A view's closure hash covers the SELECT body of the view and of every view
+upstream of it (deploy_views.view_body_hash), so it changes whenever anything
+the view reads through changes. With --incremental the tools only probe views
+whose closure hash has no successful result yet for the same backend and
+sample setting. Every other view carries its last result into the new run,
+marked with the run it came from (reused_from), so trends stay continuous.
+Source data loads do not change any hash; run without --incremental after a
+load.
+
+Usage:
+    python3 profile_date_nulls.py --incremental
+    python3 validate_all_date_columns.py --incremental
+    python3 validation_store.py runs                              # recent runs
+    python3 validation_store.py trend v_medications mr_authored_on --runs 20
+    python3 validation_store.py query "SELECT view, avg(null_rate) FROM column_results GROUP BY view"
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from deploy_views import VIEWS_DIR, build_dependency_graph, discover_views, upstream_views, view_body_hash
+from query_metrics import git_revision
+
+STORE_FILE = Path(__file__).parent / '.validation_history.sqlite'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    tool TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    sample_percent REAL,
+    git_revision TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS view_results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    view TEXT NOT NULL,
+    closure_hash TEXT NOT NULL,
+    status TEXT NOT NULL,
+    row_count INTEGER,
+    message TEXT,
+    query_id TEXT,
+    reused_from INTEGER,
+    PRIMARY KEY (run_id, view)
+);
+CREATE TABLE IF NOT EXISTS column_results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    view TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    nulls INTEGER,
+    null_rate REAL,
+    min_value TEXT,
+    max_value TEXT,
+    classification TEXT,
+    PRIMARY KEY (run_id, view, column_name)
+);
+CREATE INDEX IF NOT EXISTS view_results_by_hash ON view_results (view, closure_hash, status);
+CREATE INDEX IF NOT EXISTS column_results_by_column ON column_results (view, column_name, run_id);
+"""
+
+def closure_hashes(views_dir: Path = VIEWS_DIR) -> Dict[str, str]:
+    """view -> hash of its SELECT body and the bodies of every view upstream of it"""
+    view_files = discover_views(views_dir, None)
+    graph = build_dependency_graph(view_files)
+    body_hashes = {name: view_body_hash(path.read_text()) for name, path in view_files.items()}
+    return {
+        name: hashlib.sha256(''.join(
+            f'{view}:{body_hashes[view]};' for view in sorted({name} | upstream_views(graph, name))
+        ).encode('utf-8')).hexdigest()
+        for name in view_files
+    }
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+class ValidationStore:
+    """SQLite history of validation runs; use from one thread"""
+
+    def __init__(self, path: Path = STORE_FILE):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def start_run(self, tool: str, backend: str, sample_percent: Optional[float] = None) -> int:
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (tool, backend, sample_percent, git_revision, started_at) VALUES (?, ?, ?, ?, ?)",
+                (tool, backend, sample_percent, git_revision(), _now())
+            )
+        return cursor.lastrowid
+
+    def finish_run(self, run_id: int):
+        with self.conn:
+            self.conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (_now(), run_id))
+
+    def record_view(self, run_id: int, view: str, closure_hash: str, profile: Dict,
+                    classifications: Optional[Dict[str, str]] = None, reused_from: Optional[int] = None):
+        """
+        Store one view's profile (profile_date_nulls.profile_view result).
+
+        classifications maps date columns to validate_all_date_columns'
+        static classification of their parse expression.
+        """
+        classifications = classifications or {}
+        columns = profile.get('columns') or {column: {} for column in classifications}
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO view_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, view, closure_hash, profile['status'], profile.get('rows'), profile.get('message'),
+                 profile.get('query_id'), reused_from)
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO column_results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, view, column, stats.get('nulls'), stats.get('null_rate'),
+                  None if stats.get('min') is None else str(stats['min']),
+                  None if stats.get('max') is None else str(stats['max']),
+                  classifications.get(column))
+                 for column, stats in columns.items()]
+            )
+
+    def latest_result(self, view: str, closure_hash: str, backend: str,
+                      sample_percent: Optional[float] = None) -> Optional[Dict]:
+        """
+        The newest successful profile of view at closure_hash, as
+        {'run_id', 'profile'}, or None. Reused results point at the run that
+        measured them.
+        """
+        row = self.conn.execute(
+            """
+            SELECT v.run_id, v.status, v.row_count, v.message, v.query_id, v.reused_from
+            FROM view_results v JOIN runs r ON r.run_id = v.run_id
+            WHERE v.view = ? AND v.closure_hash = ? AND r.backend = ? AND r.sample_percent IS ?
+              AND v.status IN ('success', 'no_data')
+            ORDER BY v.run_id DESC LIMIT 1
+            """,
+            (view, closure_hash, backend, sample_percent)
+        ).fetchone()
+        if row is None:
+            return None
+
+        measured_in = row['reused_from'] or row['run_id']
+        columns = self.conn.execute(
+            "SELECT * FROM column_results WHERE run_id = ? AND view = ? ORDER BY rowid",
+            (row['run_id'], view)
+        ).fetchall()
+        profile = {'status': row['status'], 'rows': row['row_count'], 'message': row['message'],
+                   'query_id': row['query_id']}
+        if row['status'] == 'success':
+            profile['columns'] = {
+                c['column_name']: {'nulls': c['nulls'], 'null_rate': c['null_rate'],
+                                   'min': c['min_value'], 'max': c['max_value']}
+                for c in columns
+            }
+        return {'run_id': measured_in, 'profile': profile}
+
+    def runs(self, limit: int = 20) -> List[sqlite3.Row]:
+        return self.conn.execute(
+            """
+            SELECT r.*, count(v.view) AS views, sum(v.reused_from IS NOT NULL) AS reused,
+                   sum(v.status NOT IN ('success', 'no_data', 'no_date_columns')) AS failed
+            FROM runs r LEFT JOIN view_results v ON v.run_id = r.run_id
+            GROUP BY r.run_id ORDER BY r.run_id DESC LIMIT ?
+            """,
+            (limit,)
+        ).fetchall()
+
+    def trend(self, view: str, column: str, runs: int = 20, backend: Optional[str] = None) -> List[sqlite3.Row]:
+        """NULL rate, min and max of one column over its last runs, oldest first"""
+        rows = self.conn.execute(
+            """
+            SELECT r.run_id, r.started_at, r.backend, r.sample_percent, r.git_revision, v.row_count,
+                   v.reused_from, c.nulls, c.null_rate, c.min_value, c.max_value
+            FROM column_results c
+            JOIN view_results v ON v.run_id = c.run_id AND v.view = c.view
+            JOIN runs r ON r.run_id = c.run_id
+            WHERE c.view = ? AND c.column_name = ? AND c.null_rate IS NOT NULL AND (? IS NULL OR r.backend = ?)
+            ORDER BY c.run_id DESC LIMIT ?
+            """,
+            (view, column, backend, backend, runs)
+        ).fetchall()
+        return rows[::-1]
+
+def split_unchanged(store: ValidationStore, date_columns: Dict[str, List[str]], hashes: Dict[str, str],
+                    backend: str, sample_percent: Optional[float] = None) -> Tuple[Dict[str, List[str]], Dict[str, Dict]]:
+    """
+    Split views into those to probe and those whose closure hash already has a
+    successful result; returns (date_columns to probe, {view: latest_result})
+    """
+    to_probe, unchanged = {}, {}
+    for view, columns in date_columns.items():
+        latest = store.latest_result(view, hashes[view], backend, sample_percent) if view in hashes else None
+        # A result missing a column the view now outputs is not a result for this view
+        if latest and set(columns) <= set(latest['profile'].get('columns', columns)):
+            unchanged[view] = latest
+        else:
+            to_probe[view] = columns
+    return to_probe, unchanged
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Query the history of date validation runs')
+    parser.add_argument('--store', type=Path, default=STORE_FILE,
+                        help=f'History database (default: {STORE_FILE.name})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    runs = commands.add_parser('runs', help='List recent runs')
+    runs.add_argument('--limit', type=int, default=20)
+
+    trend = commands.add_parser('trend', help='NULL rate of one column over recent runs')
+    trend.add_argument('view')
+    trend.add_argument('column')
+    trend.add_argument('--runs', type=int, default=20, help='Number of runs (default: 20)')
+    trend.add_argument('--backend', help="Only runs against this backend, e.g. 'athena'")
+
+    query = commands.add_parser('query', help='Run a read-only SQL query against the store')
+    query.add_argument('sql')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not args.store.exists():
+        print(f"❌ No validation history yet ({args.store.name}); run profile_date_nulls.py first")
+        sys.exit(1)
+
+    with ValidationStore(args.store) as store:
+        if args.command == 'runs':
+            print(f"{'Run':>5}  {'Started (UTC)':<25} {'Tool':<26} {'Backend':<18} {'Views':>5} "
+                  f"{'Reused':>6} {'Failed':>6}  Revision")
+            print("-" * 110)
+            for run in store.runs(args.limit):
+                tool = run['tool'] + (f" ({run['sample_percent']:g}%)" if run['sample_percent'] else '')
+                print(f"{run['run_id']:>5}  {run['started_at']:<25} {tool:<26} {run['backend']:<18} "
+                      f"{run['views']:>5} {run['reused'] or 0:>6} {run['failed'] or 0:>6}  {run['git_revision']}")
+
+        elif args.command == 'trend':
+            rows = store.trend(args.view, args.column, args.runs, args.backend)
+            if not rows:
+                print(f"❌ No results for {args.view}.{args.column}")
+                sys.exit(1)
+            print(f"{args.view}.{args.column}: last {len(rows)} run(s)")
+            print(f"{'Run':>5}  {'Started (UTC)':<25} {'Rows':>10} {'NULL %':>7}  {'Min':<26} {'Max':<26} Revision")
+            print("-" * 110)
+            for row in rows:
+                reused = f" (from run {row['reused_from']})" if row['reused_from'] else ''
+                print(f"{row['run_id']:>5}  {row['started_at']:<25} {row['row_count'] or 0:>10,} "
+                      f"{row['null_rate']:>7.1%}  {str(row['min_value'])[:26]:<26} "
+                      f"{str(row['max_value'])[:26]:<26} {row['git_revision']}{reused}")
+
+        elif args.command == 'query':
+            # Open read-only so ad hoc queries cannot change the history
+            conn = sqlite3.connect(f"file:{args.store}?mode=ro", uri=True)
+            try:
+                cursor = conn.execute(args.sql)
+            except sqlite3.Error as e:
+                print(f"❌ {e}")
+                sys.exit(1)
+            columns = [d[0] for d in cursor.description or []]
+            print('\t'.join(columns))
+            for row in cursor:
+                print('\t'.join('' if value is None else str(value) for value in row))
+            conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -60,18 +60,9 @@ SELECT
     dr.id as diagnostic_report_id,
     dr.status as report_status,
     dr.conclusion as report_conclusion,
-    COALESCE(
-        TRY(date_parse(dr.issued, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(dr.issued, '%Y-%m-%d'))
-    ) as report_issued,
-    COALESCE(
-        TRY(date_parse(dr.effective_period_start, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(dr.effective_period_start, '%Y-%m-%d'))
-    ) as report_effective_period_start,
-    COALESCE(
-        TRY(date_parse(dr.effective_period_stop, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(dr.effective_period_stop, '%Y-%m-%d'))
-    ) as report_effective_period_stop,
+    TRY(CAST(from_iso8601_timestamp(dr.issued) AS TIMESTAMP)) as report_issued,
+    TRY(CAST(from_iso8601_timestamp(dr.effective_period_start) AS TIMESTAMP)) as report_effective_period_start,
+    TRY(CAST(from_iso8601_timestamp(dr.effective_period_stop) AS TIMESTAMP)) as report_effective_period_stop,
     rc.category_text,
 
     -- Age calculations
@@ -588,41 +588,41 @@ peds_cns_snomed_codes AS (
 -- ============================================================================
 problem_list_diagnoses AS (
     SELECT
-        vpld.patient_id as patient_fhir_id,
+        vpld.patient_fhir_id as patient_fhir_id,
         'problem_list_diagnosis' as diagnostic_source,
-        vpld.condition_id as source_id,
+        vpld.pld_condition_id as source_id,
 
         -- Diagnostic timing
         COALESCE(
-            TRY(CAST(vpld.onset_date_time AS TIMESTAMP)),
-            TRY(CAST(vpld.recorded_date AS TIMESTAMP))
+            TRY(CAST(vpld.pld_onset_datetime AS TIMESTAMP)),
+            TRY(CAST(vpld.pld_recorded_date AS TIMESTAMP))
         ) as diagnostic_datetime,
         DATE(COALESCE(
-            TRY(CAST(vpld.onset_date_time AS TIMESTAMP)),
-            TRY(CAST(vpld.recorded_date AS TIMESTAMP))
+            TRY(CAST(vpld.pld_onset_datetime AS TIMESTAMP)),
+            TRY(CAST(vpld.pld_recorded_date AS TIMESTAMP))
         )) as diagnostic_date,
 
         -- Diagnosis identification
-        vpld.diagnosis_name as diagnostic_name,
-        COALESCE(vpld.snomed_code, vpld.icd10_code) as code,
+        vpld.pld_diagnosis_name as diagnostic_name,
+        COALESCE(vpld.pld_snomed_code, vpld.pld_icd10_code) as code,
         NULL as coding_system_code,
         CASE
-            WHEN vpld.snomed_code IS NOT NULL THEN 'http://snomed.info/sct'
-            WHEN vpld.icd10_code IS NOT NULL THEN 'http://hl7.org/fhir/sid/icd-10-cm'
+            WHEN vpld.pld_snomed_code IS NOT NULL THEN 'http://snomed.info/sct'
+            WHEN vpld.pld_icd10_code IS NOT NULL THEN 'http://hl7.org/fhir/sid/icd-10-cm'
         END as coding_system_name,
 
         -- Component (use code type as proxy)
         CASE
-            WHEN vpld.snomed_code IS NOT NULL THEN 'SNOMED_Code'
-            WHEN vpld.icd10_code IS NOT NULL THEN 'ICD10_Code'
+            WHEN vpld.pld_snomed_code IS NOT NULL THEN 'SNOMED_Code'
+            WHEN vpld.pld_icd10_code IS NOT NULL THEN 'ICD10_Code'
             ELSE 'Unknown'
         END as component_name,
 
         -- Result value (use code display)
         COALESCE(
-            vpld.snomed_display,
-            vpld.icd10_display,
-            vpld.diagnosis_name
+            vpld.pld_snomed_display,
+            vpld.pld_icd10_display,
+            vpld.pld_diagnosis_name
         ) as result_value,
 
         -- Test metadata
@@ -643,13 +643,13 @@ problem_list_diagnoses AS (
 
         -- Diagnostic categorization
         CASE
-            WHEN vpld.icd10_code IS NOT NULL THEN 'ICD10_Diagnosis'
-            WHEN vpld.snomed_code IS NOT NULL THEN 'SNOMED_Diagnosis'
+            WHEN vpld.pld_icd10_code IS NOT NULL THEN 'ICD10_Diagnosis'
+            WHEN vpld.pld_snomed_code IS NOT NULL THEN 'SNOMED_Diagnosis'
             ELSE 'Clinical_Diagnosis'
         END as diagnostic_category,
 
         -- Metadata
-        vpld.clinical_status_text as test_status,
+        vpld.pld_clinical_status as test_status,
         CAST(NULL AS VARCHAR) as test_orderer,
         CAST(NULL AS BIGINT) as component_count,
 
@@ -660,40 +660,40 @@ problem_list_diagnoses AS (
         -- Days from surgery
         ABS(DATE_DIFF('day', ts.surgery_date,
             DATE(COALESCE(
-                TRY(CAST(vpld.onset_date_time AS TIMESTAMP)),
-                TRY(CAST(vpld.recorded_date AS TIMESTAMP))
+                TRY(CAST(vpld.pld_onset_datetime AS TIMESTAMP)),
+                TRY(CAST(vpld.pld_recorded_date AS TIMESTAMP))
             ))
         )) as days_from_surgery
 
     FROM tumor_surgeries ts
     INNER JOIN fhir_prd_db.v_problem_list_diagnoses vpld
-        ON ts.patient_fhir_id = vpld.patient_id
+        ON ts.patient_fhir_id = vpld.patient_fhir_id
         -- Link diagnoses within ±180 days of surgery (may predate or follow surgery)
         AND ABS(DATE_DIFF('day', ts.surgery_date,
             DATE(COALESCE(
-                TRY(CAST(vpld.onset_date_time AS TIMESTAMP)),
-                TRY(CAST(vpld.recorded_date AS TIMESTAMP))
+                TRY(CAST(vpld.pld_onset_datetime AS TIMESTAMP)),
+                TRY(CAST(vpld.pld_recorded_date AS TIMESTAMP))
             ))
         )) <= 180
 
-    WHERE vpld.patient_id IS NOT NULL
-      AND vpld.condition_id IS NOT NULL
+    WHERE vpld.patient_fhir_id IS NOT NULL
+      AND vpld.pld_condition_id IS NOT NULL
 
       -- Filter to pediatric CNS tumor codes
       AND (
           -- ICD-10 C-codes for brain tumors (C70-C72, C79.3x)
-          vpld.icd10_code LIKE 'C70%'
-          OR vpld.icd10_code LIKE 'C71%'
-          OR vpld.icd10_code LIKE 'C72%'
-          OR vpld.icd10_code LIKE 'C79.3%'
+          vpld.pld_icd10_code LIKE 'C70%'
+          OR vpld.pld_icd10_code LIKE 'C71%'
+          OR vpld.pld_icd10_code LIKE 'C72%'
+          OR vpld.pld_icd10_code LIKE 'C79.3%'
 
           -- ICD-10 D-codes for benign brain tumors (D32-D33, D43)
-          OR vpld.icd10_code LIKE 'D32%'
-          OR vpld.icd10_code LIKE 'D33%'
-          OR vpld.icd10_code LIKE 'D43%'
+          OR vpld.pld_icd10_code LIKE 'D32%'
+          OR vpld.pld_icd10_code LIKE 'D33%'
+          OR vpld.pld_icd10_code LIKE 'D43%'
 
           -- Curated pediatric CNS SNOMED codes (294 codes)
-          OR vpld.snomed_code IN (SELECT snomed_code FROM peds_cns_snomed_codes)
+          OR vpld.pld_snomed_code IN (SELECT snomed_code FROM peds_cns_snomed_codes)
       )
 ),
 
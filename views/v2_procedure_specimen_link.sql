@@ -13,6 +13,6 @@ JOIN
     fhir_prd_db.specimen s ON REPLACE(srs.specimen_reference, 'Specimen/', '') = s.id
 WHERE
     ABS(DATE_DIFF('day',
-        DATE(TRY(date_parse(NULLIF(p.performed_period_start, ''), '%Y-%m-%dT%H:%i:%sZ'))),
-        DATE(TRY(date_parse(NULLIF(s.collection_collected_date_time, ''), '%Y-%m-%dT%H:%i:%sZ')))
+        DATE(TRY(CAST(from_iso8601_timestamp(NULLIF(p.performed_period_start, '')) AS TIMESTAMP))),
+        DATE(TRY(CAST(from_iso8601_timestamp(NULLIF(s.collection_collected_date_time, '')) AS TIMESTAMP)))
     )) <= 1
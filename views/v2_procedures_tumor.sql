@@ -427,22 +427,10 @@ SELECT
     p.id as procedure_fhir_id,
 
     p.status as proc_status,
-    COALESCE(
-        TRY(date_parse(NULLIF(p.performed_date_time, ''), '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(NULLIF(p.performed_date_time, ''), '%Y-%m-%d'))
-    ) as proc_performed_date_time,
-    COALESCE(
-        TRY(date_parse(NULLIF(p.performed_period_start, ''), '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(NULLIF(p.performed_period_start, ''), '%Y-%m-%d'))
-    ) as proc_performed_period_start,
-    COALESCE(
-        TRY(date_parse(NULLIF(p.performed_period_end, ''), '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(NULLIF(p.performed_period_end, ''), '%Y-%m-%d'))
-    ) as proc_performed_period_end,
-    COALESCE(
-        TRY(date_parse(NULLIF(p.performed_string, ''), '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(NULLIF(p.performed_string, ''), '%Y-%m-%d'))
-    ) as proc_performed_string,
+    TRY(CAST(from_iso8601_timestamp(NULLIF(p.performed_date_time, '')) AS TIMESTAMP)) as proc_performed_date_time,
+    TRY(CAST(from_iso8601_timestamp(NULLIF(p.performed_period_start, '')) AS TIMESTAMP)) as proc_performed_period_start,
+    TRY(CAST(from_iso8601_timestamp(NULLIF(p.performed_period_end, '')) AS TIMESTAMP)) as proc_performed_period_end,
+    TRY(CAST(from_iso8601_timestamp(NULLIF(p.performed_string, '')) AS TIMESTAMP)) as proc_performed_string,
     p.performed_age_value as proc_performed_age_value,
     p.performed_age_unit as proc_performed_age_unit,
     p.code_text as proc_code_text,
@@ -19,7 +19,7 @@ medications_with_episode_dates AS (
         ) AS episode_start_datetime,
 
         -- Stop date LEFT AS NULL if not available (for uniform querying)
-        TRY(date_parse(medication_stop_date, '%Y-%m-%dT%H:%i:%sZ')) AS episode_stop_datetime,
+        TRY(CAST(from_iso8601_timestamp(medication_stop_date) AS TIMESTAMP)) AS episode_stop_datetime,
 
         -- Individual medication identifiers
         medication_request_fhir_id,
@@ -81,14 +81,8 @@ SELECT
     e.class_display,
     e.service_type_text,
     e.priority_text,
-    COALESCE(
-        TRY(date_parse(e.period_start, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(e.period_start, '%Y-%m-%d'))
-    ) as period_start,
-    COALESCE(
-        TRY(date_parse(e.period_end, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(e.period_end, '%Y-%m-%d'))
-    ) as period_end,
+    TRY(CAST(from_iso8601_timestamp(e.period_start) AS TIMESTAMP)) as period_start,
+    TRY(CAST(from_iso8601_timestamp(e.period_end) AS TIMESTAMP)) as period_end,
     e.length_value,
     e.length_unit,
     e.service_provider_display,
@@ -73,12 +73,11 @@ hydro_imaging AS (
         dr.conclusion,
 
         -- Imaging modality classification
+        -- keyword_rules: imaging_modality(LOWER(dr.code_text))
         CASE
-            WHEN LOWER(dr.code_text) LIKE '%ct%'
-                 OR LOWER(dr.code_text) LIKE '%computed%tomography%' THEN 'CT'
-            WHEN LOWER(dr.code_text) LIKE '%mri%'
-                 OR LOWER(dr.code_text) LIKE '%magnetic%resonance%' THEN 'MRI'
-            WHEN LOWER(dr.code_text) LIKE '%ultrasound%' THEN 'Ultrasound'
+            WHEN regexp_like(LOWER(dr.code_text), '(?s)ct|computed.*tomography') THEN 'CT'
+            WHEN regexp_like(LOWER(dr.code_text), '(?s)mri|magnetic.*resonance') THEN 'MRI'
+            WHEN regexp_like(LOWER(dr.code_text), 'ultrasound') THEN 'Ultrasound'
             ELSE 'Other'
         END as imaging_modality
 
@@ -28,36 +28,25 @@ shunt_procedures AS (
         p.encounter_reference as proc_encounter_ref,
 
         -- Shunt type classification
+        -- keyword_rules: shunt_type(LOWER(p.code_text))
         CASE
-            WHEN LOWER(p.code_text) LIKE '%ventriculoperitoneal%'
-                 OR LOWER(p.code_text) LIKE '%vp%shunt%'
-                 OR LOWER(p.code_text) LIKE '%v-p%shunt%'
-                 OR LOWER(p.code_text) LIKE '%vps%' THEN 'VPS'
-            WHEN LOWER(p.code_text) LIKE '%endoscopic%third%ventriculostomy%'
-                 OR LOWER(p.code_text) LIKE '%etv%' THEN 'ETV'
-            WHEN LOWER(p.code_text) LIKE '%external%ventricular%drain%'
-                 OR LOWER(p.code_text) LIKE '%evd%'
-                 OR LOWER(p.code_text) LIKE '%temporary%' THEN 'EVD'
-            WHEN LOWER(p.code_text) LIKE '%ventriculoatrial%'
-                 OR LOWER(p.code_text) LIKE '%va%shunt%' THEN 'VA Shunt'
-            WHEN LOWER(p.code_text) LIKE '%ventriculopleural%' THEN 'Ventriculopleural'
+            WHEN regexp_like(LOWER(p.code_text), '(?s)ventriculoperitoneal|vp.*shunt|v-p.*shunt|vps') THEN 'VPS'
+            WHEN regexp_like(LOWER(p.code_text), '(?s)endoscopic.*third.*ventriculostomy|etv') THEN 'ETV'
+            WHEN regexp_like(LOWER(p.code_text), '(?s)external.*ventricular.*drain|evd|temporary') THEN 'EVD'
+            WHEN regexp_like(LOWER(p.code_text), '(?s)ventriculoatrial|va.*shunt') THEN 'VA Shunt'
+            WHEN regexp_like(LOWER(p.code_text), 'ventriculopleural') THEN 'Ventriculopleural'
             ELSE 'Other'
         END as shunt_type,
 
         -- Procedure category
+        -- keyword_rules: shunt_procedure_category(LOWER(p.code_text))
         CASE
-            WHEN LOWER(p.code_text) LIKE '%placement%'
-                 OR LOWER(p.code_text) LIKE '%insertion%'
-                 OR LOWER(p.code_text) LIKE '%creation%' THEN 'Placement'
-            WHEN LOWER(p.code_text) LIKE '%revision%'
-                 OR LOWER(p.code_text) LIKE '%replacement%' THEN 'Revision'
-            WHEN LOWER(p.code_text) LIKE '%removal%'
-                 OR LOWER(p.code_text) LIKE '%explant%' THEN 'Removal'
-            WHEN LOWER(p.code_text) LIKE '%reprogram%' THEN 'Reprogramming'
-            WHEN LOWER(p.code_text) LIKE '%evd%'
-                 OR LOWER(p.code_text) LIKE '%temporary%' THEN 'Temporary EVD'
-            WHEN LOWER(p.code_text) LIKE '%etv%'
-                 OR LOWER(p.code_text) LIKE '%ventriculostomy%' THEN 'ETV'
+            WHEN regexp_like(LOWER(p.code_text), 'placement|insertion|creation') THEN 'Placement'
+            WHEN regexp_like(LOWER(p.code_text), 'revision|replacement') THEN 'Revision'
+            WHEN regexp_like(LOWER(p.code_text), 'removal|explant') THEN 'Removal'
+            WHEN regexp_like(LOWER(p.code_text), 'reprogram') THEN 'Reprogramming'
+            WHEN regexp_like(LOWER(p.code_text), 'evd|temporary') THEN 'Temporary EVD'
+            WHEN regexp_like(LOWER(p.code_text), 'etv|ventriculostomy') THEN 'ETV'
             ELSE 'Other'
         END as procedure_category
 
@@ -0,0 +1,44 @@
+CREATE OR REPLACE VIEW fhir_prd_db.v_keyword_rules AS
+-- Generated by compile_keyword_rules.py from keyword_rules.json; do not edit by hand.
+-- Rows are tried in priority order per rule_set; the NULL-pattern row is the default.
+SELECT rule_set, priority, category, pattern, description, rules_version
+FROM (
+  VALUES
+    ('diagnosis_category', 1, 'Tumor', 'neoplasm|tumor|astrocytoma|glioma|medulloblastoma|ependymoma', 'Timeline event_category for diagnoses (case-sensitive, on diagnosis_name)', 1),
+    ('diagnosis_category', 2, 'Treatment Toxicity', 'chemotherapy|nausea|vomiting|induced', 'Timeline event_category for diagnoses (case-sensitive, on diagnosis_name)', 1),
+    ('diagnosis_category', 3, 'Hydrocephalus', 'hydrocephalus', 'Timeline event_category for diagnoses (case-sensitive, on diagnosis_name)', 1),
+    ('diagnosis_category', 4, 'Vision Disorder', 'vision|visual|diplopia|nystagmus', 'Timeline event_category for diagnoses (case-sensitive, on diagnosis_name)', 1),
+    ('diagnosis_category', 5, 'Hearing Disorder', 'hearing|ototoxic', 'Timeline event_category for diagnoses (case-sensitive, on diagnosis_name)', 1),
+    ('diagnosis_category', 6, 'Other Complication', NULL, 'Timeline event_category for diagnoses (case-sensitive, on diagnosis_name)', 1),
+    ('diagnosis_subtype', 1, 'Progression', 'progression', 'Timeline event_subtype for diagnoses; SNOMED 25173007 (progression) is checked by the view first', 1),
+    ('diagnosis_subtype', 2, 'Recurrence', 'recurrence|recurrent', 'Timeline event_subtype for diagnoses; SNOMED 25173007 (progression) is checked by the view first', 1),
+    ('diagnosis_subtype', 3, 'Initial Diagnosis', 'astrocytoma|glioma|medulloblastoma', 'Timeline event_subtype for diagnoses; SNOMED 25173007 (progression) is checked by the view first', 1),
+    ('diagnosis_subtype', 4, NULL, NULL, 'Timeline event_subtype for diagnoses; SNOMED 25173007 (progression) is checked by the view first', 1),
+    ('imaging_response', 1, 'Progression Imaging', 'progression|increase', 'Timeline event_subtype for imaging, on the lower-cased report conclusion', 1),
+    ('imaging_response', 2, 'Stable Imaging', 'stable', 'Timeline event_subtype for imaging, on the lower-cased report conclusion', 1),
+    ('imaging_response', 3, 'Response Imaging', 'improvement|decrease', 'Timeline event_subtype for imaging, on the lower-cased report conclusion', 1),
+    ('imaging_response', 4, 'Surveillance Imaging', NULL, 'Timeline event_subtype for imaging, on the lower-cased report conclusion', 1),
+    ('measurement_category', 1, 'Vital Signs', 'blood pressure|heart rate|temperature|oxygen', 'Timeline event_category for measurements, on the lower-cased measurement type; exact growth measures are checked by the view first', 1),
+    ('measurement_category', 2, 'Hematology Lab', 'cbc|blood count|hemoglobin|platelet|wbc|neutrophil', 'Timeline event_category for measurements, on the lower-cased measurement type; exact growth measures are checked by the view first', 1),
+    ('measurement_category', 3, 'Chemistry Lab', 'metabolic|chemistry|electrolyte', 'Timeline event_category for measurements, on the lower-cased measurement type; exact growth measures are checked by the view first', 1),
+    ('measurement_category', 4, 'Liver Function', 'liver|alt|ast|bilirubin', 'Timeline event_category for measurements, on the lower-cased measurement type; exact growth measures are checked by the view first', 1),
+    ('measurement_category', 5, 'Renal Function', 'renal|creatinine|bun', 'Timeline event_category for measurements, on the lower-cased measurement type; exact growth measures are checked by the view first', 1),
+    ('measurement_category', 6, 'Other Lab', NULL, 'Timeline event_category for measurements, on the lower-cased measurement type; exact growth measures are checked by the view first', 1),
+    ('imaging_modality', 1, 'CT', '(?s)ct|computed.*tomography', 'Hydrocephalus imaging modality, on the lower-cased report code text', 1),
+    ('imaging_modality', 2, 'MRI', '(?s)mri|magnetic.*resonance', 'Hydrocephalus imaging modality, on the lower-cased report code text', 1),
+    ('imaging_modality', 3, 'Ultrasound', 'ultrasound', 'Hydrocephalus imaging modality, on the lower-cased report code text', 1),
+    ('imaging_modality', 4, 'Other', NULL, 'Hydrocephalus imaging modality, on the lower-cased report code text', 1),
+    ('shunt_type', 1, 'VPS', '(?s)ventriculoperitoneal|vp.*shunt|v-p.*shunt|vps', 'Hydrocephalus shunt type, on the lower-cased procedure code text', 1),
+    ('shunt_type', 2, 'ETV', '(?s)endoscopic.*third.*ventriculostomy|etv', 'Hydrocephalus shunt type, on the lower-cased procedure code text', 1),
+    ('shunt_type', 3, 'EVD', '(?s)external.*ventricular.*drain|evd|temporary', 'Hydrocephalus shunt type, on the lower-cased procedure code text', 1),
+    ('shunt_type', 4, 'VA Shunt', '(?s)ventriculoatrial|va.*shunt', 'Hydrocephalus shunt type, on the lower-cased procedure code text', 1),
+    ('shunt_type', 5, 'Ventriculopleural', 'ventriculopleural', 'Hydrocephalus shunt type, on the lower-cased procedure code text', 1),
+    ('shunt_type', 6, 'Other', NULL, 'Hydrocephalus shunt type, on the lower-cased procedure code text', 1),
+    ('shunt_procedure_category', 1, 'Placement', 'placement|insertion|creation', 'Hydrocephalus procedure category, on the lower-cased procedure code text', 1),
+    ('shunt_procedure_category', 2, 'Revision', 'revision|replacement', 'Hydrocephalus procedure category, on the lower-cased procedure code text', 1),
+    ('shunt_procedure_category', 3, 'Removal', 'removal|explant', 'Hydrocephalus procedure category, on the lower-cased procedure code text', 1),
+    ('shunt_procedure_category', 4, 'Reprogramming', 'reprogram', 'Hydrocephalus procedure category, on the lower-cased procedure code text', 1),
+    ('shunt_procedure_category', 5, 'Temporary EVD', 'evd|temporary', 'Hydrocephalus procedure category, on the lower-cased procedure code text', 1),
+    ('shunt_procedure_category', 6, 'ETV', 'etv|ventriculostomy', 'Hydrocephalus procedure category, on the lower-cased procedure code text', 1),
+    ('shunt_procedure_category', 7, 'Other', NULL, 'Hydrocephalus procedure category, on the lower-cased procedure code text', 1)
+) AS rules (rule_set, priority, category, pattern, description, rules_version)
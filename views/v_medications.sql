@@ -93,26 +93,17 @@ SELECT
     pm.medication_name,
     pm.form_text as medication_form,
     pm.rx_norm_codes,
-    TRY(date_parse(COALESCE(mtb.earliest_bounds_start, pm.authored_on), '%Y-%m-%dT%H:%i:%sZ')) as medication_start_date,
-    TRY(date_parse(COALESCE(mtb.latest_bounds_end, mr.dispense_request_validity_period_end), '%Y-%m-%dT%H:%i:%sZ')) as medication_stop_date,
+    TRY(CAST(from_iso8601_timestamp(COALESCE(mtb.earliest_bounds_start, pm.authored_on)) AS TIMESTAMP)) as medication_start_date,
+    TRY(CAST(from_iso8601_timestamp(COALESCE(mtb.latest_bounds_end, mr.dispense_request_validity_period_end)) AS TIMESTAMP)) as medication_stop_date,
     pm.requester_name,
     pm.status as medication_status,
     pm.encounter_display,
     mr.encounter_reference as mr_encounter_reference,
     mr.group_identifier_value as mr_group_identifier_value,
     mr.group_identifier_system as mr_group_identifier_system,
-    COALESCE(
-        TRY(date_parse(mr.dispense_request_validity_period_start, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(mr.dispense_request_validity_period_start, '%Y-%m-%d'))
-    ) as mr_validity_period_start,
-    COALESCE(
-        TRY(date_parse(mr.dispense_request_validity_period_end, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(mr.dispense_request_validity_period_end, '%Y-%m-%d'))
-    ) as mr_validity_period_end,
-    COALESCE(
-        TRY(date_parse(mr.authored_on, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(mr.authored_on, '%Y-%m-%d'))
-    ) as mr_authored_on,
+    TRY(CAST(from_iso8601_timestamp(mr.dispense_request_validity_period_start) AS TIMESTAMP)) as mr_validity_period_start,
+    TRY(CAST(from_iso8601_timestamp(mr.dispense_request_validity_period_end) AS TIMESTAMP)) as mr_validity_period_end,
+    TRY(CAST(from_iso8601_timestamp(mr.authored_on) AS TIMESTAMP)) as mr_authored_on,
     mr.status as mr_status,
     mr.status_reason_text as mr_status_reason_text,
     mr.priority as mr_priority,
@@ -145,18 +136,9 @@ SELECT
     cp.title as cp_title,
     cp.status as cp_status,
     cp.intent as cp_intent,
-    COALESCE(
-        TRY(date_parse(cp.created, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(cp.created, '%Y-%m-%d'))
-    ) as cp_created,
-    COALESCE(
-        TRY(date_parse(cp.period_start, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(cp.period_start, '%Y-%m-%d'))
-    ) as cp_period_start,
-    COALESCE(
-        TRY(date_parse(cp.period_end, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(cp.period_end, '%Y-%m-%d'))
-    ) as cp_period_end,
+    TRY(CAST(from_iso8601_timestamp(cp.created) AS TIMESTAMP)) as cp_created,
+    TRY(CAST(from_iso8601_timestamp(cp.period_start) AS TIMESTAMP)) as cp_period_start,
+    TRY(CAST(from_iso8601_timestamp(cp.period_end) AS TIMESTAMP)) as cp_period_end,
     cp.author_display as cp_author_display,
     cpc.categories_aggregated as cpc_categories_aggregated,
     cpcon.addresses_aggregated as cpcon_addresses_aggregated,
@@ -4,10 +4,7 @@ SELECT
     pa.gender as pd_gender,
     pa.race as pd_race,
     pa.ethnicity as pd_ethnicity,
-    COALESCE(
-        TRY(date_parse(pa.birth_date, '%Y-%m-%dT%H:%i:%sZ')),
-        TRY(date_parse(pa.birth_date, '%Y-%m-%d'))
-    ) as pd_birth_date,
+    TRY(CAST(from_iso8601_timestamp(pa.birth_date) AS TIMESTAMP)) as pd_birth_date,
     DATE_DIFF('year', DATE(pa.birth_date), CURRENT_DATE) as pd_age_years
 FROM fhir_prd_db.patient_access pa
 WHERE pa.id IS NOT NULL;
\ No newline at end of file
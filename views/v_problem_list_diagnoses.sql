@@ -155,10 +155,7 @@ medication_findings AS (
         CASE WHEN mcc.code_coding_system = 'http://snomed.info/sct' THEN mcc.code_coding_display END as snomed_display,
         mcc.code_coding_code as code,
         mcc.code_coding_system as coding_system,
-        COALESCE(
-            TRY(date_parse(mr.authored_on, '%Y-%m-%dT%H:%i:%sZ')),
-            TRY(date_parse(mr.authored_on, '%Y-%m-%d'))
-        ) as finding_datetime
+        TRY(CAST(from_iso8601_timestamp(mr.authored_on) AS TIMESTAMP)) as finding_datetime
     FROM fhir_prd_db.medication_request mr
     INNER JOIN fhir_prd_db.patient_access pa ON REPLACE(mr.subject_reference, 'Patient/', '') = pa.id
     INNER JOIN fhir_prd_db.medication med ON REPLACE(mr.medication_reference_reference, 'Medication/', '') = med.id
@@ -239,10 +236,7 @@ service_request_findings AS (
         CASE WHEN src.code_coding_system = 'http://snomed.info/sct' THEN src.code_coding_display END as snomed_display,
         src.code_coding_code as code,
         src.code_coding_system as coding_system,
-        COALESCE(
-            TRY(date_parse(sr.authored_on, '%Y-%m-%dT%H:%i:%sZ')),
-            TRY(date_parse(sr.authored_on, '%Y-%m-%d'))
-        ) as finding_datetime
+        TRY(CAST(from_iso8601_timestamp(sr.authored_on) AS TIMESTAMP)) as finding_datetime
     FROM fhir_prd_db.service_request sr
     INNER JOIN fhir_prd_db.patient_access pa ON REPLACE(sr.subject_reference, 'Patient/', '') = pa.id
     INNER JOIN fhir_prd_db.service_request_code_coding src ON sr.id = src.service_request_id
@@ -266,10 +260,7 @@ list_findings AS (
         CASE WHEN lc.code_coding_system = 'http://snomed.info/sct' THEN lc.code_coding_display END as snomed_display,
         lc.code_coding_code as code,
         lc.code_coding_system as coding_system,
-        COALESCE(
-            TRY(date_parse(l.date, '%Y-%m-%dT%H:%i:%sZ')),
-            TRY(date_parse(l.date, '%Y-%m-%d'))
-        ) as finding_datetime
+        TRY(CAST(from_iso8601_timestamp(l.date) AS TIMESTAMP)) as finding_datetime
     FROM fhir_prd_db.list l
     INNER JOIN fhir_prd_db.patient_access pa ON REPLACE(l.subject_reference, 'Patient/', '') = pa.id
     INNER JOIN fhir_prd_db.list_code_coding lc ON l.id = lc.list_id
@@ -293,10 +284,7 @@ request_group_findings AS (
         CASE WHEN rgc.code_coding_system = 'http://snomed.info/sct' THEN rgc.code_coding_display END as snomed_display,
         rgc.code_coding_code as code,
         rgc.code_coding_system as coding_system,
-        COALESCE(
-            TRY(date_parse(rg.authored_on, '%Y-%m-%dT%H:%i:%sZ')),
-            TRY(date_parse(rg.authored_on, '%Y-%m-%d'))
-        ) as finding_datetime
+        TRY(CAST(from_iso8601_timestamp(rg.authored_on) AS TIMESTAMP)) as finding_datetime
     FROM fhir_prd_db.request_group rg
     INNER JOIN fhir_prd_db.patient_access pa ON REPLACE(rg.subject_reference, 'Patient/', '') = pa.id
     INNER JOIN fhir_prd_db.request_group_code_coding rgc ON rg.id = rgc.request_group_id
@@ -14,28 +14,25 @@ SELECT
 
     -- Event classification
     'Diagnosis' as event_type,
+    -- keyword_rules: diagnosis_category(vd.diagnosis_name)
     CASE
-        WHEN vd.diagnosis_name LIKE '%neoplasm%' OR vd.diagnosis_name LIKE '%tumor%'
-             OR vd.diagnosis_name LIKE '%astrocytoma%' OR vd.diagnosis_name LIKE '%glioma%'
-             OR vd.diagnosis_name LIKE '%medulloblastoma%' OR vd.diagnosis_name LIKE '%ependymoma%'
-        THEN 'Tumor'
-        WHEN vd.diagnosis_name LIKE '%chemotherapy%' OR vd.diagnosis_name LIKE '%nausea%'
-             OR vd.diagnosis_name LIKE '%vomiting%' OR vd.diagnosis_name LIKE '%induced%'
-        THEN 'Treatment Toxicity'
-        WHEN vd.diagnosis_name LIKE '%hydrocephalus%' THEN 'Hydrocephalus'
-        WHEN vd.diagnosis_name LIKE '%vision%' OR vd.diagnosis_name LIKE '%visual%'
-             OR vd.diagnosis_name LIKE '%diplopia%' OR vd.diagnosis_name LIKE '%nystagmus%'
-        THEN 'Vision Disorder'
-        WHEN vd.diagnosis_name LIKE '%hearing%' OR vd.diagnosis_name LIKE '%ototoxic%'
-        THEN 'Hearing Disorder'
+        WHEN regexp_like(vd.diagnosis_name, 'neoplasm|tumor|astrocytoma|glioma|medulloblastoma|ependymoma') THEN 'Tumor'
+        WHEN regexp_like(vd.diagnosis_name, 'chemotherapy|nausea|vomiting|induced') THEN 'Treatment Toxicity'
+        WHEN regexp_like(vd.diagnosis_name, 'hydrocephalus') THEN 'Hydrocephalus'
+        WHEN regexp_like(vd.diagnosis_name, 'vision|visual|diplopia|nystagmus') THEN 'Vision Disorder'
+        WHEN regexp_like(vd.diagnosis_name, 'hearing|ototoxic') THEN 'Hearing Disorder'
         ELSE 'Other Complication'
     END as event_category,
     CASE
-        WHEN vd.diagnosis_name LIKE '%progression%' OR vd.snomed_code = 25173007 THEN 'Progression'
-        WHEN vd.diagnosis_name LIKE '%recurrence%' OR vd.diagnosis_name LIKE '%recurrent%' THEN 'Recurrence'
-        WHEN vd.diagnosis_name LIKE '%astrocytoma%' OR vd.diagnosis_name LIKE '%glioma%'
-             OR vd.diagnosis_name LIKE '%medulloblastoma%' THEN 'Initial Diagnosis'
-        ELSE NULL
+        WHEN vd.snomed_code = 25173007 THEN 'Progression'
+        ELSE
+            -- keyword_rules: diagnosis_subtype(vd.diagnosis_name)
+            CASE
+                WHEN regexp_like(vd.diagnosis_name, 'progression') THEN 'Progression'
+                WHEN regexp_like(vd.diagnosis_name, 'recurrence|recurrent') THEN 'Recurrence'
+                WHEN regexp_like(vd.diagnosis_name, 'astrocytoma|glioma|medulloblastoma') THEN 'Initial Diagnosis'
+                ELSE NULL
+            END
     END as event_subtype,
     vd.diagnosis_name as event_description,
     vd.clinical_status_text as event_status,
@@ -159,12 +156,11 @@ SELECT
 
     'Imaging' as event_type,
     'Imaging' as event_category,
+    -- keyword_rules: imaging_response(LOWER(vi.report_conclusion))
     CASE
-        WHEN LOWER(vi.report_conclusion) LIKE '%progression%' OR LOWER(vi.report_conclusion) LIKE '%increase%'
-        THEN 'Progression Imaging'
-        WHEN LOWER(vi.report_conclusion) LIKE '%stable%' THEN 'Stable Imaging'
-        WHEN LOWER(vi.report_conclusion) LIKE '%improvement%' OR LOWER(vi.report_conclusion) LIKE '%decrease%'
-        THEN 'Response Imaging'
+        WHEN regexp_like(LOWER(vi.report_conclusion), 'progression|increase') THEN 'Progression Imaging'
+        WHEN regexp_like(LOWER(vi.report_conclusion), 'stable') THEN 'Stable Imaging'
+        WHEN regexp_like(LOWER(vi.report_conclusion), 'improvement|decrease') THEN 'Response Imaging'
         ELSE 'Surveillance Imaging'
     END as event_subtype,
     vi.imaging_procedure as event_description,
@@ -476,32 +472,16 @@ SELECT
     CASE
         WHEN LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) IN ('height', 'weight', 'bmi', 'body mass index')
         THEN 'Growth'
-        WHEN LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%blood pressure%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%heart rate%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%temperature%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%oxygen%'
-        THEN 'Vital Signs'
-        WHEN LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%cbc%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%blood count%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%hemoglobin%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%platelet%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%wbc%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%neutrophil%'
-        THEN 'Hematology Lab'
-        WHEN LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%metabolic%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%chemistry%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%electrolyte%'
-        THEN 'Chemistry Lab'
-        WHEN LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%liver%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%alt%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%ast%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%bilirubin%'
-        THEN 'Liver Function'
-        WHEN LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%renal%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%creatinine%'
-             OR LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)) LIKE '%bun%'
-        THEN 'Renal Function'
-        ELSE 'Other Lab'
+        ELSE
+            -- keyword_rules: measurement_category(LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)))
+            CASE
+                WHEN regexp_like(LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)), 'blood pressure|heart rate|temperature|oxygen') THEN 'Vital Signs'
+                WHEN regexp_like(LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)), 'cbc|blood count|hemoglobin|platelet|wbc|neutrophil') THEN 'Hematology Lab'
+                WHEN regexp_like(LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)), 'metabolic|chemistry|electrolyte') THEN 'Chemistry Lab'
+                WHEN regexp_like(LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)), 'liver|alt|ast|bilirubin') THEN 'Liver Function'
+                WHEN regexp_like(LOWER(COALESCE(vm.obs_measurement_type, vm.lt_measurement_type)), 'renal|creatinine|bun') THEN 'Renal Function'
+                ELSE 'Other Lab'
+            END
     END as event_category,
     COALESCE(vm.obs_measurement_type, vm.lt_measurement_type) as event_subtype,
     COALESCE(vm.obs_measurement_type, vm.lt_measurement_type) as event_description,
@@ -5,14 +5,8 @@ WITH appointment_encounter_links AS (
         SUBSTRING(ea.appointment_reference, 13) as appointment_id,  -- Remove "Appointment/" prefix
         ea.encounter_id,
         e.status as encounter_status,
-        COALESCE(
-            TRY(date_parse(e.period_start, '%Y-%m-%dT%H:%i:%sZ')),
-            TRY(date_parse(e.period_start, '%Y-%m-%d'))
-        ) as encounter_start,
-        COALESCE(
-            TRY(date_parse(e.period_end, '%Y-%m-%dT%H:%i:%sZ')),
-            TRY(date_parse(e.period_end, '%Y-%m-%d'))
-        ) as encounter_end
+        TRY(CAST(from_iso8601_timestamp(e.period_start) AS TIMESTAMP)) as encounter_start,
+        TRY(CAST(from_iso8601_timestamp(e.period_end) AS TIMESTAMP)) as encounter_end
     FROM fhir_prd_db.encounter_appointment ea
     LEFT JOIN fhir_prd_db.encounter e ON ea.encounter_id = e.id
 ),
@@ -24,14 +18,8 @@ appointments_with_encounters AS (
         -- Appointment details (explicit casts for UNION compatibility)
         CAST(a.status AS VARCHAR) as appointment_status,
         CAST(a.appointment_type_text AS VARCHAR) as appointment_type_text,
-        COALESCE(
-            TRY(date_parse(a.start, '%Y-%m-%dT%H:%i:%sZ')),
-            TRY(date_parse(a.start, '%Y-%m-%d'))
-        ) as appointment_start,
-        COALESCE(
-            TRY(date_parse(a."end", '%Y-%m-%dT%H:%i:%sZ')),
-            TRY(date_parse(a."end", '%Y-%m-%d'))
-        ) as appointment_end,
+        TRY(CAST(from_iso8601_timestamp(a.start) AS TIMESTAMP)) as appointment_start,
+        TRY(CAST(from_iso8601_timestamp(a."end") AS TIMESTAMP)) as appointment_end,
         CAST(a.minutes_duration AS VARCHAR) as appointment_duration_minutes,
         CAST(a.cancelation_reason_text AS VARCHAR) as cancelation_reason_text,
         CAST(a.description AS VARCHAR) as appointment_description,
@@ -82,14 +70,8 @@ encounters_without_appointments AS (
         -- Encounter details
         CAST(e.id AS VARCHAR) as encounter_id,
         CAST(e.status AS VARCHAR) as encounter_status,
-        COALESCE(
-            TRY(date_parse(e.period_start, '%Y-%m-%dT%H:%i:%sZ')),
-            TRY(date_parse(e.period_start, '%Y-%m-%d'))
-        ) as encounter_start,
-        COALESCE(
-            TRY(date_parse(e.period_end, '%Y-%m-%dT%H:%i:%sZ')),
-            TRY(date_parse(e.period_end, '%Y-%m-%d'))
-        ) as encounter_end,
+        TRY(CAST(from_iso8601_timestamp(e.period_start) AS TIMESTAMP)) as encounter_start,
+        TRY(CAST(from_iso8601_timestamp(e.period_end) AS TIMESTAMP)) as encounter_end,
 
         -- Visit type
         'walk_in_unscheduled' as visit_type,